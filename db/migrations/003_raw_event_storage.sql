@@ -0,0 +1,31 @@
+-- Raw events are only ever queried by recent time ranges, so keep chunks small
+-- enough that range scans touch a handful of them and old ones can be compressed
+-- and dropped as a unit.
+SELECT set_chunk_time_interval('orders', INTERVAL '1 day');
+SELECT set_chunk_time_interval('sessions', INTERVAL '1 day');
+
+-- Segment filters (channel/campaign) and session event type filters used by
+-- kpi_repository.
+CREATE INDEX IF NOT EXISTS orders_channel_campaign_event_time_idx
+    ON orders (channel, campaign, event_time DESC);
+CREATE INDEX IF NOT EXISTS sessions_channel_campaign_event_time_idx
+    ON sessions (channel, campaign, event_time DESC);
+CREATE INDEX IF NOT EXISTS sessions_event_type_event_time_idx
+    ON sessions (event_type, event_time DESC);
+
+ALTER TABLE orders SET (
+    timescaledb.compress,
+    timescaledb.compress_segmentby = 'channel, campaign',
+    timescaledb.compress_orderby = 'event_time DESC, order_id'
+);
+ALTER TABLE sessions SET (
+    timescaledb.compress,
+    timescaledb.compress_segmentby = 'channel, campaign, event_type',
+    timescaledb.compress_orderby = 'event_time DESC, event_id'
+);
+
+SELECT add_compression_policy('orders', INTERVAL '7 days', if_not_exists => TRUE);
+SELECT add_compression_policy('sessions', INTERVAL '7 days', if_not_exists => TRUE);
+
+SELECT add_retention_policy('orders', INTERVAL '90 days', if_not_exists => TRUE);
+SELECT add_retention_policy('sessions', INTERVAL '90 days', if_not_exists => TRUE);
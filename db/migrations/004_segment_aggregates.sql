@@ -0,0 +1,76 @@
+-- Per-segment KPI rollups for channel/campaign filtered queries. Real-time
+-- aggregation is on, so buckets newer than the last refresh are computed from
+-- the raw hypertables at query time.
+CREATE MATERIALIZED VIEW IF NOT EXISTS orders_segment_minute
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket(INTERVAL '1 minute', event_time) AS bucket,
+    channel,
+    campaign,
+    SUM(amount) AS revenue,
+    COUNT(*) AS order_count
+FROM orders
+GROUP BY time_bucket(INTERVAL '1 minute', event_time), channel, campaign
+WITH NO DATA;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS sessions_segment_minute
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket(INTERVAL '1 minute', event_time) AS bucket,
+    channel,
+    campaign,
+    COUNT(*) FILTER (WHERE event_type = 'view') AS view_count,
+    COUNT(*) FILTER (WHERE event_type = 'checkout') AS checkout_count,
+    COUNT(*) FILTER (WHERE event_type = 'purchase') AS purchase_count
+FROM sessions
+GROUP BY time_bucket(INTERVAL '1 minute', event_time), channel, campaign
+WITH NO DATA;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS orders_segment_hour
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket(INTERVAL '1 hour', bucket) AS bucket,
+    channel,
+    campaign,
+    SUM(revenue) AS revenue,
+    SUM(order_count)::BIGINT AS order_count
+FROM orders_segment_minute
+GROUP BY time_bucket(INTERVAL '1 hour', bucket), channel, campaign
+WITH NO DATA;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS sessions_segment_hour
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket(INTERVAL '1 hour', bucket) AS bucket,
+    channel,
+    campaign,
+    SUM(view_count)::BIGINT AS view_count,
+    SUM(checkout_count)::BIGINT AS checkout_count,
+    SUM(purchase_count)::BIGINT AS purchase_count
+FROM sessions_segment_minute
+GROUP BY time_bucket(INTERVAL '1 hour', bucket), channel, campaign
+WITH NO DATA;
+
+-- The refresh window matches raw event retention: the first run materializes
+-- existing history once, later runs only process invalidated ranges, and rollups
+-- outlive the raw chunks they were built from.
+SELECT add_continuous_aggregate_policy('orders_segment_minute',
+    start_offset => INTERVAL '90 days',
+    end_offset => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute',
+    if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('sessions_segment_minute',
+    start_offset => INTERVAL '90 days',
+    end_offset => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute',
+    if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('orders_segment_hour',
+    start_offset => INTERVAL '90 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '15 minutes',
+    if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('sessions_segment_hour',
+    start_offset => INTERVAL '90 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '15 minutes',
+    if_not_exists => TRUE);
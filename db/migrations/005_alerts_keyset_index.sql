@@ -0,0 +1,3 @@
+-- Keyset pagination of /alerts walks (created_at, id) newest first.
+CREATE INDEX IF NOT EXISTS alerts_created_at_id_idx
+    ON alerts (created_at DESC, id DESC);
@@ -0,0 +1,59 @@
+-- Day tier for long-range KPI queries. Unlike the minute and hour rollups these
+-- are materialized only: reads never touch the finer tables, and the query
+-- planner in kpi_repository serves the not yet materialized tail from the hour
+-- tier instead.
+CREATE MATERIALIZED VIEW IF NOT EXISTS kpi_day
+WITH (timescaledb.continuous, timescaledb.materialized_only = true) AS
+SELECT
+    time_bucket(INTERVAL '1 day', bucket) AS bucket,
+    SUM(revenue) AS revenue,
+    SUM(order_count)::BIGINT AS order_count,
+    SUM(view_count)::BIGINT AS view_count,
+    SUM(checkout_count)::BIGINT AS checkout_count,
+    SUM(purchase_count)::BIGINT AS purchase_count
+FROM kpi_hour
+GROUP BY time_bucket(INTERVAL '1 day', bucket)
+WITH NO DATA;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS orders_segment_day
+WITH (timescaledb.continuous, timescaledb.materialized_only = true) AS
+SELECT
+    time_bucket(INTERVAL '1 day', bucket) AS bucket,
+    channel,
+    campaign,
+    SUM(revenue) AS revenue,
+    SUM(order_count)::BIGINT AS order_count
+FROM orders_segment_hour
+GROUP BY time_bucket(INTERVAL '1 day', bucket), channel, campaign
+WITH NO DATA;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS sessions_segment_day
+WITH (timescaledb.continuous, timescaledb.materialized_only = true) AS
+SELECT
+    time_bucket(INTERVAL '1 day', bucket) AS bucket,
+    channel,
+    campaign,
+    SUM(view_count)::BIGINT AS view_count,
+    SUM(checkout_count)::BIGINT AS checkout_count,
+    SUM(purchase_count)::BIGINT AS purchase_count
+FROM sessions_segment_hour
+GROUP BY time_bucket(INTERVAL '1 day', bucket), channel, campaign
+WITH NO DATA;
+
+-- Complete days are materialized within about two hours of midnight UTC; the
+-- API's KPI_DAY_TIER_LAG_SECONDS must cover end_offset plus schedule_interval.
+SELECT add_continuous_aggregate_policy('kpi_day',
+    start_offset => INTERVAL '90 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '1 hour',
+    if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('orders_segment_day',
+    start_offset => INTERVAL '90 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '1 hour',
+    if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('sessions_segment_day',
+    start_offset => INTERVAL '90 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '1 hour',
+    if_not_exists => TRUE);
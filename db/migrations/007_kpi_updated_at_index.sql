@@ -0,0 +1,4 @@
+-- ETags of /kpi/latest use MAX(updated_at) over the whole table; with these
+-- indexes that is one index probe per chunk instead of a scan.
+CREATE INDEX IF NOT EXISTS kpi_minute_updated_at_idx ON kpi_minute (updated_at DESC);
+CREATE INDEX IF NOT EXISTS kpi_hour_updated_at_idx ON kpi_hour (updated_at DESC);
@@ -2,6 +2,7 @@ import asyncio
 import logging
 
 import asyncpg
+from runtime import run_service
 from services.alert_service import AlertService
 from settings import get_settings
 
@@ -52,7 +53,7 @@ async def run() -> None:
 
 
 def main() -> None:
-    asyncio.run(run())
+    run_service(run(), settings)
 
 
 if __name__ == "__main__":
@@ -21,6 +21,15 @@ class Settings(BaseModel):
     )
     DURATION_MINUTES: int = Field(3, description="Minutes the deviation must persist")
 
+    UVLOOP_ENABLED: bool = Field(False, description="Use uvloop when it is installed")
+    LOOP_DEBUG: bool = Field(False, description="Enable asyncio debug mode")
+    SLOW_CALLBACK_MS: int = Field(
+        100, description="Warn about loop stalls longer than this (ms), 0 disables"
+    )
+    LOOP_LAG_INTERVAL_SECONDS: float = Field(
+        1.0, description="Event loop lag probe interval in seconds"
+    )
+
     DB_DSN: str = Field(..., description="PostgreSQL DSN")
 
     BASELINE_DAYS: int = Field(7, description="Baseline days for comparisons")
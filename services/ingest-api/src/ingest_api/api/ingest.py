@@ -1,11 +1,28 @@
-import json
+import asyncio
 import logging
+import os
 
-from aiokafka import AIOKafkaProducer
 from fastapi import APIRouter, HTTPException, Request
+from pydantic import ValidationError
 
-from ingest_api.api.schemas import IngestResponse, OrderEvent, SessionEvent
-from ingest_api.services.ingest_service import make_event_id, to_payload
+from ingest_api.api.schemas import (
+    BatchIngestResponse,
+    BatchItemResult,
+    IngestResponse,
+    OrderEvent,
+    SessionEvent,
+)
+from ingest_api.services.idempotency import IdempotencyCache
+from ingest_api.services.ingest_service import (
+    describe_validation_error,
+    order_event_id,
+    parse_batch_body,
+    parse_batch_item,
+    session_event_id,
+)
+from ingest_api.services.kpi_service import kpi_cache
+from ingest_api.services.publisher import SYNC, Publisher
+from ingest_api.services.spool import DiskSpool
 from ingest_api.settings import get_settings
 
 router = APIRouter(tags=["ingest"])
@@ -13,14 +30,84 @@ settings = get_settings()
 logger = logging.getLogger("ingest-api")
 
 
-async def _publish(
-    producer: AIOKafkaProducer, topic: str, event_id: str, payload: dict[str, object]
-) -> None:
-    await producer.send_and_wait(
-        topic,
-        json.dumps(payload).encode("utf-8"),
-        key=event_id.encode("utf-8"),
-    )
+async def _spool(
+    spool: DiskSpool | None, items: list[tuple[str, bytes, bytes]]
+) -> bool:
+    if spool is None:
+        return False
+    try:
+        await spool.append_many(items)
+    except OSError:
+        logger.exception("Failed to spool %s events", len(items))
+        return False
+    return True
+
+
+def _encode(request: Request, event: OrderEvent | SessionEvent, event_id: str) -> bytes:
+    return request.app.state.serialize(event, event_id)
+
+
+async def _publish(request: Request, topic: str, event_id: str, value: bytes) -> str:
+    publisher: Publisher = request.app.state.publisher
+    spool: DiskSpool | None = request.app.state.spool
+    item = (topic, event_id.encode("utf-8"), value)
+    # While a backlog is being replayed new events queue behind it, so Kafka
+    # still sees them in arrival order.
+    if spool is not None and spool.active:
+        if await _spool(spool, [item]):
+            return "spooled"
+        raise HTTPException(status_code=503, detail="Event spool unavailable")
+    try:
+        await publisher.publish(*item)
+    except Exception as exc:
+        if not await _spool(spool, [item]):
+            raise HTTPException(status_code=503, detail="Kafka publish failed") from exc
+        logger.warning("Kafka publish failed, spooled %s: %s", event_id, exc)
+        return "spooled"
+    return "accepted"
+
+
+def _count(request: Request, name: str, amount: int = 1) -> None:
+    if not amount:
+        return
+    counters = request.app.state.counters
+    after = counters.add(name, amount)
+    if name == "accepted" and (after - amount) // settings.LOG_EVERY_N != (
+        after // settings.LOG_EVERY_N
+    ):
+        logger.info("Worker %s accepted %s events", counters.slot, after)
+
+
+_DELIVERED = ("accepted", "spooled")
+
+
+def _is_duplicate(request: Request, event_id: str) -> bool:
+    # A new event_id is reserved here; it must be remembered once delivered
+    # or forgotten if the event reached neither Kafka nor the spool.
+    cache: IdempotencyCache | None = request.app.state.idempotency
+    if cache is None:
+        return False
+    if not cache.reserve(event_id):
+        _count(request, "duplicates")
+        return True
+    _count(request, "idempotency_misses")
+    return False
+
+
+def _remember(request: Request, event_ids: list[str]) -> None:
+    cache: IdempotencyCache | None = request.app.state.idempotency
+    if cache is None:
+        return
+    for event_id in event_ids:
+        cache.remember(event_id)
+
+
+def _forget(request: Request, event_ids: list[str] | set[str]) -> None:
+    cache: IdempotencyCache | None = request.app.state.idempotency
+    if cache is None:
+        return
+    for event_id in event_ids:
+        cache.forget(event_id)
 
 
 @router.post(
@@ -29,22 +116,24 @@ async def _publish(
     summary="Publish order event",
     description=(
         "Validates order payload and publishes it to the Kafka orders topic. "
-        "Returns accepted status with final event_id."
+        "Returns accepted status with final event_id, or duplicate when the same "
+        "event_id was accepted recently."
     ),
     response_description="Accepted status and event identifier.",
 )
 async def ingest_order(event: OrderEvent, request: Request) -> IngestResponse:
-    producer: AIOKafkaProducer = request.app.state.producer
-    event_id = event.event_id or event.order_id
-    payload = to_payload(event, event_id)
+    event_id = order_event_id(event)
+    if _is_duplicate(request, event_id):
+        return IngestResponse(status="duplicate", event_id=event_id)
+    value = _encode(request, event, event_id)
     try:
-        await _publish(producer, settings.KAFKA_ORDERS_TOPIC, event_id, payload)
-    except Exception as exc:
-        raise HTTPException(status_code=503, detail="Kafka publish failed") from exc
-    request.app.state.ingest_counter += 1
-    if request.app.state.ingest_counter % settings.LOG_EVERY_N == 0:
-        logger.info("Accepted %s events", request.app.state.ingest_counter)
-    return IngestResponse(status="accepted", event_id=event_id)
+        status = await _publish(request, settings.KAFKA_ORDERS_TOPIC, event_id, value)
+    except BaseException:
+        _forget(request, [event_id])
+        raise
+    _remember(request, [event_id])
+    _count(request, status)
+    return IngestResponse(status=status, event_id=event_id)
 
 
 @router.post(
@@ -53,21 +142,205 @@ async def ingest_order(event: OrderEvent, request: Request) -> IngestResponse:
     summary="Publish session event",
     description=(
         "Validates session payload and publishes it to the Kafka sessions topic. "
-        "Returns accepted status with final event_id."
+        "Returns accepted status with final event_id, or duplicate when the same "
+        "event_id was accepted recently."
     ),
     response_description="Accepted status and event identifier.",
 )
 async def ingest_session(event: SessionEvent, request: Request) -> IngestResponse:
-    producer: AIOKafkaProducer = request.app.state.producer
-    event_id = event.event_id or make_event_id(
-        "session", f"{event.session_id}:{event.event_type}", event.event_time
+    event_id = session_event_id(event)
+    if _is_duplicate(request, event_id):
+        return IngestResponse(status="duplicate", event_id=event_id)
+    value = _encode(request, event, event_id)
+    try:
+        status = await _publish(request, settings.KAFKA_SESSIONS_TOPIC, event_id, value)
+    except BaseException:
+        _forget(request, [event_id])
+        raise
+    _remember(request, [event_id])
+    _count(request, status)
+    return IngestResponse(status=status, event_id=event_id)
+
+
+_BATCH_ITEM_SCHEMA = {
+    "oneOf": [
+        {
+            "allOf": [
+                {"$ref": "#/components/schemas/OrderEvent"},
+                {"properties": {"type": {"const": "order"}}},
+            ]
+        },
+        {
+            "allOf": [
+                {"$ref": "#/components/schemas/SessionEvent"},
+                {"properties": {"type": {"const": "session"}}},
+            ]
+        },
+    ]
+}
+
+
+async def _deliver_batch(
+    request: Request, items: list[object], batch_ids: set[str]
+) -> list[BatchItemResult]:
+    publisher: Publisher = request.app.state.publisher
+    spool: DiskSpool | None = request.app.state.spool
+    results: list[BatchItemResult] = []
+    pending: list[tuple[BatchItemResult, tuple[str, bytes, bytes], asyncio.Future]] = []
+    unpublished: list[tuple[BatchItemResult, tuple[str, bytes, bytes]]] = []
+    for index, item in enumerate(items):
+        try:
+            event = parse_batch_item(item)
+        except (ValidationError, ValueError) as exc:
+            results.append(
+                BatchItemResult(
+                    index=index, status="rejected", error=describe_validation_error(exc)
+                )
+            )
+            continue
+
+        if isinstance(event, OrderEvent):
+            topic, event_id = settings.KAFKA_ORDERS_TOPIC, order_event_id(event)
+        else:
+            topic, event_id = settings.KAFKA_SESSIONS_TOPIC, session_event_id(event)
+        if event_id in batch_ids:
+            _count(request, "duplicates")
+            duplicate = True
+        else:
+            duplicate = _is_duplicate(request, event_id)
+        if duplicate:
+            results.append(
+                BatchItemResult(index=index, status="duplicate", event_id=event_id)
+            )
+            continue
+        batch_ids.add(event_id)
+        result = BatchItemResult(index=index, status="accepted", event_id=event_id)
+        results.append(result)
+        record = (topic, event_id.encode("utf-8"), _encode(request, event, event_id))
+        if spool is not None and spool.active:
+            unpublished.append((result, record))
+            continue
+        try:
+            # send() only enqueues into the producer's per-partition batches; in
+            # sync mode all deliveries are awaited together below.
+            delivery = await publisher.send(*record)
+        except Exception:
+            logger.exception("Kafka enqueue failed for %s", event_id)
+            unpublished.append((result, record))
+            continue
+        if publisher.mode == SYNC:
+            pending.append((result, record, delivery))
+
+    outcomes = await asyncio.gather(
+        *(delivery for _, _, delivery in pending), return_exceptions=True
     )
-    payload = to_payload(event, event_id)
+    for (result, record, _), outcome in zip(pending, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning("Kafka delivery failed for %s: %s", result.event_id, outcome)
+            unpublished.append((result, record))
+
+    if unpublished:
+        spooled = await _spool(spool, [record for _, record in unpublished])
+        for result, _ in unpublished:
+            if spooled:
+                result.status = "spooled"
+            else:
+                result.status, result.error = "failed", "Kafka publish failed"
+    return results
+
+
+@router.post(
+    "/events/batch",
+    response_model=BatchIngestResponse,
+    summary="Publish a batch of events",
+    description=(
+        "Accepts a JSON array or an NDJSON stream (Content-Type: application/x-ndjson) "
+        "of order and session events. Each item may set type to 'order' or 'session'; "
+        "otherwise it is inferred from order_id/session_id. Items are validated and "
+        "published independently and the response reports the outcome of each one; "
+        "items that could not reach Kafka are spooled locally when the spool is on."
+    ),
+    response_description="Per-item accept/reject results.",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": _BATCH_ITEM_SCHEMA}
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def ingest_batch(request: Request) -> BatchIngestResponse:
+    body = await request.body()
     try:
-        await _publish(producer, settings.KAFKA_SESSIONS_TOPIC, event_id, payload)
-    except Exception as exc:
-        raise HTTPException(status_code=503, detail="Kafka publish failed") from exc
-    request.app.state.ingest_counter += 1
-    if request.app.state.ingest_counter % settings.LOG_EVERY_N == 0:
-        logger.info("Accepted %s events", request.app.state.ingest_counter)
-    return IngestResponse(status="accepted", event_id=event_id)
+        items = parse_batch_body(body, request.headers.get("content-type", ""))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if len(items) > settings.BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.BATCH_MAX_EVENTS} events",
+        )
+
+    # Reserved ids are collected as they are claimed, so they can be released
+    # if the request is cancelled or fails midway.
+    batch_ids: set[str] = set()
+    try:
+        results = await _deliver_batch(request, items, batch_ids)
+    except BaseException:
+        _forget(request, batch_ids)
+        raise
+
+    counts = {"accepted": 0, "spooled": 0, "duplicate": 0, "rejected": 0, "failed": 0}
+    for result in results:
+        counts[result.status] += 1
+    _remember(
+        request,
+        [r.event_id for r in results if r.event_id and r.status in _DELIVERED],
+    )
+    _forget(
+        request, [r.event_id for r in results if r.event_id and r.status == "failed"]
+    )
+    for name in ("accepted", "spooled", "rejected"):
+        _count(request, name, counts[name])
+    return BatchIngestResponse(**counts, results=results)
+
+
+@router.get(
+    "/metrics/ingest",
+    summary="Ingest pipeline metrics",
+    description=(
+        "Counters summed across all API workers (accepted, spooled, Kafka delivery "
+        "and spool depth/age) plus the state of the worker that served the request."
+    ),
+)
+async def ingest_metrics(request: Request) -> dict[str, object]:
+    counters = request.app.state.counters
+    publisher: Publisher = request.app.state.publisher
+    spool: DiskSpool | None = request.app.state.spool
+    totals = counters.totals()
+    lookups = totals["duplicates"] + totals["idempotency_misses"]
+    hit_rate = round(totals["duplicates"] / lookups, 4) if lookups else 0.0
+    return {
+        "workers": counters.workers(),
+        "totals": totals,
+        "idempotency_hit_rate": hit_rate,
+        "worker": {
+            "slot": counters.slot,
+            "pid": os.getpid(),
+            "accepted": counters.get("accepted"),
+            "publisher": publisher.stats(),
+            "spool": spool.stats() if spool is not None else None,
+            "kpi_cache": kpi_cache.stats(),
+            "db_read": request.app.state.db_pool.stats(),
+            "db_acquire": request.app.state.db_pool.acquire_stats(),
+            "kpi_stream": request.app.state.kpi_stream.stats(),
+            "limits": {
+                name: limiter.stats()
+                for name, limiter in request.app.state.limiters.items()
+            },
+        },
+    }
@@ -1,32 +1,301 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import suppress
 from datetime import datetime, timedelta, timezone
-from typing import Literal
+from typing import Any, Literal, TypeVar
 
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 from ingest_api.api.schemas import (
     AlertSeries,
     AlertType,
+    DashboardSnapshot,
     FreshnessResponse,
+    KpiBreakdown,
     KpiLatest,
     KpiSeries,
+    KpiStreamUpdate,
     TimeToSignalResponse,
 )
+from ingest_api.domain.db import query_deadline
+from ingest_api.services.etag import etag_matches
 from ingest_api.services.kpi_service import (
+    alerts_cursor,
+    alerts_etag,
+    breakdown_etag,
     fetch_alerts,
+    fetch_breakdown,
+    fetch_dashboard_snapshot,
     fetch_freshness_info,
     fetch_latest_kpi,
+    fetch_rollup_series,
     fetch_series,
+    fetch_series_json,
+    fetch_stream_update,
     fetch_time_to_signal_info,
+    latest_etag,
+    parse_alerts_cursor,
+    parse_series_cursor,
+    rollup_etag,
+    series_cursor,
+    series_etag,
+    series_json,
 )
+from ingest_api.services.kpi_export import (
+    MEDIA_TYPES,
+    TEXT_FORMATS,
+    gzip_chunks,
+    stream_series,
+)
+from ingest_api.services.kpi_stream import KpiStreamHub, Topic, sse_frame
+from ingest_api.settings import get_settings
 
+settings = get_settings()
 router = APIRouter(tags=["kpi"])
 
+T = TypeVar("T")
+SeriesFormat = Literal["json", "ndjson", "csv", "arrow"]
+SeriesMetric = Literal[
+    "revenue",
+    "order_count",
+    "average_order_value",
+    "view_count",
+    "checkout_count",
+    "purchase_count",
+    "conversion_rate",
+]
+BreakdownDimension = Literal["channel", "campaign", "channel,campaign"]
+_EXPORT_RESPONSES: dict[int | str, dict] = {
+    200: {
+        "content": {
+            "application/x-ndjson": {},
+            "text/csv": {},
+            "application/vnd.apache.arrow.stream": {},
+        }
+    },
+    429: {"description": "Too many concurrent exports on this worker."},
+}
+_BUDGET_RESPONSES: dict[int | str, dict] = {
+    304: {"description": "If-None-Match matches the current ETag."},
+    504: {"description": "The query did not finish within its time budget."},
+}
+
 
 def _ensure_range(start: datetime, end: datetime) -> None:
     if start > end:
         raise HTTPException(status_code=400, detail="from must be <= to")
 
 
+async def _client_disconnected(request: Request) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+class _Budget:
+    # One deadline per request, shared by its ETag lookup and its data query.
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.deadline - time.monotonic(), 0.0)
+
+
+async def _within_budget(request: Request, budget: _Budget, work: Awaitable[T]) -> T:
+    # Cancelling the query task makes asyncpg cancel the statement in Postgres,
+    # so a slow query gives its connection back as soon as the budget runs out
+    # or the client goes away. The queries also get the remaining budget as
+    # timeout=, which covers loads that outlive this request in the cache.
+    with query_deadline(budget.deadline):
+        query = asyncio.ensure_future(work)
+    disconnect = asyncio.ensure_future(_client_disconnected(request))
+    try:
+        done, _ = await asyncio.wait(
+            {query, disconnect},
+            timeout=budget.remaining(),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    finally:
+        disconnect.cancel()
+        query.cancel()
+    if query in done:
+        # asyncpg's timeout= may expire just before the wait above does.
+        with suppress(TimeoutError):
+            return query.result()
+    else:
+        await asyncio.wait({query})
+    if disconnect in done:
+        raise HTTPException(status_code=499, detail="Client closed the request")
+    raise HTTPException(
+        status_code=504,
+        detail=f"KPI query did not finish within {budget.seconds:g}s, retry later",
+    )
+
+
+async def _check_etag(request: Request, budget: _Budget, work: Awaitable[str]) -> str:
+    # Only the version lookup runs here; a matching poll gets its 304 without
+    # the data query.
+    etag = await _within_budget(request, budget, work)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    return etag
+
+
+async def _series_response(
+    request: Request,
+    response: Response,
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    limit: int,
+    channel: str | None,
+    campaign: str | None,
+) -> KpiSeries | Response:
+    pool = request.app.state.db_pool
+    budget = _Budget(settings.KPI_SERIES_TIMEOUT_SECONDS)
+    try:
+        etag = await _check_etag(
+            request,
+            budget,
+            series_etag(pool, bucket, from_ts, to_ts, limit, channel, campaign),
+        )
+        if settings.KPI_FAST_RESPONSES:
+            points, count, last_bucket = await _within_budget(
+                request,
+                budget,
+                fetch_series_json(
+                    pool, bucket, from_ts, to_ts, limit, channel, campaign, etag=etag
+                ),
+            )
+            next_cursor = None
+            if count == limit and last_bucket is not None:
+                next_cursor = series_cursor(
+                    bucket, last_bucket, to_ts, channel, campaign
+                )
+            # Returning a Response skips response_model validation entirely;
+            # the OpenAPI schema still documents KpiSeries.
+            return Response(
+                series_json(
+                    bucket, from_ts, to_ts, channel, campaign, points, next_cursor
+                ),
+                media_type="application/json",
+                headers={"ETag": etag},
+            )
+        series_points = await _within_budget(
+            request,
+            budget,
+            fetch_series(
+                pool, bucket, from_ts, to_ts, limit, channel, campaign, etag=etag
+            ),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    next_cursor = None
+    if len(series_points) == limit:
+        next_cursor = series_cursor(
+            bucket, series_points[-1].bucket, to_ts, channel, campaign
+        )
+    response.headers["ETag"] = etag
+    return KpiSeries(
+        bucket=bucket,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        channel=channel,
+        campaign=campaign,
+        next_cursor=next_cursor,
+        points=series_points,
+    )
+
+
+def _series_page(
+    cursor: str, bucket: str, channel: str | None, campaign: str | None
+) -> tuple[datetime, datetime]:
+    try:
+        return parse_series_cursor(cursor, bucket, channel, campaign)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _json_limit(limit: int | None) -> int:
+    if limit is None:
+        return 2000
+    if limit > 5000:
+        raise HTTPException(
+            status_code=422, detail="limit must be <= 5000 for JSON responses"
+        )
+    return limit
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00")
+    return False
+
+
+class _ExportResponse(StreamingResponse):
+    # The slot is released when the response has been sent or abandoned; a
+    # finally in the body generator would not run if the body never started.
+    def __init__(
+        self, content: AsyncIterator[bytes], slots: asyncio.Semaphore, **kwargs: Any
+    ) -> None:
+        super().__init__(content, **kwargs)
+        self._slots = slots
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._slots.release()
+
+
+async def _export_response(
+    request: Request,
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    limit: int | None,
+    channel: str | None,
+    campaign: str | None,
+    fmt: str,
+) -> StreamingResponse:
+    # Each export holds a pool connection for its whole duration.
+    slots: asyncio.Semaphore = request.app.state.export_slots
+    if slots.locked():
+        raise HTTPException(
+            status_code=429,
+            detail="Too many concurrent KPI exports, retry later",
+            headers={"Retry-After": str(settings.LIMIT_RETRY_AFTER_SECONDS)},
+        )
+    await slots.acquire()
+    chunks = stream_series(
+        request.app.state.db_pool,
+        bucket,
+        from_ts,
+        to_ts,
+        limit,
+        channel,
+        campaign,
+        fmt,
+        settings.KPI_EXPORT_BATCH_ROWS,
+    )
+    extension = "arrows" if fmt == "arrow" else fmt
+    headers = {
+        "Content-Disposition": f'attachment; filename="kpi-{bucket}.{extension}"'
+    }
+    if fmt in TEXT_FORMATS:
+        headers["Vary"] = "Accept-Encoding"
+        if _accepts_gzip(request):
+            chunks = gzip_chunks(chunks)
+            headers["Content-Encoding"] = "gzip"
+    return _ExportResponse(chunks, slots, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
 def _map_alert_kpi(kpi: AlertType | None) -> str | None:
     if kpi is None:
         return None
@@ -44,9 +313,11 @@ def _map_alert_kpi(kpi: AlertType | None) -> str | None:
         "(minute or hour), with optional segmentation by channel/campaign."
     ),
     response_description="Latest KPI point and applied filters.",
+    responses=_BUDGET_RESPONSES,
 )
 async def kpi_latest(
     request: Request,
+    response: Response,
     bucket: Literal["minute", "hour"] = Query(
         "minute", description="Aggregation bucket: minute or hour."
     ),
@@ -54,51 +325,149 @@ async def kpi_latest(
     campaign: str | None = Query(None, description="Optional campaign filter."),
 ) -> KpiLatest:
     pool = request.app.state.db_pool
+    budget = _Budget(settings.KPI_LATEST_TIMEOUT_SECONDS)
     try:
-        point = await fetch_latest_kpi(pool, bucket, channel, campaign)
+        etag = await _check_etag(
+            request,
+            budget,
+            latest_etag(pool, bucket, channel, campaign),
+        )
+        point = await _within_budget(
+            request,
+            budget,
+            fetch_latest_kpi(pool, bucket, channel, campaign, etag=etag),
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    response.headers["ETag"] = etag
     return KpiLatest(bucket=bucket, channel=channel, campaign=campaign, point=point)
 
 
+async def _stream_events(
+    hub: KpiStreamHub, topic: Topic, queue: asyncio.Queue[bytes], first: bytes
+) -> AsyncIterator[bytes]:
+    # Streams end after KPI_STREAM_MAX_SECONDS; EventSource reconnects on its
+    # own, which spreads viewers over workers and lets shutdown finish.
+    deadline = time.monotonic() + settings.KPI_STREAM_MAX_SECONDS
+    keepalive = settings.KPI_STREAM_KEEPALIVE_SECONDS
+    try:
+        yield f"retry: {settings.KPI_STREAM_RETRY_MS}\n\n".encode("ascii")
+        yield first
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                yield await asyncio.wait_for(queue.get(), min(keepalive, remaining))
+            except TimeoutError:
+                yield b": keepalive\n\n"
+    finally:
+        hub.unsubscribe(topic, queue)
+
+
+@router.get(
+    "/kpi/stream",
+    response_class=StreamingResponse,
+    summary="Stream latest KPI point and freshness",
+    description=(
+        "Server-Sent Events stream of `kpi` events, each carrying the latest KPI "
+        "point for the selected bucket and segment together with freshness. "
+        "Updates are pushed after every processor flush."
+    ),
+    responses={
+        200: {
+            "description": "text/event-stream of KpiStreamUpdate payloads.",
+            "content": {
+                "text/event-stream": {
+                    "schema": KpiStreamUpdate.model_json_schema()
+                }
+            },
+        },
+        503: {"description": "Too many stream subscribers on this worker."},
+    },
+)
+async def kpi_stream(
+    request: Request,
+    bucket: Literal["minute", "hour"] = Query(
+        "minute", description="Aggregation bucket: minute or hour."
+    ),
+    channel: str | None = Query(None, description="Optional channel filter."),
+    campaign: str | None = Query(None, description="Optional campaign filter."),
+) -> StreamingResponse:
+    hub: KpiStreamHub = request.app.state.kpi_stream
+    topic = (bucket, channel, campaign)
+    queue = hub.subscribe(topic)
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Too many KPI stream subscribers")
+    try:
+        update = await fetch_stream_update(
+            request.app.state.db_pool, bucket, channel, campaign
+        )
+    except BaseException:
+        hub.unsubscribe(topic, queue)
+        raise
+    first = sse_frame("kpi", update.model_dump_json().encode("utf-8"))
+    return StreamingResponse(
+        _stream_events(hub, topic, queue, first),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/kpi/minute",
     response_model=KpiSeries,
     summary="Get minute KPI series",
     description=(
         "Returns KPI time series with minute granularity. "
-        "If from/to are omitted, default range is the last 2 hours."
+        "If from/to are omitted, default range is the last 2 hours. "
+        "format=ndjson|csv|arrow streams the range as an export."
     ),
     response_description="Minute KPI series for the selected period.",
+    responses={**_EXPORT_RESPONSES, **_BUDGET_RESPONSES},
 )
 async def kpi_minute(
     request: Request,
+    response: Response,
     from_ts: datetime | None = Query(
         None, alias="from", description="Range start (UTC)."
     ),
     to_ts: datetime | None = Query(None, alias="to", description="Range end (UTC)."),
-    limit: int = Query(2000, ge=1, le=5000, description="Maximum points to return."),
+    limit: int | None = Query(
+        None,
+        ge=1,
+        description=(
+            "Maximum points to return. JSON defaults to 2000 and allows up to "
+            "5000; export formats return the whole range unless limited."
+        ),
+    ),
     channel: str | None = Query(None, description="Optional channel filter."),
     campaign: str | None = Query(None, description="Optional campaign filter."),
-) -> KpiSeries:
+    fmt: SeriesFormat = Query(
+        "json",
+        alias="format",
+        description="json, or a streamed export: ndjson, csv or arrow.",
+    ),
+    cursor: str | None = Query(
+        None, description="next_cursor of the previous page; replaces from/to."
+    ),
+) -> KpiSeries | Response:
     now = datetime.now(timezone.utc)
     to_ts = to_ts or now
     from_ts = from_ts or (to_ts - timedelta(hours=2))
+    if cursor is not None:
+        from_ts, to_ts = _series_page(cursor, "minute", channel, campaign)
     _ensure_range(from_ts, to_ts)
-    pool = request.app.state.db_pool
-    try:
-        points = await fetch_series(
-            pool, "minute", from_ts, to_ts, limit, channel, campaign
+    if fmt != "json":
+        return await _export_response(
+            request, "minute", from_ts, to_ts, limit, channel, campaign, fmt
         )
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return KpiSeries(
-        bucket="minute",
-        from_ts=from_ts,
-        to_ts=to_ts,
-        channel=channel,
-        campaign=campaign,
-        points=points,
+    return await _series_response(
+        request,
+        response,
+        "minute",
+        from_ts,
+        to_ts,
+        _json_limit(limit),
+        channel,
+        campaign,
     )
 
 
@@ -108,39 +477,174 @@ async def kpi_minute(
     summary="Get hour KPI series",
     description=(
         "Returns KPI time series with hour granularity. "
-        "If from/to are omitted, default range is the last 3 days."
+        "If from/to are omitted, default range is the last 3 days. "
+        "format=ndjson|csv|arrow streams the range as an export."
     ),
     response_description="Hour KPI series for the selected period.",
+    responses={**_EXPORT_RESPONSES, **_BUDGET_RESPONSES},
 )
 async def kpi_hour(
     request: Request,
+    response: Response,
     from_ts: datetime | None = Query(
         None, alias="from", description="Range start (UTC)."
     ),
     to_ts: datetime | None = Query(None, alias="to", description="Range end (UTC)."),
-    limit: int = Query(2000, ge=1, le=5000, description="Maximum points to return."),
+    limit: int | None = Query(
+        None,
+        ge=1,
+        description=(
+            "Maximum points to return. JSON defaults to 2000 and allows up to "
+            "5000; export formats return the whole range unless limited."
+        ),
+    ),
     channel: str | None = Query(None, description="Optional channel filter."),
     campaign: str | None = Query(None, description="Optional campaign filter."),
-) -> KpiSeries:
+    fmt: SeriesFormat = Query(
+        "json",
+        alias="format",
+        description="json, or a streamed export: ndjson, csv or arrow.",
+    ),
+    cursor: str | None = Query(
+        None, description="next_cursor of the previous page; replaces from/to."
+    ),
+) -> KpiSeries | Response:
     now = datetime.now(timezone.utc)
     to_ts = to_ts or now
     from_ts = from_ts or (to_ts - timedelta(days=3))
+    if cursor is not None:
+        from_ts, to_ts = _series_page(cursor, "hour", channel, campaign)
+    _ensure_range(from_ts, to_ts)
+    if fmt != "json":
+        return await _export_response(
+            request, "hour", from_ts, to_ts, limit, channel, campaign, fmt
+        )
+    return await _series_response(
+        request,
+        response,
+        "hour",
+        from_ts,
+        to_ts,
+        _json_limit(limit),
+        channel,
+        campaign,
+    )
+
+
+@router.get(
+    "/kpi/series",
+    response_model=KpiSeries,
+    summary="Get KPI series with a custom bucket width",
+    description=(
+        "Rolls KPI buckets up to any width (e.g. 5m, 15m, 2h, 1d). Without a "
+        "width, the narrowest one that keeps the range within "
+        "KPI_SERIES_TARGET_POINTS buckets is used. The query reads the coarsest "
+        "stored tier (kpi_minute, kpi_hour or kpi_day) that the width allows; "
+        "days not yet materialized in kpi_day are read from kpi_hour. The tiers "
+        "read are listed in `tiers`. With max_points the result is downsampled "
+        "with LTTB on the chosen metric. If from/to are omitted, default range "
+        "is the last 24 hours."
+    ),
+    response_description="KPI series rolled up to the requested width.",
+    responses=_BUDGET_RESPONSES,
+)
+async def kpi_series(
+    request: Request,
+    response: Response,
+    width: str | None = Query(
+        None,
+        pattern=r"^[1-9][0-9]*[mhd]$",
+        description="Bucket width: 5m, 2h, 1d. Chosen from the range if omitted.",
+    ),
+    from_ts: datetime | None = Query(
+        None, alias="from", description="Range start (UTC)."
+    ),
+    to_ts: datetime | None = Query(None, alias="to", description="Range end (UTC)."),
+    max_points: int | None = Query(
+        None, ge=3, le=5000, description="Downsample to at most this many points."
+    ),
+    metric: SeriesMetric = Query(
+        "revenue", description="Metric whose shape LTTB downsampling preserves."
+    ),
+    channel: str | None = Query(None, description="Optional channel filter."),
+    campaign: str | None = Query(None, description="Optional campaign filter."),
+) -> KpiSeries:
+    now = datetime.now(timezone.utc)
+    to_ts = to_ts or now
+    from_ts = from_ts or (to_ts - timedelta(days=1))
     _ensure_range(from_ts, to_ts)
     pool = request.app.state.db_pool
+    params = (width, from_ts, to_ts, channel, campaign, max_points, metric)
+    budget = _Budget(settings.KPI_SERIES_TIMEOUT_SECONDS)
     try:
-        points = await fetch_series(
-            pool, "hour", from_ts, to_ts, limit, channel, campaign
+        etag = await _check_etag(
+            request,
+            budget,
+            rollup_etag(pool, *params),
+        )
+        series = await _within_budget(
+            request,
+            budget,
+            fetch_rollup_series(pool, *params, etag=etag),
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return KpiSeries(
-        bucket="hour",
-        from_ts=from_ts,
-        to_ts=to_ts,
-        channel=channel,
-        campaign=campaign,
-        points=points,
-    )
+    response.headers["ETag"] = etag
+    return series
+
+
+@router.get(
+    "/kpi/breakdown",
+    response_model=KpiBreakdown,
+    summary="Get KPI series for every segment at once",
+    description=(
+        "Returns per-bucket KPIs for every channel, campaign or channel/campaign "
+        "pair plus per-bucket totals, from one GROUPING SETS query over the "
+        "segment aggregates. With top, only the segments with the highest "
+        "revenue over the range are returned; totals still cover all segments. "
+        "If from/to are omitted, default range is the last 2 hours."
+    ),
+    response_description="Totals and per-segment KPI series.",
+    responses=_BUDGET_RESPONSES,
+)
+async def kpi_breakdown(
+    request: Request,
+    response: Response,
+    by: BreakdownDimension = Query(
+        "channel", description="Segment by channel, campaign or channel,campaign."
+    ),
+    bucket: Literal["minute", "hour"] = Query(
+        "minute", description="Aggregation bucket: minute or hour."
+    ),
+    from_ts: datetime | None = Query(
+        None, alias="from", description="Range start (UTC)."
+    ),
+    to_ts: datetime | None = Query(None, alias="to", description="Range end (UTC)."),
+    top: int | None = Query(
+        None, ge=1, le=1000, description="Keep the top N segments by revenue."
+    ),
+) -> KpiBreakdown:
+    now = datetime.now(timezone.utc)
+    to_ts = to_ts or now
+    from_ts = from_ts or (to_ts - timedelta(hours=2))
+    _ensure_range(from_ts, to_ts)
+    pool = request.app.state.db_pool
+    budget = _Budget(settings.KPI_SERIES_TIMEOUT_SECONDS)
+    try:
+        etag = await _check_etag(
+            request,
+            budget,
+            breakdown_etag(pool, bucket, by, from_ts, to_ts, top),
+        )
+        breakdown = await _within_budget(
+            request,
+            budget,
+            fetch_breakdown(pool, bucket, by, from_ts, to_ts, top, etag=etag),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    response.headers["ETag"] = etag
+    return breakdown
 
 
 @router.get(
@@ -148,27 +652,57 @@ async def kpi_hour(
     response_model=AlertSeries,
     summary="Get alerts list",
     description=(
-        "Returns alerts in the requested time range. "
-        "If from/to are omitted, default range is the last 24 hours."
+        "Returns alerts in the requested time range, newest first. "
+        "If from/to are omitted, default range is the last 24 hours. "
+        "Pass next_cursor back as cursor to fetch the following page."
     ),
     response_description="Alerts list for the selected period.",
+    responses=_BUDGET_RESPONSES,
 )
 async def alerts(
     request: Request,
+    response: Response,
     from_ts: datetime | None = Query(
         None, alias="from", description="Range start (UTC)."
     ),
     to_ts: datetime | None = Query(None, alias="to", description="Range end (UTC)."),
     limit: int = Query(500, ge=1, le=2000, description="Maximum alerts to return."),
     kpi: AlertType | None = Query(None, description="Optional alert type filter."),
+    cursor: str | None = Query(
+        None, description="next_cursor of the previous page; replaces from/to."
+    ),
 ) -> AlertSeries:
     now = datetime.now(timezone.utc)
     to_ts = to_ts or now
     from_ts = from_ts or (to_ts - timedelta(days=1))
+    kpi_name = _map_alert_kpi(kpi)
+    after = None
+    if cursor is not None:
+        try:
+            from_ts, after = parse_alerts_cursor(cursor, kpi_name)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        to_ts = after[0]
     _ensure_range(from_ts, to_ts)
     pool = request.app.state.db_pool
-    items = await fetch_alerts(pool, from_ts, to_ts, limit, _map_alert_kpi(kpi))
-    return AlertSeries(from_ts=from_ts, to_ts=to_ts, items=items)
+    budget = _Budget(settings.KPI_ALERTS_TIMEOUT_SECONDS)
+    etag = await _check_etag(
+        request,
+        budget,
+        alerts_etag(pool, from_ts, to_ts, limit, kpi_name, after=after),
+    )
+    items = await _within_budget(
+        request,
+        budget,
+        fetch_alerts(pool, from_ts, to_ts, limit, kpi_name, after=after, etag=etag),
+    )
+    next_cursor = None
+    if len(items) == limit and items[-1].id is not None:
+        next_cursor = alerts_cursor(items[-1], from_ts, kpi_name)
+    response.headers["ETag"] = etag
+    return AlertSeries(
+        from_ts=from_ts, to_ts=to_ts, next_cursor=next_cursor, items=items
+    )
 
 
 @router.get(
@@ -180,6 +714,7 @@ async def alerts(
         "for orders and sessions, optionally filtered by segment."
     ),
     response_description="Freshness metrics for orders and sessions.",
+    responses=_BUDGET_RESPONSES,
 )
 async def metrics_freshness(
     request: Request,
@@ -187,7 +722,11 @@ async def metrics_freshness(
     campaign: str | None = Query(None, description="Optional campaign filter."),
 ) -> FreshnessResponse:
     pool = request.app.state.db_pool
-    return await fetch_freshness_info(pool, channel, campaign)
+    return await _within_budget(
+        request,
+        _Budget(settings.KPI_METRICS_TIMEOUT_SECONDS),
+        fetch_freshness_info(pool, channel, campaign),
+    )
 
 
 @router.get(
@@ -199,6 +738,7 @@ async def metrics_freshness(
         "for orders and sessions in the selected interval."
     ),
     response_description="Time-to-signal metrics for orders and sessions.",
+    responses=_BUDGET_RESPONSES,
 )
 async def metrics_time_to_signal(
     request: Request,
@@ -217,8 +757,10 @@ async def metrics_time_to_signal(
     from_ts = from_ts or (to_ts - timedelta(hours=2))
     _ensure_range(from_ts, to_ts)
     pool = request.app.state.db_pool
-    data = await fetch_time_to_signal_info(
-        pool, bucket, from_ts, to_ts, channel, campaign
+    data = await _within_budget(
+        request,
+        _Budget(settings.KPI_METRICS_TIMEOUT_SECONDS),
+        fetch_time_to_signal_info(pool, bucket, from_ts, to_ts, channel, campaign),
     )
     return TimeToSignalResponse(
         bucket=bucket,
@@ -229,3 +771,57 @@ async def metrics_time_to_signal(
         channel=channel,
         campaign=campaign,
     )
+
+
+@router.get(
+    "/dashboard/snapshot",
+    response_model=DashboardSnapshot,
+    summary="Get everything a dashboard refresh needs",
+    description=(
+        "Returns the latest KPI point, the KPI series, freshness and alerts in one "
+        "response. The four queries run concurrently on separate connections and "
+        "the combined result goes through the KPI read cache. Alerts are not "
+        "segmented. If from/to are omitted, default range is the last 2 hours "
+        "for minute buckets and the last 3 days for hour buckets."
+    ),
+    response_description="Latest KPI, series, freshness and alerts.",
+    responses=_BUDGET_RESPONSES,
+)
+async def dashboard_snapshot(
+    request: Request,
+    bucket: Literal["minute", "hour"] = Query(
+        "minute", description="Aggregation bucket: minute or hour."
+    ),
+    from_ts: datetime | None = Query(
+        None, alias="from", description="Range start (UTC)."
+    ),
+    to_ts: datetime | None = Query(None, alias="to", description="Range end (UTC)."),
+    channel: str | None = Query(None, description="Optional channel filter."),
+    campaign: str | None = Query(None, description="Optional campaign filter."),
+    limit: int = Query(2000, ge=1, le=5000, description="Maximum series points."),
+    alerts_limit: int = Query(
+        50, ge=1, le=2000, description="Maximum alerts to return."
+    ),
+) -> DashboardSnapshot:
+    now = datetime.now(timezone.utc)
+    to_ts = to_ts or now
+    default_span = timedelta(hours=2) if bucket == "minute" else timedelta(days=3)
+    from_ts = from_ts or (to_ts - default_span)
+    _ensure_range(from_ts, to_ts)
+    try:
+        return await _within_budget(
+            request,
+            _Budget(settings.KPI_SERIES_TIMEOUT_SECONDS),
+            fetch_dashboard_snapshot(
+                request.app.state.db_pool,
+                bucket,
+                from_ts,
+                to_ts,
+                channel,
+                campaign,
+                series_limit=limit,
+                alerts_limit=alerts_limit,
+            ),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -31,6 +31,22 @@ class IngestResponse(BaseModel):
     event_id: str
 
 
+class BatchItemResult(BaseModel):
+    index: int
+    status: Literal["accepted", "spooled", "duplicate", "rejected", "failed"]
+    event_id: str | None = None
+    error: str | None = None
+
+
+class BatchIngestResponse(BaseModel):
+    accepted: int
+    spooled: int
+    duplicate: int
+    rejected: int
+    failed: int
+    results: list[BatchItemResult]
+
+
 class KpiPoint(BaseModel):
     bucket: datetime
     revenue: float
@@ -46,11 +62,29 @@ class KpiSeries(BaseModel):
     bucket: str
     from_ts: datetime
     to_ts: datetime
+    channel: str | None = None
+    campaign: str | None = None
+    next_cursor: str | None = None
+    tiers: list[str] | None = None
+    points: list[KpiPoint]
+
+
+class KpiSegmentSeries(BaseModel):
     channel: str | None = None
     campaign: str | None = None
     points: list[KpiPoint]
 
 
+class KpiBreakdown(BaseModel):
+    bucket: str
+    by: str
+    from_ts: datetime
+    to_ts: datetime
+    top: int | None = None
+    totals: list[KpiPoint]
+    segments: list[KpiSegmentSeries]
+
+
 class KpiLatest(BaseModel):
     bucket: str
     channel: str | None = None
@@ -64,6 +98,7 @@ class AlertType(str, Enum):
 
 
 class AlertItem(BaseModel):
+    id: int | None = None
     bucket: datetime
     kpi: str
     alert_type: AlertType | None = None
@@ -77,6 +112,7 @@ class AlertItem(BaseModel):
 class AlertSeries(BaseModel):
     from_ts: datetime
     to_ts: datetime
+    next_cursor: str | None = None
     items: list[AlertItem]
 
 
@@ -90,6 +126,10 @@ class FreshnessResponse(BaseModel):
     campaign: str | None = None
 
 
+class KpiStreamUpdate(KpiLatest):
+    freshness: FreshnessResponse
+
+
 class TimeToSignalItem(BaseModel):
     avg_seconds: float | None = None
     max_seconds: float | None = None
@@ -103,3 +143,15 @@ class TimeToSignalResponse(BaseModel):
     sessions: TimeToSignalItem
     channel: str | None = None
     campaign: str | None = None
+
+
+class DashboardSnapshot(BaseModel):
+    bucket: str
+    from_ts: datetime
+    to_ts: datetime
+    channel: str | None = None
+    campaign: str | None = None
+    latest: KpiPoint | None = None
+    series: list[KpiPoint]
+    freshness: FreshnessResponse
+    alerts: list[AlertItem]
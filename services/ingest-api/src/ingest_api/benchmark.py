@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from fastapi import FastAPI
+
+from ingest_api.api.schemas import OrderEvent
+from ingest_api.main import app as ingest_app
+from ingest_api.services.counters import LocalCounters
+from ingest_api.services.ingest_service import to_payload_bytes, to_payload_json
+from ingest_api.services.publisher import SYNC, Publisher
+from ingest_api.settings import get_settings
+
+settings = get_settings()
+BASE_TIME = datetime(2026, 2, 3, 10, 0, tzinfo=timezone.utc)
+
+
+@dataclass
+class BenchConfig:
+    requests: int = 5_000
+    seed: int = 42
+
+
+# Report and comparison format shared with stream_processor.benchmark; kept as a
+# local copy because the two services ship in separate images.
+@dataclass
+class BenchResult:
+    name: str
+    operations: int
+    seconds: float
+    ops_per_second: float
+    peak_memory_bytes: int
+
+
+class _NullProducer:
+    async def send(self, topic: str, value: bytes, key: bytes) -> asyncio.Future:
+        delivery = asyncio.get_running_loop().create_future()
+        delivery.set_result(None)
+        return delivery
+
+
+def build_app() -> FastAPI:
+    # The real application, routes and middleware included; only the lifespan
+    # resources are replaced, with Kafka swapped for a no-op producer.
+    producer = _NullProducer()
+    ingest_app.state.publisher = Publisher(producer, mode=SYNC)  # type: ignore[arg-type]
+    ingest_app.state.spool = None
+    ingest_app.state.idempotency = None
+    ingest_app.state.counters = LocalCounters()
+    return ingest_app
+
+
+def generate_orders(config: BenchConfig) -> list[dict[str, Any]]:
+    rng = random.Random(config.seed)
+    return [
+        {
+            "order_id": f"o-{index}",
+            "customer_id": f"c-{rng.randrange(10_000)}",
+            "amount": rng.choice((99.0, 129.0, 149.0, 199.0, 249.0)),
+            "currency": "RUB",
+            "channel": rng.choice(("web", "ads", "marketplace")),
+            "campaign": rng.choice(("spring", "promo", "brand")),
+            "event_time": (BASE_TIME + timedelta(seconds=index)).isoformat(),
+        }
+        for index in range(config.requests)
+    ]
+
+
+Serializer = Callable[[OrderEvent, str], bytes]
+
+
+async def _post(app: FastAPI, path: str, body: bytes) -> tuple[int, bytes]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"x-api-key", settings.API_KEY.encode("utf-8")),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = 0
+    chunks: list[bytes] = []
+
+    async def receive() -> dict[str, Any]:
+        if messages:
+            return messages.pop()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def ingest_orders(
+    app: FastAPI, bodies: list[bytes], serialize: Serializer
+) -> None:
+    app.state.serialize = serialize
+    for body in bodies:
+        status, response = await _post(app, "/events/order", body)
+        if status != 200 or json.loads(response)["status"] != "accepted":
+            raise RuntimeError(f"POST /events/order returned {status}: {response!r}")
+
+
+def _measure(name: str, operations: int, run: Callable[[], None]) -> BenchResult:
+    started = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - started
+
+    # Memory is sampled in a separate pass: tracing skews timings by several x.
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(
+        name=name,
+        operations=operations,
+        seconds=round(seconds, 6),
+        ops_per_second=round(operations / seconds, 1) if seconds > 0 else 0.0,
+        peak_memory_bytes=peak,
+    )
+
+
+def run_benchmarks(config: BenchConfig) -> list[BenchResult]:
+    orders = generate_orders(config)
+    bodies = [json.dumps(order).encode("utf-8") for order in orders]
+    events = [OrderEvent.model_validate(order) for order in orders]
+    app = build_app()
+
+    def bench_serialize(serialize: Serializer) -> Callable[[], None]:
+        def run() -> None:
+            for event in events:
+                serialize(event, event.order_id)
+
+        return run
+
+    def bench_ingest_order(serialize: Serializer) -> Callable[[], None]:
+        def run() -> None:
+            asyncio.run(ingest_orders(app, bodies, serialize))
+
+        return run
+
+    operations = len(orders)
+    return [
+        _measure("serialize_json_dumps", operations, bench_serialize(to_payload_json)),
+        _measure(
+            "serialize_pydantic_json", operations, bench_serialize(to_payload_bytes)
+        ),
+        _measure(
+            "ingest_order_json_dumps", operations, bench_ingest_order(to_payload_json)
+        ),
+        _measure(
+            "ingest_order_pydantic_json",
+            operations,
+            bench_ingest_order(to_payload_bytes),
+        ),
+    ]
+
+
+def build_report(
+    config: BenchConfig, results: list[BenchResult], label: str | None = None
+) -> dict[str, Any]:
+    return {
+        "label": label,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "config": asdict(config),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def compare_reports(
+    baseline: dict[str, Any], current: dict[str, Any]
+) -> dict[str, dict[str, float]]:
+    previous = {item["name"]: item for item in baseline.get("results", [])}
+    comparison: dict[str, dict[str, float]] = {}
+    for item in current["results"]:
+        before = previous.get(item["name"])
+        if before is None or not before["ops_per_second"]:
+            continue
+        comparison[item["name"]] = {
+            "ops_per_second_ratio": round(
+                item["ops_per_second"] / before["ops_per_second"], 3
+            ),
+            "peak_memory_ratio": round(
+                item["peak_memory_bytes"] / max(1, before["peak_memory_bytes"]), 3
+            ),
+        }
+    return comparison
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    defaults = BenchConfig()
+    parser = argparse.ArgumentParser(
+        description="Benchmark ingest serialization and the /events/order path."
+    )
+    parser.add_argument("--requests", type=int, default=defaults.requests)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--label", help="Free-form label, e.g. a commit hash.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    parser.add_argument(
+        "--compare", type=Path, help="Previous JSON report to compare against."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    config = BenchConfig(requests=args.requests, seed=args.seed)
+    report = build_report(config, run_benchmarks(config), args.label)
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        report["comparison"] = compare_reports(baseline, report)
+
+    rendered = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+    print(rendered)
+
+
+if __name__ == "__main__":
+    main()
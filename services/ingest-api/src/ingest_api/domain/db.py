@@ -1,8 +1,186 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
 import asyncpg
 
 from ingest_api.settings import get_settings
 
+logger = logging.getLogger("ingest-api")
+
+# Replay lag of a standby; 0 on a primary and on a standby that has replayed
+# everything it received, so an idle primary does not read as lag.
+_REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END::DOUBLE PRECISION
+"""
+
+
+# Upper bounds of the pool acquire wait histogram, in milliseconds.
+_WAIT_BUCKETS_MS = (1, 5, 25, 100, 500, 2500)
+
+
+# time.monotonic() by which the queries of the current API request must finish.
+# Tasks copy it when they are created, so loads started for a request carry
+# its deadline, including loads shared through the read cache.
+_query_deadline: ContextVar[float | None] = ContextVar("query_deadline", default=None)
+
+
+@contextmanager
+def query_deadline(deadline: float) -> Iterator[None]:
+    token = _query_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _query_deadline.reset(token)
+
+
+def query_timeout() -> float | None:
+    # Passed as timeout= to asyncpg, which cancels the statement in Postgres
+    # once it expires. None falls back to the pool's command_timeout.
+    deadline = _query_deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.001)
+
+
+def _server_settings() -> dict[str, str]:
+    # Backstop for queries nobody cancels, e.g. export cursors; API requests
+    # pass their own, shorter budget with each query.
+    return {"statement_timeout": str(get_settings().DB_STATEMENT_TIMEOUT_MS)}
+
 
 async def create_pool() -> asyncpg.Pool:
     settings = get_settings()
-    return await asyncpg.create_pool(dsn=settings.DB_DSN, min_size=1, max_size=5)
+    return await asyncpg.create_pool(
+        dsn=settings.DB_DSN,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        server_settings=_server_settings(),
+    )
+
+
+async def create_read_pool() -> asyncpg.Pool | None:
+    settings = get_settings()
+    if not settings.DB_READ_DSN:
+        return None
+    return await asyncpg.create_pool(
+        dsn=settings.DB_READ_DSN,
+        min_size=settings.DB_READ_POOL_MIN_SIZE,
+        max_size=settings.DB_READ_POOL_MAX_SIZE,
+        statement_cache_size=settings.DB_READ_STATEMENT_CACHE_SIZE,
+        command_timeout=settings.DB_READ_COMMAND_TIMEOUT_SECONDS,
+        server_settings=_server_settings(),
+    )
+
+
+class ReadRouter:
+    # Stands in for a pool in kpi_repository: reads go to the replica while
+    # its measured lag is within max_lag_seconds and to the primary otherwise,
+    # including before the first check and whenever the check fails.
+
+    def __init__(
+        self,
+        primary: asyncpg.Pool,
+        replica: asyncpg.Pool | None = None,
+        max_lag_seconds: float = 5.0,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_seconds: float | None = None
+        self.use_replica = False
+        self.fallbacks = 0
+        self.acquired = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._wait_counts = [0] * (len(_WAIT_BUCKETS_MS) + 1)
+
+    @property
+    def pool(self) -> asyncpg.Pool:
+        if self.replica is not None and self.use_replica:
+            return self.replica
+        return self.primary
+
+    @asynccontextmanager
+    async def acquire(self):
+        pool = self.pool
+        started = time.perf_counter()
+        async with pool.acquire() as conn:
+            self._record_wait(time.perf_counter() - started)
+            yield conn
+
+    def _record_wait(self, seconds: float) -> None:
+        self.acquired += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        self._wait_counts[bisect_left(_WAIT_BUCKETS_MS, seconds * 1000)] += 1
+
+    def record_lag(self, lag_seconds: float | None) -> None:
+        healthy = lag_seconds is not None and lag_seconds <= self.max_lag_seconds
+        if self.use_replica and not healthy:
+            self.fallbacks += 1
+            logger.warning(
+                "Read replica lag %s exceeds %ss, reading from the primary",
+                lag_seconds,
+                self.max_lag_seconds,
+            )
+        elif healthy and not self.use_replica:
+            logger.info("Read replica caught up, routing KPI reads to it")
+        self.lag_seconds = lag_seconds
+        self.use_replica = healthy
+
+    async def check_lag(self, timeout_seconds: float = 1.0) -> None:
+        if self.replica is None:
+            return
+        try:
+            async with self.replica.acquire(timeout=timeout_seconds) as conn:
+                lag = await conn.fetchval(_REPLICA_LAG_QUERY, timeout=timeout_seconds)
+        except (OSError, TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError):
+            lag = None
+        self.record_lag(lag)
+
+    async def monitor(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.check_lag(timeout_seconds=interval_seconds)
+
+    async def close(self) -> None:
+        if self.replica is not None:
+            await self.replica.close()
+        await self.primary.close()
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "replica": self.replica is not None,
+            "using_replica": self.replica is not None and self.use_replica,
+            "lag_seconds": self.lag_seconds,
+            "fallbacks": self.fallbacks,
+        }
+
+    def acquire_stats(self) -> dict[str, object]:
+        # Cumulative counts per upper bound, like a Prometheus histogram.
+        labels = [f"le_{bound}ms" for bound in _WAIT_BUCKETS_MS] + ["le_inf"]
+        cumulative: dict[str, int] = {}
+        total = 0
+        for label, count in zip(labels, self._wait_counts):
+            total += count
+            cumulative[label] = total
+        mean = self.wait_seconds_total / self.acquired if self.acquired else 0.0
+        pool = self.pool
+        return {
+            "acquired": self.acquired,
+            "wait_ms_mean": round(mean * 1000, 3),
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            "wait_ms_buckets": cumulative,
+            "pool_size": pool.get_size(),
+            "pool_idle": pool.get_idle_size(),
+            "pool_max": pool.get_max_size(),
+        }
@@ -1,67 +1,24 @@
-from datetime import datetime
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 
 import asyncpg
 
+from ingest_api.domain.db import query_timeout
+
 _KPI_TABLES = {
     "minute": "kpi_minute_view",
     "hour": "kpi_hour_view",
 }
 
+# Continuous aggregates over the raw tables, grouped by channel and campaign.
+_SEGMENT_TABLES = {
+    "minute": ("orders_segment_minute", "sessions_segment_minute"),
+    "hour": ("orders_segment_hour", "sessions_segment_hour"),
+    "day": ("orders_segment_day", "sessions_segment_day"),
+}
 
-def _get_table(bucket: str) -> str:
-    table = _KPI_TABLES.get(bucket)
-    if table is None:
-        raise ValueError(f"Unsupported bucket: {bucket}")
-    return table
-
-
-async def fetch_range_rows(
-    pool: asyncpg.Pool,
-    bucket: str,
-    from_ts: datetime,
-    to_ts: datetime,
-    limit: int,
-    channel: str | None = None,
-    campaign: str | None = None,
-) -> list[dict]:
-    if channel is None and campaign is None:
-        table = _get_table(bucket)
-        query = f"""
-            SELECT bucket, revenue, order_count, average_order_value,
-                   view_count, checkout_count, purchase_count, conversion_rate
-            FROM {table}
-            WHERE bucket >= $1 AND bucket <= $2
-            ORDER BY bucket ASC
-            LIMIT $3
-        """
-        async with pool.acquire() as conn:
-            rows = await conn.fetch(query, from_ts, to_ts, limit)
-        return [dict(row) for row in rows]
-
-    query = """
-        WITH orders_agg AS (
-            SELECT date_trunc($1, event_time) AS bucket,
-                   SUM(amount) AS revenue,
-                   COUNT(*) AS order_count
-            FROM orders
-            WHERE event_time >= $2 AND event_time <= $3
-              AND ($4::text IS NULL OR channel = $4)
-              AND ($5::text IS NULL OR campaign = $5)
-            GROUP BY 1
-        ),
-        sessions_agg AS (
-            SELECT date_trunc($1, event_time) AS bucket,
-                   COUNT(*) FILTER (WHERE event_type = 'view') AS view_count,
-                   COUNT(*) FILTER (WHERE event_type = 'checkout') AS checkout_count,
-                   COUNT(*) FILTER (WHERE event_type = 'purchase') AS purchase_count
-            FROM sessions
-            WHERE event_time >= $2 AND event_time <= $3
-              AND ($4::text IS NULL OR channel = $4)
-              AND ($5::text IS NULL OR campaign = $5)
-            GROUP BY 1
-        )
-        SELECT
-            COALESCE(o.bucket, s.bucket) AS bucket,
+_SEGMENT_METRICS = """
             COALESCE(o.revenue, 0) AS revenue,
             COALESCE(o.order_count, 0) AS order_count,
             CASE
@@ -83,17 +40,447 @@ async def fetch_range_rows(
                     2
                 )::DOUBLE PRECISION
                 ELSE 0::DOUBLE PRECISION
-            END AS conversion_rate
+            END AS conversion_rate"""
+
+_SEGMENT_SELECT = f"""
+        SELECT
+            COALESCE(o.bucket, s.bucket) AS bucket,{_SEGMENT_METRICS}
         FROM orders_agg o
         FULL OUTER JOIN sessions_agg s ON o.bucket = s.bucket
+"""
+
+_BREAKDOWN_DIMENSIONS = {
+    "channel": ("channel",),
+    "campaign": ("campaign",),
+    "channel,campaign": ("channel", "campaign"),
+}
+
+
+def _get_table(bucket: str) -> str:
+    table = _KPI_TABLES.get(bucket)
+    if table is None:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    return table
+
+
+def _get_segment_tables(bucket: str) -> tuple[str, str]:
+    tables = _SEGMENT_TABLES.get(bucket)
+    if tables is None:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    return tables
+
+
+def _segment_filter(
+    channel: str | None, campaign: str | None, first_param: int
+) -> tuple[str, list[str]]:
+    clauses: list[str] = []
+    args: list[str] = []
+    for column, value in (("channel", channel), ("campaign", campaign)):
+        if value is not None:
+            args.append(value)
+            clauses.append(f"AND {column} = ${first_param + len(args) - 1}")
+    return " ".join(clauses), args
+
+
+def _segment_query(
+    bucket: str,
+    bucket_predicate: str,
+    segment_filter: str,
+    bucket_expr: str = "bucket",
+) -> str:
+    orders_table, sessions_table = _get_segment_tables(bucket)
+    return f"""
+        WITH orders_agg AS (
+            SELECT {bucket_expr} AS bucket,
+                   SUM(revenue) AS revenue,
+                   SUM(order_count)::BIGINT AS order_count
+            FROM {orders_table}
+            WHERE {bucket_predicate} {segment_filter}
+            GROUP BY 1
+        ),
+        sessions_agg AS (
+            SELECT {bucket_expr} AS bucket,
+                   SUM(view_count)::BIGINT AS view_count,
+                   SUM(checkout_count)::BIGINT AS checkout_count,
+                   SUM(purchase_count)::BIGINT AS purchase_count
+            FROM {sessions_table}
+            WHERE {bucket_predicate} {segment_filter}
+            GROUP BY 1
+        )
+        {_SEGMENT_SELECT}
+    """
+
+
+def _breakdown_query(bucket: str, by: str) -> str:
+    dimensions = _BREAKDOWN_DIMENSIONS.get(by)
+    if dimensions is None:
+        raise ValueError(f"Unsupported breakdown: {by}")
+    orders_table, sessions_table = _get_segment_tables(bucket)
+    columns = ", ".join(
+        column if column in dimensions else f"NULL::TEXT AS {column}"
+        for column in ("channel", "campaign")
+    )
+    grouped = ", ".join(dimensions)
+    join = " AND ".join(
+        f"o.{column} IS NOT DISTINCT FROM s.{column}" for column in dimensions
+    )
+    # level is 0 for segment rows and non-zero for the per-bucket totals that
+    # the second grouping set adds. Segments are ranked by revenue over the
+    # whole range; totals always cover every segment.
+    return f"""
+        WITH orders_agg AS (
+            SELECT bucket, {columns}, GROUPING({grouped}) AS level,
+                   SUM(revenue) AS revenue,
+                   SUM(order_count)::BIGINT AS order_count
+            FROM {orders_table}
+            WHERE bucket >= $1 AND bucket <= $2
+            GROUP BY GROUPING SETS ((bucket, {grouped}), (bucket))
+        ),
+        sessions_agg AS (
+            SELECT bucket, {columns}, GROUPING({grouped}) AS level,
+                   SUM(view_count)::BIGINT AS view_count,
+                   SUM(checkout_count)::BIGINT AS checkout_count,
+                   SUM(purchase_count)::BIGINT AS purchase_count
+            FROM {sessions_table}
+            WHERE bucket >= $1 AND bucket <= $2
+            GROUP BY GROUPING SETS ((bucket, {grouped}), (bucket))
+        ),
+        breakdown AS (
+            SELECT
+                COALESCE(o.level, s.level) AS level,
+                COALESCE(o.channel, s.channel) AS channel,
+                COALESCE(o.campaign, s.campaign) AS campaign,
+                COALESCE(o.bucket, s.bucket) AS bucket,{_SEGMENT_METRICS}
+            FROM orders_agg o
+            FULL OUTER JOIN sessions_agg s
+                ON o.bucket = s.bucket AND o.level = s.level AND {join}
+        ),
+        ranked AS (
+            SELECT channel, campaign,
+                   ROW_NUMBER() OVER (
+                       ORDER BY SUM(revenue) DESC, channel, campaign
+                   ) AS segment_rank
+            FROM breakdown
+            WHERE level = 0
+            GROUP BY channel, campaign
+        )
+        SELECT b.*, r.segment_rank
+        FROM breakdown b
+        LEFT JOIN ranked r
+            ON b.level = 0
+            AND r.channel IS NOT DISTINCT FROM b.channel
+            AND r.campaign IS NOT DISTINCT FROM b.campaign
+        WHERE b.level <> 0 OR $3::INT IS NULL OR r.segment_rank <= $3
+        ORDER BY b.bucket ASC, r.segment_rank ASC NULLS FIRST
+    """
+
+
+# Rollups of kpi_minute / kpi_hour into wider buckets. Ratios are recomputed
+# from the summed counters, the same way the kpi views define them.
+_ROLLUP_QUERY = """
+    WITH rolled AS (
+        SELECT time_bucket($3::interval, bucket) AS bucket,
+               SUM(revenue) AS revenue,
+               SUM(order_count)::BIGINT AS order_count,
+               SUM(view_count)::BIGINT AS view_count,
+               SUM(checkout_count)::BIGINT AS checkout_count,
+               SUM(purchase_count)::BIGINT AS purchase_count
+        FROM {table}
+        WHERE bucket >= $1 AND bucket <= $2
+        GROUP BY 1
+    )
+    SELECT
+        bucket,
+        revenue,
+        order_count,
+        CASE
+            WHEN order_count > 0
+            THEN ROUND(revenue / order_count::NUMERIC, 2)::DOUBLE PRECISION
+            ELSE 0::DOUBLE PRECISION
+        END AS average_order_value,
+        view_count,
+        checkout_count,
+        purchase_count,
+        CASE
+            WHEN view_count > 0
+            THEN ROUND(purchase_count::NUMERIC / view_count::NUMERIC, 2)::DOUBLE PRECISION
+            ELSE 0::DOUBLE PRECISION
+        END AS conversion_rate
+    FROM rolled
+    ORDER BY bucket ASC
+"""
+
+_SOURCE_TABLES = {"minute": "kpi_minute", "hour": "kpi_hour", "day": "kpi_day"}
+
+# Stored tiers from coarsest to finest.
+TIER_SECONDS = {"day": 86400, "hour": 3600, "minute": 60}
+
+
+@dataclass(frozen=True)
+class TierRange:
+    tier: str
+    from_ts: datetime
+    to_ts: datetime
+
+
+def plan_tiers(
+    width_seconds: int,
+    from_ts: datetime,
+    to_ts: datetime,
+    day_complete_before: datetime,
+) -> list[TierRange]:
+    # The coarsest tier whose buckets divide the width reads the fewest rows.
+    # The day tier is materialized only, so buckets from day_complete_before on
+    # come from kpi_hour instead; callers align that boundary to the width so
+    # no output bucket straddles two tiers.
+    tier = next(
+        name for name, seconds in TIER_SECONDS.items() if width_seconds % seconds == 0
+    )
+    if tier != "day" or to_ts < day_complete_before:
+        return [TierRange(tier, from_ts, to_ts)]
+    if from_ts >= day_complete_before:
+        return [TierRange("hour", from_ts, to_ts)]
+    return [
+        TierRange("day", from_ts, day_complete_before - timedelta(microseconds=1)),
+        TierRange("hour", day_complete_before, to_ts),
+    ]
+
+
+# Builds the KpiPoint JSON documents in Postgres with the same field order and
+# formats pydantic produces, so the rows never become Python objects.
+_POINTS_JSON = """
+    SELECT COALESCE(
+        json_agg(
+            json_build_object(
+                'bucket', to_char(
+                    p.bucket AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"'
+                ),
+                'revenue', p.revenue::DOUBLE PRECISION,
+                'order_count', p.order_count::BIGINT,
+                'average_order_value', p.average_order_value::DOUBLE PRECISION,
+                'view_count', p.view_count::BIGINT,
+                'checkout_count', p.checkout_count::BIGINT,
+                'purchase_count', p.purchase_count::BIGINT,
+                'conversion_rate', p.conversion_rate::DOUBLE PRECISION
+            )
+            ORDER BY p.bucket
+        ),
+        '[]'::json
+    )::text AS points,
+    COUNT(*) AS count,
+    MAX(p.bucket) AS last_bucket
+    FROM ({query}) p
+"""
+
+
+def _range_query(
+    bucket: str, channel: str | None, campaign: str | None
+) -> tuple[str, list[str]]:
+    if channel is None and campaign is None:
+        table = _get_table(bucket)
+        query = f"""
+            SELECT bucket, revenue, order_count, average_order_value,
+                   view_count, checkout_count, purchase_count, conversion_rate
+            FROM {table}
+            WHERE bucket >= $1 AND bucket <= $2
+            ORDER BY bucket ASC
+            LIMIT $3
+        """
+        return query, []
+
+    segment_filter, segment_args = _segment_filter(channel, campaign, 4)
+    query = f"""
+        {_segment_query(bucket, "bucket >= $1 AND bucket <= $2", segment_filter)}
+        ORDER BY bucket ASC
+        LIMIT $3
+    """
+    return query, segment_args
+
+
+async def fetch_range_rows(
+    pool: asyncpg.Pool,
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    limit: int,
+    channel: str | None = None,
+    campaign: str | None = None,
+) -> list[dict]:
+    query, segment_args = _range_query(bucket, channel, campaign)
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            query, from_ts, to_ts, limit, *segment_args, timeout=query_timeout()
+        )
+    return [dict(row) for row in rows]
+
+
+async def fetch_range_json(
+    pool: asyncpg.Pool,
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    limit: int,
+    channel: str | None = None,
+    campaign: str | None = None,
+) -> tuple[bytes, int, datetime | None]:
+    query, segment_args = _range_query(bucket, channel, campaign)
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(
+            _POINTS_JSON.format(query=query),
+            from_ts,
+            to_ts,
+            limit,
+            *segment_args,
+            timeout=query_timeout(),
+        )
+    return row["points"].encode("utf-8"), row["count"], row["last_bucket"]
+
+
+async def iter_range_rows(
+    conn: asyncpg.Connection,
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    limit: int | None,
+    channel: str | None = None,
+    campaign: str | None = None,
+    batch_rows: int = 1000,
+) -> AsyncIterator[list[asyncpg.Record]]:
+    # A server-side cursor keeps memory flat for exports of any size; it only
+    # lives inside a transaction. LIMIT NULL means no limit.
+    query, segment_args = _range_query(bucket, channel, campaign)
+    async with conn.transaction(readonly=True):
+        cursor = await conn.cursor(query, from_ts, to_ts, limit, *segment_args)
+        while rows := await cursor.fetch(batch_rows):
+            yield rows
+
+
+async def fetch_rollup_rows(
+    pool: asyncpg.Pool,
+    source: str,
+    width: timedelta,
+    from_ts: datetime,
+    to_ts: datetime,
+    channel: str | None = None,
+    campaign: str | None = None,
+) -> list[dict]:
+    if channel is None and campaign is None:
+        table = _SOURCE_TABLES.get(source)
+        if table is None:
+            raise ValueError(f"Unsupported bucket: {source}")
+        query = _ROLLUP_QUERY.format(table=table)
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                query, from_ts, to_ts, width, timeout=query_timeout()
+            )
+        return [dict(row) for row in rows]
+
+    segment_filter, segment_args = _segment_filter(channel, campaign, 4)
+    query = f"""
+        {_segment_query(
+            source,
+            "bucket >= $1 AND bucket <= $2",
+            segment_filter,
+            bucket_expr="time_bucket($3::interval, bucket)",
+        )}
         ORDER BY bucket ASC
-        LIMIT $6
     """
     async with pool.acquire() as conn:
-        rows = await conn.fetch(query, bucket, from_ts, to_ts, channel, campaign, limit)
+        rows = await conn.fetch(
+            query, from_ts, to_ts, width, *segment_args, timeout=query_timeout()
+        )
+    return [dict(row) for row in rows]
+
+
+async def fetch_breakdown_rows(
+    pool: asyncpg.Pool,
+    bucket: str,
+    by: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    top: int | None = None,
+) -> list[dict]:
+    query = _breakdown_query(bucket, by)
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query, from_ts, to_ts, top, timeout=query_timeout())
     return [dict(row) for row in rows]
 
 
+# Tables whose updated_at versions each tier. kpi_day has no updated_at; it
+# is built from kpi_hour, so hour rows version it.
+_VERSION_TABLES = {"minute": "kpi_minute", "hour": "kpi_hour", "day": "kpi_hour"}
+
+
+def _get_version_table(bucket: str) -> str:
+    table = _VERSION_TABLES.get(bucket)
+    if table is None:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    return table
+
+
+async def fetch_range_version(
+    pool: asyncpg.Pool, bucket: str, from_ts: datetime, to_ts: datetime
+) -> datetime | None:
+    # The processor bumps updated_at of every bucket it writes, including
+    # buckets that only changed for one segment, so this versions segment
+    # queries over the same range too.
+    query = f"""
+        SELECT MAX(updated_at) FROM {_get_version_table(bucket)}
+        WHERE bucket >= $1 AND bucket <= $2
+    """
+    async with pool.acquire() as conn:
+        return await conn.fetchval(query, from_ts, to_ts, timeout=query_timeout())
+
+
+# Day tier aggregates, unfiltered and by segment. They are materialized only,
+# so their rows change when the refresh policy runs, not when kpi_hour does.
+_DAY_VIEWS = {
+    False: ["kpi_day"],
+    True: ["orders_segment_day", "sessions_segment_day"],
+}
+
+
+async def fetch_day_refresh_version(
+    pool: asyncpg.Pool, segmented: bool = False
+) -> datetime | None:
+    query = """
+        SELECT MAX(s.last_successful_finish)
+        FROM timescaledb_information.continuous_aggregates c
+        JOIN timescaledb_information.job_stats s
+          ON s.hypertable_schema = c.materialization_hypertable_schema
+         AND s.hypertable_name = c.materialization_hypertable_name
+        WHERE c.view_name = ANY($1::text[])
+    """
+    async with pool.acquire() as conn:
+        return await conn.fetchval(
+            query, _DAY_VIEWS[segmented], timeout=query_timeout()
+        )
+
+
+async def fetch_table_version(pool: asyncpg.Pool, bucket: str) -> datetime | None:
+    query = f"SELECT MAX(updated_at) FROM {_get_version_table(bucket)}"
+    async with pool.acquire() as conn:
+        return await conn.fetchval(query, timeout=query_timeout())
+
+
+async def fetch_alerts_version(
+    pool: asyncpg.Pool, from_ts: datetime, to_ts: datetime, kpi: str | None = None
+) -> tuple[int, int | None]:
+    # Alerts are insert-only: the count and newest id of a window change
+    # whenever an alert enters or leaves it.
+    query = """
+        SELECT COUNT(*) AS count, MAX(id) AS max_id
+        FROM alerts
+        WHERE created_at >= $1 AND created_at <= $2
+          AND ($3::text IS NULL OR kpi = $3)
+    """
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(
+            query, from_ts, to_ts, kpi, timeout=query_timeout()
+        )
+    return row["count"], row["max_id"]
+
+
 async def fetch_latest_row(
     pool: asyncpg.Pool,
     bucket: str,
@@ -110,60 +497,20 @@ async def fetch_latest_row(
             LIMIT 1
         """
         async with pool.acquire() as conn:
-            row = await conn.fetchrow(query)
+            row = await conn.fetchrow(query, timeout=query_timeout())
         return dict(row) if row else None
 
-    query = """
-        WITH orders_agg AS (
-            SELECT date_trunc($1, event_time) AS bucket,
-                   SUM(amount) AS revenue,
-                   COUNT(*) AS order_count
-            FROM orders
-            WHERE ($2::text IS NULL OR channel = $2)
-              AND ($3::text IS NULL OR campaign = $3)
-            GROUP BY 1
-        ),
-        sessions_agg AS (
-            SELECT date_trunc($1, event_time) AS bucket,
-                   COUNT(*) FILTER (WHERE event_type = 'view') AS view_count,
-                   COUNT(*) FILTER (WHERE event_type = 'checkout') AS checkout_count,
-                   COUNT(*) FILTER (WHERE event_type = 'purchase') AS purchase_count
-            FROM sessions
-            WHERE ($2::text IS NULL OR channel = $2)
-              AND ($3::text IS NULL OR campaign = $3)
-            GROUP BY 1
+    orders_table, sessions_table = _get_segment_tables(bucket)
+    segment_filter, segment_args = _segment_filter(channel, campaign, 1)
+    latest = f"""
+        bucket = GREATEST(
+            (SELECT MAX(bucket) FROM {orders_table} WHERE TRUE {segment_filter}),
+            (SELECT MAX(bucket) FROM {sessions_table} WHERE TRUE {segment_filter})
         )
-        SELECT
-            COALESCE(o.bucket, s.bucket) AS bucket,
-            COALESCE(o.revenue, 0) AS revenue,
-            COALESCE(o.order_count, 0) AS order_count,
-            CASE
-                WHEN COALESCE(o.order_count, 0) > 0
-                THEN ROUND(
-                    COALESCE(o.revenue, 0) / NULLIF(COALESCE(o.order_count, 0), 0)::NUMERIC,
-                    2
-                )::DOUBLE PRECISION
-                ELSE 0::DOUBLE PRECISION
-            END AS average_order_value,
-            COALESCE(s.view_count, 0) AS view_count,
-            COALESCE(s.checkout_count, 0) AS checkout_count,
-            COALESCE(s.purchase_count, 0) AS purchase_count,
-            CASE
-                WHEN COALESCE(s.view_count, 0) > 0
-                THEN ROUND(
-                    COALESCE(s.purchase_count, 0)::NUMERIC
-                    / NULLIF(COALESCE(s.view_count, 0), 0)::NUMERIC,
-                    2
-                )::DOUBLE PRECISION
-                ELSE 0::DOUBLE PRECISION
-            END AS conversion_rate
-        FROM orders_agg o
-        FULL OUTER JOIN sessions_agg s ON o.bucket = s.bucket
-        ORDER BY bucket DESC
-        LIMIT 1
     """
+    query = _segment_query(bucket, latest, segment_filter)
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(query, bucket, channel, campaign)
+        row = await conn.fetchrow(query, *segment_args, timeout=query_timeout())
     return dict(row) if row else None
 
 
@@ -173,18 +520,25 @@ async def fetch_alerts_rows(
     to_ts: datetime,
     limit: int,
     kpi: str | None = None,
+    after: tuple[datetime, int] | None = None,
 ) -> list[dict]:
-    query = """
-        SELECT bucket, kpi, current_value, baseline_value, delta_pct,
+    # The keyset predicate is only added when paging, so both variants are a
+    # plain range scan on alerts (created_at DESC, id DESC).
+    keyset = "AND (created_at, id) < ($5, $6)" if after is not None else ""
+    query = f"""
+        SELECT id, bucket, kpi, current_value, baseline_value, delta_pct,
                direction, created_at
         FROM alerts
         WHERE created_at >= $1 AND created_at <= $2
           AND ($4::text IS NULL OR kpi = $4)
-        ORDER BY created_at DESC
+          {keyset}
+        ORDER BY created_at DESC, id DESC
         LIMIT $3
     """
     async with pool.acquire() as conn:
-        rows = await conn.fetch(query, from_ts, to_ts, limit, kpi)
+        rows = await conn.fetch(
+            query, from_ts, to_ts, limit, kpi, *(after or ()), timeout=query_timeout()
+        )
     return [dict(row) for row in rows]
 
 
@@ -203,7 +557,9 @@ async def fetch_freshness(
                AND ($2::text IS NULL OR campaign = $2)) AS sessions_last_event_time
     """
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(query, channel, campaign)
+        row = await conn.fetchrow(
+            query, channel, campaign, timeout=query_timeout()
+        )
     return dict(row) if row else {}
 
 
@@ -241,5 +597,13 @@ async def fetch_time_to_signal(
             (SELECT MAX(EXTRACT(EPOCH FROM lag)) FROM session_lags) AS sessions_max_seconds
     """
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(query, bucket, from_ts, to_ts, channel, campaign)
+        row = await conn.fetchrow(
+            query,
+            bucket,
+            from_ts,
+            to_ts,
+            channel,
+            campaign,
+            timeout=query_timeout(),
+        )
     return dict(row) if row else {}
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
 
 import uvicorn
 from aiokafka import AIOKafkaProducer
@@ -9,8 +10,27 @@ from fastapi.security import APIKeyHeader
 
 from ingest_api.api.ingest import router as ingest_router
 from ingest_api.api.kpi import router as kpi_router
-from ingest_api.domain.db import create_pool
-from ingest_api.settings import get_settings
+from ingest_api.domain.db import ReadRouter, create_pool, create_read_pool
+from ingest_api.runtime import (
+    configure_loop,
+    start_lag_monitor,
+    stop_lag_monitor,
+    uvicorn_loop,
+)
+from ingest_api.services.counters import (
+    open_counters,
+    reset_counters,
+    sync_worker_gauges,
+)
+from ingest_api.services.flush_listener import listen_for_flushes
+from ingest_api.services.idempotency import IdempotencyCache
+from ingest_api.services.ingest_service import to_payload_bytes, to_payload_json
+from ingest_api.services.kpi_service import fetch_stream_update
+from ingest_api.services.kpi_stream import KpiStreamHub
+from ingest_api.services.limiter import AdaptiveLimiter, ConcurrencyLimitMiddleware
+from ingest_api.services.publisher import Publisher, build_producer
+from ingest_api.services.spool import DiskSpool
+from ingest_api.settings import BASE_DIR, get_settings
 
 settings = get_settings()
 logger = logging.getLogger("ingest-api")
@@ -24,24 +44,124 @@ def require_api_key(api_key: str | None = Depends(api_key_header)) -> None:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
 
+async def _cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+@asynccontextmanager
+async def _worker():
+    # Every resource registers its cleanup as soon as it exists, so a failed
+    # startup closes what was already opened and a failing shutdown step does
+    # not skip the rest; cleanups run in reverse order.
+    async with AsyncExitStack() as stack:
+        stack.callback(logger.info, "Ingest API stopped")
+        app.state.counters = open_counters(BASE_DIR / settings.RUNTIME_DIR)
+        stack.callback(app.state.counters.close)
+        app.state.producer = build_producer(settings)
+        app.state.publisher = Publisher(
+            app.state.producer,
+            mode=settings.KAFKA_PUBLISH_MODE,
+            max_in_flight=settings.KAFKA_MAX_IN_FLIGHT,
+        )
+        app.state.spool = None
+        if settings.SPOOL_ENABLED:
+            # Each worker owns the spool of its counter slot, so a restarted
+            # worker picks up the backlog its predecessor left behind.
+            slot = app.state.counters.slot
+            spool_dir = BASE_DIR / settings.SPOOL_DIR / f"worker-{slot}"
+            spool = DiskSpool(
+                spool_dir,
+                segment_bytes=settings.SPOOL_SEGMENT_BYTES,
+                fsync_interval_ms=settings.SPOOL_FSYNC_INTERVAL_MS,
+            )
+            await asyncio.to_thread(spool.open)
+            stack.push_async_callback(spool.close)
+            app.state.spool = spool
+            app.state.publisher.on_failure = spool.append
+        app.state.idempotency = None
+        if settings.IDEMPOTENCY_ENABLED:
+            app.state.idempotency = IdempotencyCache(
+                settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_KEYS
+            )
+        primary = await create_pool()
+        stack.push_async_callback(primary.close)
+        replica = await create_read_pool()
+        if replica is not None:
+            stack.push_async_callback(replica.close)
+        # Every query this API runs is a KPI read, so the router is the pool.
+        app.state.db_pool = ReadRouter(
+            primary, replica, max_lag_seconds=settings.DB_READ_MAX_LAG_SECONDS
+        )
+        if replica is not None:
+            await app.state.db_pool.check_lag()
+            replica_monitor = asyncio.create_task(
+                app.state.db_pool.monitor(settings.DB_READ_LAG_CHECK_SECONDS)
+            )
+            stack.push_async_callback(_cancel, replica_monitor)
+        producer: AIOKafkaProducer = app.state.producer
+        # stop() is safe on a producer whose start() failed halfway.
+        stack.push_async_callback(producer.stop)
+        await producer.start()
+        stack.push_async_callback(app.state.publisher.flush)
+        if app.state.spool is not None:
+            spool_drainer = asyncio.create_task(
+                app.state.spool.drain(
+                    app.state.publisher.deliver,
+                    batch_size=settings.SPOOL_DRAIN_BATCH,
+                    retry_seconds=settings.SPOOL_RETRY_SECONDS,
+                )
+            )
+            stack.push_async_callback(_cancel, spool_drainer)
+        kpi_stream = asyncio.create_task(
+            app.state.kpi_stream.run(
+                lambda topic: fetch_stream_update(app.state.db_pool, *topic)
+            )
+        )
+        stack.push_async_callback(_cancel, kpi_stream)
+        if settings.KPI_CACHE_NOTIFY_CHANNEL:
+            flush_listener = asyncio.create_task(
+                listen_for_flushes(
+                    settings.DB_DSN,
+                    settings.KPI_CACHE_NOTIFY_CHANNEL,
+                    notify_ttl_seconds=settings.KPI_CACHE_NOTIFY_TTL_SECONDS,
+                    keepalive_seconds=settings.KPI_CACHE_LISTENER_KEEPALIVE_SECONDS,
+                    retry_seconds=settings.KPI_CACHE_LISTENER_RETRY_SECONDS,
+                    on_flush=app.state.kpi_stream.notify,
+                    replay_delay_seconds=(
+                        settings.DB_READ_MAX_LAG_SECONDS
+                        if settings.DB_READ_DSN
+                        else 0.0
+                    ),
+                )
+            )
+            stack.push_async_callback(_cancel, flush_listener)
+        gauge_sync = asyncio.create_task(
+            sync_worker_gauges(
+                app.state.counters,
+                app.state.publisher,
+                app.state.spool,
+                settings.METRICS_SYNC_INTERVAL_SECONDS,
+            )
+        )
+        stack.push_async_callback(_cancel, gauge_sync)
+        logger.info("Ingest API worker %s started", app.state.counters.slot)
+        yield
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     logging.basicConfig(level=settings.LOG_LEVEL)
-    app.state.producer = AIOKafkaProducer(
-        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
-        client_id=settings.KAFKA_CLIENT_ID,
-    )
-    app.state.db_pool = await create_pool()
-    app.state.ingest_counter = 0
-    await app.state.producer.start()
-    logger.info("Ingest API started")
+    configure_loop(asyncio.get_running_loop(), settings)
+    # Outside the worker's own cleanup, so a failing startup or shutdown step
+    # still cancels it, as _supervised does in the other services.
+    lag_monitor = start_lag_monitor(settings)
     try:
-        yield
+        async with _worker():
+            yield
     finally:
-        producer: AIOKafkaProducer = app.state.producer
-        await producer.stop()
-        await app.state.db_pool.close()
-        logger.info("Ingest API stopped")
+        await stop_lag_monitor(lag_monitor)
 
 
 app = FastAPI(
@@ -50,6 +170,53 @@ app = FastAPI(
     dependencies=[Depends(require_api_key)],
     lifespan=lifespan,
 )
+app.state.kpi_stream = KpiStreamHub(
+    settings.KPI_STREAM_INTERVAL_SECONDS,
+    queue_size=settings.KPI_STREAM_QUEUE_SIZE,
+    max_subscribers=settings.KPI_STREAM_MAX_SUBSCRIBERS,
+)
+app.state.serialize = (
+    to_payload_bytes if settings.FAST_SERIALIZATION else to_payload_json
+)
+app.state.export_slots = asyncio.Semaphore(settings.KPI_EXPORT_MAX_CONCURRENT)
+app.state.limiters = {}
+if settings.INGEST_LIMIT_ENABLED:
+    app.state.limiters["ingest"] = AdaptiveLimiter(
+        "ingest",
+        min_limit=settings.INGEST_LIMIT_MIN,
+        max_limit=settings.INGEST_LIMIT_MAX,
+        initial_limit=settings.INGEST_LIMIT_INITIAL,
+        latency_target_ms=settings.INGEST_LATENCY_TARGET_MS,
+    )
+if settings.KPI_LIMIT_ENABLED:
+    app.state.limiters["kpi"] = AdaptiveLimiter(
+        "kpi",
+        min_limit=settings.KPI_LIMIT_MIN,
+        max_limit=settings.KPI_LIMIT_MAX,
+        initial_limit=settings.KPI_LIMIT_INITIAL,
+        latency_target_ms=settings.KPI_LATENCY_TARGET_MS,
+    )
+_LIMITED_ROUTES = {
+    "ingest": ("/events/",),
+    "kpi": (
+        "/kpi/",
+        "/alerts",
+        "/metrics/freshness",
+        "/metrics/time-to-signal",
+        "/dashboard/",
+    ),
+}
+# Added before CORS so that shed requests still carry CORS headers.
+app.add_middleware(
+    ConcurrencyLimitMiddleware,
+    routes=[
+        (_LIMITED_ROUTES[name], limiter)
+        for name, limiter in app.state.limiters.items()
+    ],
+    retry_after_seconds=settings.LIMIT_RETRY_AFTER_SECONDS,
+    # Streams are long-lived by design and would pin a slot and skew latency.
+    exempt=("/kpi/stream",),
+)
 allow_credentials = "*" not in settings.ALLOWED_ORIGINS
 app.add_middleware(
     CORSMiddleware,
@@ -68,10 +235,15 @@ async def health() -> dict[str, str]:
 
 
 def main() -> None:
+    # Slot files are claimed by the workers spawned below; a fresh start of the
+    # whole server begins from zero.
+    reset_counters(BASE_DIR / settings.RUNTIME_DIR)
     uvicorn.run(
         "ingest_api.main:app",
         host=settings.HOST,
         port=settings.PORT,
+        loop=uvicorn_loop(settings),
+        workers=settings.WORKERS,
         log_level=settings.LOG_LEVEL.lower(),
     )
 
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class QueryCache:
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidated = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        ttl_seconds: float | None = None,
+    ) -> T:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            # The load runs as its own task so a caller that disconnects does
+            # not cancel the query other callers are waiting on.
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            ttl = self.ttl if ttl_seconds is None else ttl_seconds
+            task.add_done_callback(partial(self._store, key, ttl))
+        else:
+            self.coalesced += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                # Nobody is left to use the result, so the query is cancelled
+                # instead of holding a connection until it finishes.
+                if not task.done():
+                    if self._inflight.get(key) is task:
+                        del self._inflight[key]
+                    task.cancel()
+
+    def _store(self, key: Hashable, ttl: float, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is not task:
+            # Invalidated while loading: the result may predate the change.
+            return
+        del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        stale = [key for key in self._entries if predicate(key)]
+        for key in stale:
+            del self._entries[key]
+        # Loads already running may have read the old rows; callers waiting on
+        # them still get their result, but it is not stored.
+        for key in [key for key in self._inflight if predicate(key)]:
+            del self._inflight[key]
+        self.invalidated += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self.invalidate(lambda _key: True)
+
+    def stats(self) -> dict[str, int | float]:
+        served = self.hits + self.coalesced
+        lookups = served + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidated": self.invalidated,
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import mmap
+import os
+import shutil
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger("ingest-api")
+
+COUNTER_NAMES = (
+    "accepted",
+    "spooled",
+    "rejected",
+    "duplicates",
+    "idempotency_misses",
+    "kafka_delivered",
+    "kafka_failed",
+    "kafka_in_flight",
+    "spool_depth",
+    "spool_age_ms",
+)
+# Gauges where the cluster-wide value is the worst worker, not the sum.
+_MAX_NAMES = frozenset({"spool_age_ms"})
+_SLOTS = 32
+_SLOT_BYTES = _SLOTS * 8
+_INDEX = {name: index for index, name in enumerate(COUNTER_NAMES)}
+if len(COUNTER_NAMES) > _SLOTS:
+    raise RuntimeError("Too many ingest counters for the shared slot layout")
+
+
+def _aggregate(rows: list[list[int]]) -> dict[str, int]:
+    totals: dict[str, int] = {}
+    for name, index in _INDEX.items():
+        values = [row[index] for row in rows]
+        if name in _MAX_NAMES:
+            totals[name] = max(values, default=0)
+        else:
+            totals[name] = sum(values)
+    return totals
+
+
+class LocalCounters:
+    slot = 0
+
+    def __init__(self) -> None:
+        self._values = [0] * len(COUNTER_NAMES)
+
+    def add(self, name: str, amount: int = 1) -> int:
+        index = _INDEX[name]
+        self._values[index] += amount
+        return self._values[index]
+
+    def set(self, name: str, value: int) -> None:
+        self._values[_INDEX[name]] = value
+
+    def get(self, name: str) -> int:
+        return self._values[_INDEX[name]]
+
+    def workers(self) -> int:
+        return 1
+
+    def totals(self) -> dict[str, int]:
+        return _aggregate([self._values])
+
+    def close(self) -> None:
+        pass
+
+
+class SharedCounters:
+    # Every worker owns one slot file, holds an exclusive flock on it for its
+    # lifetime and is the only writer, so increments need no cross-process
+    # locking. Readers sum all slot files; a restarted worker reclaims a free
+    # slot and continues its predecessor's totals.
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.slot, self._file = self._claim_slot()
+        self._mmap = mmap.mmap(self._file.fileno(), _SLOT_BYTES)
+        self._values = memoryview(self._mmap).cast("Q")
+
+    def _claim_slot(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slot = 0
+        while True:
+            path = self.directory / f"worker-{slot}.bin"
+            file = open(path, "a+b")
+            try:
+                fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                file.close()
+                slot += 1
+                continue
+            if os.fstat(file.fileno()).st_size < _SLOT_BYTES:
+                file.truncate(_SLOT_BYTES)
+            return slot, file
+
+    def add(self, name: str, amount: int = 1) -> int:
+        index = _INDEX[name]
+        self._values[index] += amount
+        return self._values[index]
+
+    def set(self, name: str, value: int) -> None:
+        self._values[_INDEX[name]] = max(0, value)
+
+    def get(self, name: str) -> int:
+        return self._values[_INDEX[name]]
+
+    def _slot_files(self) -> list[Path]:
+        return sorted(self.directory.glob("worker-*.bin"))
+
+    def workers(self) -> int:
+        alive = 0
+        for path in self._slot_files():
+            with open(path, "rb") as file:
+                try:
+                    fcntl.flock(file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    alive += 1
+        return alive
+
+    def totals(self) -> dict[str, int]:
+        rows = []
+        for path in self._slot_files():
+            data = path.read_bytes()[:_SLOT_BYTES].ljust(_SLOT_BYTES, b"\0")
+            rows.append(list(memoryview(data).cast("Q")))
+        return _aggregate(rows)
+
+    def close(self) -> None:
+        self._values.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def reset_counters(directory: Path) -> None:
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def open_counters(directory: Path) -> LocalCounters | SharedCounters:
+    if fcntl is None:
+        return LocalCounters()
+    try:
+        return SharedCounters(directory)
+    except OSError:
+        logger.exception("Shared counters unavailable in %s, using local", directory)
+        return LocalCounters()
+
+
+async def sync_worker_gauges(
+    counters: LocalCounters | SharedCounters,
+    publisher,
+    spool,
+    interval_seconds: float,
+) -> None:
+    # Publisher and spool keep plain per-process numbers on the hot path; they
+    # are copied into this worker's slot periodically.
+    delivered_base = counters.get("kafka_delivered")
+    failed_base = counters.get("kafka_failed")
+    while True:
+        counters.set("kafka_delivered", delivered_base + publisher.delivered)
+        counters.set("kafka_failed", failed_base + publisher.failed)
+        counters.set("kafka_in_flight", publisher.in_flight)
+        if spool is not None:
+            counters.set("spool_depth", spool.depth)
+            counters.set("spool_age_ms", int(spool.age_seconds() * 1000))
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,40 @@
+from collections.abc import Callable, Sequence
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def lttb(
+    points: Sequence[T], threshold: int, key: Callable[[T], tuple[float, float]]
+) -> list[T]:
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and, from
+    # every bucket in between, the point forming the largest triangle with the
+    # previously kept point and the average of the next bucket.
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+
+    coords = [key(point) for point in points]
+    sampled = [points[0]]
+    every = (len(points) - 2) / (threshold - 2)
+    kept = 0
+    for index in range(threshold - 2):
+        start = int(index * every) + 1
+        end = int((index + 1) * every) + 1
+        next_end = min(int((index + 2) * every) + 1, len(points))
+        following = coords[end:next_end] or coords[-1:]
+        avg_x = sum(x for x, _ in following) / len(following)
+        avg_y = sum(y for _, y in following) / len(following)
+
+        kept_x, kept_y = coords[kept]
+        best, best_area = start, -1.0
+        for candidate in range(start, end):
+            x, y = coords[candidate]
+            area = abs(
+                (kept_x - avg_x) * (y - kept_y) - (kept_x - x) * (avg_y - kept_y)
+            )
+            if area > best_area:
+                best, best_area = candidate, area
+        sampled.append(points[best])
+        kept = best
+    sampled.append(points[-1])
+    return sampled
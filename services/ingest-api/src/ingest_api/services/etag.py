@@ -0,0 +1,15 @@
+import hashlib
+
+
+def make_etag(*parts: object) -> str:
+    # Weak: equal tags mean the same data, not byte-identical bodies, since
+    # responses echo the unaligned from/to the client sent.
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from contextlib import suppress
+from datetime import datetime
+
+import asyncpg
+
+from ingest_api.services import kpi_service
+
+logger = logging.getLogger("ingest-api")
+
+
+def handle_flush_notice(payload: str) -> int:
+    notice = json.loads(payload)
+    return kpi_service.invalidate_flushed(
+        notice["granularity"],
+        datetime.fromisoformat(notice["min_bucket"]),
+        datetime.fromisoformat(notice["max_bucket"]),
+    )
+
+
+async def listen_for_flushes(
+    dsn: str,
+    channel: str,
+    notify_ttl_seconds: float,
+    keepalive_seconds: float,
+    retry_seconds: float,
+    on_flush: Callable[[], None] | None = None,
+    replay_delay_seconds: float = 0.0,
+) -> None:
+    # While subscribed, every processor flush evicts exactly the cached ranges
+    # it touched, so KPI entries may live for notify_ttl_seconds. Without the
+    # subscription the cache falls back to its base TTL.
+    cache = kpi_service.kpi_cache
+    base_ttl = cache.ttl
+    loop = asyncio.get_running_loop()
+
+    def apply(payload: str) -> None:
+        handle_flush_notice(payload)
+        if on_flush is not None:
+            on_flush()
+
+    def on_notice(_conn, _pid, _channel, payload: str) -> None:
+        try:
+            apply(payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed %s notice: %s", channel, payload)
+            return
+        if replay_delay_seconds > 0:
+            # Notices come from the primary; a replica within its lag budget
+            # may have served the old rows right after the first eviction.
+            loop.call_later(replay_delay_seconds, apply, payload)
+
+    while True:
+        try:
+            conn = await asyncpg.connect(dsn)
+        except (OSError, asyncpg.PostgresError) as exc:
+            logger.warning("KPI flush listener cannot connect: %s", exc)
+            await asyncio.sleep(retry_seconds)
+            continue
+
+        closed = asyncio.Event()
+        conn.add_termination_listener(lambda _conn: closed.set())
+        try:
+            await conn.add_listener(channel, on_notice)
+            # Entries cached before the subscription may have missed a notice.
+            cache.clear()
+            cache.ttl = notify_ttl_seconds
+            logger.info("Listening for KPI flushes on %s", channel)
+            while not closed.is_set():
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(closed.wait(), keepalive_seconds)
+                if not closed.is_set():
+                    await conn.fetchval("SELECT 1")
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+            logger.warning("KPI flush listener failed: %s", exc)
+        finally:
+            cache.ttl = base_ttl
+            cache.clear()
+            if not conn.is_closed():
+                conn.terminate()
+        logger.warning("KPI flush listener disconnected, retrying")
+        await asyncio.sleep(retry_seconds)
@@ -0,0 +1,44 @@
+import time
+from collections import OrderedDict
+
+
+class IdempotencyCache:
+    def __init__(self, ttl_seconds: float, max_size: int) -> None:
+        self.ttl = ttl_seconds
+        self.max_size = max_size
+        # The TTL is fixed, so insertion order is also expiry order and expired
+        # keys can always be trimmed from the front.
+        self._items: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def seen(self, key: str, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        return key in self._items
+
+    def remember(self, key: str, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._items[key] = now + self.ttl
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def reserve(self, key: str, now: float | None = None) -> bool:
+        # Claims the key before the event is published, so a retry that arrives
+        # while the original still waits for its ack is already a duplicate.
+        if self.seen(key, now):
+            return False
+        self.remember(key, now)
+        return True
+
+    def forget(self, key: str) -> None:
+        self._items.pop(key, None)
+
+    def _expire(self, now: float) -> None:
+        while self._items:
+            key, expiry = next(iter(self._items.items()))
+            if expiry > now:
+                return
+            del self._items[key]
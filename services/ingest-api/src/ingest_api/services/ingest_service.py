@@ -1,6 +1,13 @@
+import json
 from datetime import datetime, timezone
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from pydantic_core import to_json
+
+from ingest_api.api.schemas import OrderEvent, SessionEvent
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+_EXCLUDE_EVENT_ID = {"event_id"}
 
 
 def to_payload(event: BaseModel, event_id: str) -> dict[str, object]:
@@ -12,5 +19,84 @@ def to_payload(event: BaseModel, event_id: str) -> dict[str, object]:
     return payload
 
 
+def to_payload_json(event: BaseModel, event_id: str) -> bytes:
+    return json.dumps(to_payload(event, event_id)).encode("utf-8")
+
+
+def to_payload_bytes(event: BaseModel, event_id: str) -> bytes:
+    # Same document as json.dumps(to_payload(...)), produced by pydantic's Rust
+    # serializer in one pass; event_id and received_at are spliced onto the end.
+    received_at = datetime.now(timezone.utc).isoformat()
+    body = event.__pydantic_serializer__.to_json(event, exclude=_EXCLUDE_EVENT_ID)
+    return b"".join(
+        (
+            body[:-1],
+            b',"event_id":',
+            to_json(event_id),
+            b',"received_at":"',
+            received_at.encode("ascii"),
+            b'"}',
+        )
+    )
+
+
 def make_event_id(prefix: str, key: str, event_time: datetime) -> str:
     return f"{prefix}:{key}:{event_time.isoformat()}"
+
+
+def order_event_id(event: OrderEvent) -> str:
+    return event.event_id or event.order_id
+
+
+def session_event_id(event: SessionEvent) -> str:
+    return event.event_id or make_event_id(
+        "session", f"{event.session_id}:{event.event_type}", event.event_time
+    )
+
+
+def parse_batch_body(body: bytes, content_type: str) -> list[object]:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in NDJSON_CONTENT_TYPES:
+        items = []
+        for line_no, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Invalid JSON on line {line_no}: {exc.msg}") from exc
+        return items
+
+    try:
+        items = json.loads(body)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON body: {exc.msg}") from exc
+    if not isinstance(items, list):
+        raise ValueError("Batch body must be a JSON array or NDJSON stream")
+    return items
+
+
+def parse_batch_item(item: object) -> OrderEvent | SessionEvent:
+    if not isinstance(item, dict):
+        raise ValueError("Batch item must be a JSON object")
+    fields = dict(item)
+    kind = fields.pop("type", None)
+    if kind is None:
+        if "order_id" in fields:
+            kind = "order"
+        elif "session_id" in fields:
+            kind = "session"
+    if kind == "order":
+        return OrderEvent.model_validate(fields)
+    if kind == "session":
+        return SessionEvent.model_validate(fields)
+    raise ValueError("Batch item type must be 'order' or 'session'")
+
+
+def describe_validation_error(exc: ValidationError | ValueError) -> str:
+    if not isinstance(exc, ValidationError):
+        return str(exc)
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'body'}: {error['msg']}"
+        for error in exc.errors()
+    )
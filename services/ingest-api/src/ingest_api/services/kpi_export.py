@@ -0,0 +1,137 @@
+import csv
+import io
+import zlib
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any
+
+import asyncpg
+import pyarrow as pa
+from pydantic_core import to_json
+
+from ingest_api.api.schemas import KpiPoint
+from ingest_api.domain.kpi_repository import iter_range_rows
+
+COLUMNS = tuple(KpiPoint.model_fields)
+# NUMERIC columns arrive as Decimal; exports use the same types as the JSON API.
+_FLOAT_COLUMNS = frozenset(
+    name for name, field in KpiPoint.model_fields.items() if field.annotation is float
+)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+TEXT_FORMATS = frozenset({"ndjson", "csv"})
+
+
+def _values(row: Any) -> list[Any]:
+    return [
+        float(row[name]) if name in _FLOAT_COLUMNS else row[name] for name in COLUMNS
+    ]
+
+
+def encode_ndjson(rows: Sequence[Any]) -> bytes:
+    return b"".join(to_json(dict(zip(COLUMNS, _values(row)))) + b"\n" for row in rows)
+
+
+def csv_header() -> bytes:
+    return (",".join(COLUMNS) + "\r\n").encode("utf-8")
+
+
+def encode_csv(rows: Sequence[Any]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = _values(row)
+        values[0] = values[0].isoformat()
+        writer.writerow(values)
+    return buffer.getvalue().encode("utf-8")
+
+
+class ArrowEncoder:
+    # Arrow IPC stream: the schema message first, then one record batch per
+    # cursor batch, so the client can read it incrementally.
+
+    def __init__(self) -> None:
+        self.schema = pa.schema(
+            [
+                (
+                    name,
+                    pa.timestamp("us", tz="UTC")
+                    if name == "bucket"
+                    else pa.float64()
+                    if name in _FLOAT_COLUMNS
+                    else pa.int64(),
+                )
+                for name in COLUMNS
+            ]
+        )
+        self._buffer = io.BytesIO()
+        self._writer = pa.ipc.new_stream(self._buffer, self.schema)
+
+    def _take(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        return self._take()
+
+    def encode(self, rows: Sequence[Any]) -> bytes:
+        columns = list(zip(*(_values(row) for row in rows)))
+        batch = pa.record_batch(
+            [
+                pa.array(values, type=field.type)
+                for values, field in zip(columns, self.schema)
+            ],
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch)
+        return self._take()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._take()
+
+
+async def stream_series(
+    pool: asyncpg.Pool,
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    limit: int | None,
+    channel: str | None,
+    campaign: str | None,
+    fmt: str,
+    batch_rows: int,
+) -> AsyncIterator[bytes]:
+    async with pool.acquire() as conn:
+        batches = iter_range_rows(
+            conn, bucket, from_ts, to_ts, limit, channel, campaign, batch_rows
+        )
+        if fmt == "arrow":
+            arrow = ArrowEncoder()
+            yield arrow.header()
+            async for rows in batches:
+                yield arrow.encode(rows)
+            yield arrow.close()
+            return
+        if fmt == "csv":
+            yield csv_header()
+        encode = encode_csv if fmt == "csv" else encode_ndjson
+        async for rows in batches:
+            yield encode(rows)
+
+
+async def gzip_chunks(
+    chunks: AsyncIterator[bytes], level: int = 6
+) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
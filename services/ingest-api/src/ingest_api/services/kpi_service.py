@@ -1,21 +1,54 @@
-from datetime import datetime, timezone
+import asyncio
+import math
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 
 import asyncpg
 
 from ingest_api.api.schemas import (
     AlertItem,
     AlertType,
+    DashboardSnapshot,
     FreshnessResponse,
+    KpiBreakdown,
     KpiPoint,
+    KpiSegmentSeries,
+    KpiSeries,
+    KpiStreamUpdate,
     TimeToSignalItem,
 )
 from ingest_api.domain.kpi_repository import (
+    TIER_SECONDS,
+    TierRange,
     fetch_alerts_rows,
+    fetch_alerts_version,
+    fetch_breakdown_rows,
+    fetch_day_refresh_version,
     fetch_freshness,
     fetch_latest_row,
+    fetch_range_json,
     fetch_range_rows,
+    fetch_range_version,
+    fetch_rollup_rows,
+    fetch_table_version,
     fetch_time_to_signal,
+    plan_tiers,
 )
+from ingest_api.services.cache import QueryCache
+from ingest_api.services.downsampling import lttb
+from ingest_api.services.etag import make_etag
+from ingest_api.services.pagination import decode_cursor, encode_cursor
+from ingest_api.settings import get_settings
+
+settings = get_settings()
+kpi_cache = QueryCache(settings.KPI_CACHE_TTL_SECONDS, settings.KPI_CACHE_MAX_ENTRIES)
+
+_BUCKET_SECONDS = {"minute": 60, "hour": 3600}
+_WIDTH_UNITS = {"m": 60, "h": 3600, "d": 86400}
+# time_bucket's default origin (a Monday); edges computed here must match it
+# for widths that do not divide a day, such as 7m or 7d.
+_BUCKET_ORIGIN = datetime(2000, 1, 3, tzinfo=timezone.utc).timestamp()
+_AUTO_WIDTHS = ("1m", "5m", "15m", "1h", "6h", "1d", "7d")
 
 
 def _alert_type_from_kpi(kpi: str | None) -> AlertType | None:
@@ -26,6 +59,48 @@ def _alert_type_from_kpi(kpi: str | None) -> AlertType | None:
     return None
 
 
+def _as_utc(value: datetime) -> datetime:
+    # asyncpg sends naive datetimes to timestamptz columns as UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _floor_ts(value: datetime, seconds: float) -> datetime:
+    offset = _as_utc(value).timestamp() - _BUCKET_ORIGIN
+    edge = _BUCKET_ORIGIN + math.floor(offset / seconds) * seconds
+    return datetime.fromtimestamp(edge, tz=timezone.utc)
+
+
+def _ceil_ts(value: datetime, seconds: float) -> datetime:
+    offset = _as_utc(value).timestamp() - _BUCKET_ORIGIN
+    edge = _BUCKET_ORIGIN + math.ceil(offset / seconds) * seconds
+    return datetime.fromtimestamp(edge, tz=timezone.utc)
+
+
+def series_range(
+    bucket: str, from_ts: datetime, to_ts: datetime
+) -> tuple[datetime, datetime]:
+    # Buckets are aligned, so "bucket >= from AND bucket <= to" selects exactly
+    # the same rows for [ceil(from), floor(to)]; every poll within one bucket
+    # then shares a cache key.
+    seconds = _BUCKET_SECONDS.get(bucket)
+    if seconds is None:
+        return from_ts, to_ts
+    return _ceil_ts(from_ts, seconds), _floor_ts(to_ts, seconds)
+
+
+def alerts_range(
+    from_ts: datetime, to_ts: datetime, now: datetime | None = None
+) -> tuple[datetime, datetime]:
+    # Alerts are filtered by created_at, which is not aligned. Only live
+    # windows ending within one TTL of now are snapped to the TTL grid, which
+    # is no staler than the cache itself; historical ranges stay exact.
+    grain = max(1.0, settings.KPI_CACHE_TTL_SECONDS)
+    now = now or datetime.now(timezone.utc)
+    if _as_utc(to_ts) < now - timedelta(seconds=grain):
+        return from_ts, to_ts
+    return _ceil_ts(from_ts, grain), _ceil_ts(to_ts, grain)
+
+
 async def fetch_series(
     pool: asyncpg.Pool,
     bucket: str,
@@ -34,11 +109,298 @@ async def fetch_series(
     limit: int,
     channel: str | None = None,
     campaign: str | None = None,
+    etag: str | None = None,
 ) -> list[KpiPoint]:
-    rows = await fetch_range_rows(
-        pool, bucket, from_ts, to_ts, limit, channel, campaign
+    from_ts, to_ts = series_range(bucket, from_ts, to_ts)
+
+    async def load() -> list[KpiPoint]:
+        rows = await fetch_range_rows(
+            pool, bucket, from_ts, to_ts, limit, channel, campaign
+        )
+        return [KpiPoint(**row) for row in rows]
+
+    key = ("series", bucket, from_ts, to_ts, limit, channel, campaign, etag)
+    return await kpi_cache.get_or_load(key, load)
+
+
+def parse_width(width: str) -> int:
+    number, unit = width[:-1], width[-1:]
+    if not number.isdigit() or unit not in _WIDTH_UNITS or int(number) == 0:
+        raise ValueError(f"Unsupported width: {width}, use e.g. 5m, 2h or 1d")
+    return int(number) * _WIDTH_UNITS[unit]
+
+
+def auto_width(from_ts: datetime, to_ts: datetime) -> str:
+    span = (_as_utc(to_ts) - _as_utc(from_ts)).total_seconds()
+    for width in _AUTO_WIDTHS:
+        if span / parse_width(width) <= settings.KPI_SERIES_TARGET_POINTS:
+            return width
+    return _AUTO_WIDTHS[-1]
+
+
+def day_complete_before(now: datetime | None = None) -> datetime:
+    # kpi_day is refreshed by a policy; days that ended less than the lag ago
+    # may not be materialized yet.
+    now = now or datetime.now(timezone.utc)
+    lag = timedelta(seconds=settings.KPI_DAY_TIER_LAG_SECONDS)
+    return _floor_ts(now - lag, TIER_SECONDS["day"])
+
+
+def _notice_tier(tier: str) -> str:
+    # Flush notices only name minute and hour buckets; kpi_day is built from
+    # kpi_hour, so hour notices are the ones that touch day rows.
+    return "hour" if tier == "day" else tier
+
+
+def rollup_plan(
+    width: str | None, from_ts: datetime, to_ts: datetime
+) -> tuple[str, int, list[TierRange]]:
+    width = width or auto_width(from_ts, to_ts)
+    width_seconds = parse_width(width)
+    buckets = (_as_utc(to_ts) - _as_utc(from_ts)).total_seconds() / width_seconds
+    if buckets > settings.KPI_SERIES_MAX_BUCKETS:
+        raise ValueError(
+            f"Range holds {int(buckets)} buckets of {width}, at most "
+            f"{settings.KPI_SERIES_MAX_BUCKETS} are allowed; use a wider width"
+        )
+    # Whole output buckets only: the first one starts at or before from.
+    range_from = _floor_ts(from_ts, width_seconds)
+    range_to = _floor_ts(to_ts, TIER_SECONDS["minute"])
+    boundary = _floor_ts(day_complete_before(), width_seconds)
+    plan = plan_tiers(width_seconds, range_from, range_to, boundary)
+    # Like series_range: polls within one bucket of the tier share a cache key.
+    plan = [
+        replace(part, to_ts=_floor_ts(part.to_ts, TIER_SECONDS[part.tier]))
+        for part in plan
+    ]
+    return width, width_seconds, plan
+
+
+async def fetch_rollup_series(
+    pool: asyncpg.Pool,
+    width: str | None,
+    from_ts: datetime,
+    to_ts: datetime,
+    channel: str | None = None,
+    campaign: str | None = None,
+    max_points: int | None = None,
+    metric: str = "revenue",
+    etag: str | None = None,
+) -> KpiSeries:
+    width, width_seconds, plan = rollup_plan(width, from_ts, to_ts)
+    interval = timedelta(seconds=width_seconds)
+
+    async def load() -> list[KpiPoint]:
+        parts = await asyncio.gather(
+            *(
+                fetch_rollup_rows(
+                    pool,
+                    part.tier,
+                    interval,
+                    part.from_ts,
+                    part.to_ts,
+                    channel,
+                    campaign,
+                )
+                for part in plan
+            )
+        )
+        points = [KpiPoint(**row) for rows in parts for row in rows]
+        if max_points is None:
+            return points
+        return lttb(
+            points,
+            max_points,
+            key=lambda point: (point.bucket.timestamp(), float(getattr(point, metric))),
+        )
+
+    # Keyed by the finest tier read so that its flush notices invalidate it.
+    key = (
+        "series",
+        _notice_tier(plan[-1].tier),
+        plan[0].from_ts,
+        plan[-1].to_ts,
+        width_seconds,
+        channel,
+        campaign,
+        "rollup",
+        max_points,
+        metric,
+        tuple(plan),
+        etag,
+    )
+    points = await kpi_cache.get_or_load(key, load)
+    return KpiSeries(
+        bucket=width,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        channel=channel,
+        campaign=campaign,
+        tiers=[part.tier for part in plan],
+        points=points,
     )
-    return [KpiPoint(**row) for row in rows]
+
+
+def breakdown_range(
+    bucket: str, from_ts: datetime, to_ts: datetime
+) -> tuple[datetime, datetime]:
+    span = (_as_utc(to_ts) - _as_utc(from_ts)).total_seconds()
+    buckets = span / _BUCKET_SECONDS[bucket]
+    if buckets > settings.KPI_SERIES_MAX_BUCKETS:
+        raise ValueError(
+            f"Range holds {int(buckets)} {bucket} buckets, at most "
+            f"{settings.KPI_SERIES_MAX_BUCKETS} are allowed; use hour buckets"
+        )
+    return series_range(bucket, from_ts, to_ts)
+
+
+async def fetch_breakdown(
+    pool: asyncpg.Pool,
+    bucket: str,
+    by: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    top: int | None = None,
+    etag: str | None = None,
+) -> KpiBreakdown:
+    range_from, range_to = breakdown_range(bucket, from_ts, to_ts)
+
+    async def load() -> tuple[list[KpiPoint], list[KpiSegmentSeries]]:
+        rows = await fetch_breakdown_rows(pool, bucket, by, range_from, range_to, top)
+        totals: list[KpiPoint] = []
+        segments: dict[int, KpiSegmentSeries] = {}
+        for row in rows:
+            level = row.pop("level")
+            channel = row.pop("channel")
+            campaign = row.pop("campaign")
+            rank = row.pop("segment_rank")
+            point = KpiPoint(**row)
+            if level:
+                totals.append(point)
+                continue
+            segment = segments.get(rank)
+            if segment is None:
+                segment = segments[rank] = KpiSegmentSeries(
+                    channel=channel, campaign=campaign, points=[]
+                )
+            segment.points.append(point)
+        return totals, [segments[rank] for rank in sorted(segments)]
+
+    key = ("series", bucket, range_from, range_to, "breakdown", by, top, etag)
+    totals, segments = await kpi_cache.get_or_load(key, load)
+    return KpiBreakdown(
+        bucket=bucket,
+        by=by,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        top=top,
+        totals=totals,
+        segments=segments,
+    )
+
+
+async def fetch_series_json(
+    pool: asyncpg.Pool,
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    limit: int,
+    channel: str | None = None,
+    campaign: str | None = None,
+    etag: str | None = None,
+) -> tuple[bytes, int, datetime | None]:
+    from_ts, to_ts = series_range(bucket, from_ts, to_ts)
+
+    async def load() -> tuple[bytes, int, datetime | None]:
+        return await fetch_range_json(
+            pool, bucket, from_ts, to_ts, limit, channel, campaign
+        )
+
+    key = ("series", bucket, from_ts, to_ts, limit, channel, campaign, "json", etag)
+    return await kpi_cache.get_or_load(key, load)
+
+
+def series_json(
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    channel: str | None,
+    campaign: str | None,
+    points: bytes,
+    next_cursor: str | None = None,
+) -> bytes:
+    # The envelope is serialized with an empty point list, which is always the
+    # last field, and the pre-built points array is spliced in its place.
+    envelope = KpiSeries(
+        bucket=bucket,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        channel=channel,
+        campaign=campaign,
+        next_cursor=next_cursor,
+        points=[],
+    )
+    body = envelope.__pydantic_serializer__.to_json(envelope)
+    return body[: -len(b"[]}")] + points + b"}"
+
+
+def series_cursor(
+    bucket: str,
+    last_bucket: datetime,
+    to_ts: datetime,
+    channel: str | None,
+    campaign: str | None,
+) -> str:
+    return encode_cursor(
+        {
+            "b": bucket,
+            "s": [channel, campaign],
+            "after": _as_utc(last_bucket).isoformat(),
+            "to": _as_utc(to_ts).isoformat(),
+        }
+    )
+
+
+def parse_series_cursor(
+    cursor: str, bucket: str, channel: str | None, campaign: str | None
+) -> tuple[datetime, datetime]:
+    # Returns the (from, to) range of the next page. Buckets are aligned, so
+    # "bucket >= after + 1us" is the keyset condition "bucket > after" and the
+    # page query stays the same index range scan as the first one.
+    fields = decode_cursor(cursor)
+    if fields.get("b") != bucket or fields.get("s") != [channel, campaign]:
+        raise ValueError("Cursor does not belong to this query")
+    try:
+        after = datetime.fromisoformat(fields["after"])
+        to_ts = datetime.fromisoformat(fields["to"])
+    except (KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    return after + timedelta(microseconds=1), to_ts
+
+
+def alerts_cursor(item: AlertItem, from_ts: datetime, kpi: str | None) -> str:
+    return encode_cursor(
+        {
+            "k": kpi,
+            "from": _as_utc(from_ts).isoformat(),
+            "at": _as_utc(item.created_at).isoformat(),
+            "id": item.id,
+        }
+    )
+
+
+def parse_alerts_cursor(
+    cursor: str, kpi: str | None
+) -> tuple[datetime, tuple[datetime, int]]:
+    fields = decode_cursor(cursor)
+    if fields.get("k") != kpi:
+        raise ValueError("Cursor does not belong to this query")
+    try:
+        from_ts = datetime.fromisoformat(fields["from"])
+        after = (datetime.fromisoformat(fields["at"]), int(fields["id"]))
+    except (KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    return from_ts, after
 
 
 async def fetch_latest_kpi(
@@ -46,11 +408,16 @@ async def fetch_latest_kpi(
     bucket: str,
     channel: str | None = None,
     campaign: str | None = None,
+    etag: str | None = None,
 ) -> KpiPoint | None:
-    row = await fetch_latest_row(pool, bucket, channel, campaign)
-    if row is None:
-        return None
-    return KpiPoint(**row)
+    async def load() -> KpiPoint | None:
+        row = await fetch_latest_row(pool, bucket, channel, campaign)
+        if row is None:
+            return None
+        return KpiPoint(**row)
+
+    key = ("latest", bucket, channel, campaign, etag)
+    return await kpi_cache.get_or_load(key, load)
 
 
 async def fetch_alerts(
@@ -59,12 +426,168 @@ async def fetch_alerts(
     to_ts: datetime,
     limit: int,
     kpi: str | None = None,
+    after: tuple[datetime, int] | None = None,
+    etag: str | None = None,
 ) -> list[AlertItem]:
-    rows = await fetch_alerts_rows(pool, from_ts, to_ts, limit, kpi)
-    return [
-        AlertItem(**row, alert_type=_alert_type_from_kpi(row.get("kpi")))
-        for row in rows
-    ]
+    from_ts, to_ts = alerts_range(from_ts, to_ts)
+
+    async def load() -> list[AlertItem]:
+        rows = await fetch_alerts_rows(pool, from_ts, to_ts, limit, kpi, after)
+        return [
+            AlertItem(**row, alert_type=_alert_type_from_kpi(row.get("kpi")))
+            for row in rows
+        ]
+
+    # Alerts are written by the alerting service and never announced by the
+    # processor, so they keep the short TTL even while flush notices arrive.
+    return await kpi_cache.get_or_load(
+        ("alerts", from_ts, to_ts, limit, kpi, after, etag),
+        load,
+        ttl_seconds=settings.KPI_CACHE_TTL_SECONDS,
+    )
+
+
+async def _range_version(
+    pool: asyncpg.Pool, tier: str, from_ts: datetime, to_ts: datetime
+) -> datetime | None:
+    async def load() -> datetime | None:
+        return await fetch_range_version(pool, tier, from_ts, to_ts)
+
+    # A "series" key, so the flush notices that evict the data evict its
+    # version too.
+    key = ("series", _notice_tier(tier), from_ts, to_ts, "version")
+    return await kpi_cache.get_or_load(key, load)
+
+
+async def _day_refresh_version(pool: asyncpg.Pool, segmented: bool) -> datetime | None:
+    async def load() -> datetime | None:
+        return await fetch_day_refresh_version(pool, segmented)
+
+    # Refresh jobs are not announced by flush notices, so this keeps the
+    # short TTL even while notices arrive.
+    return await kpi_cache.get_or_load(
+        ("day_refresh", segmented),
+        load,
+        ttl_seconds=settings.KPI_CACHE_TTL_SECONDS,
+    )
+
+
+async def series_etag(
+    pool: asyncpg.Pool,
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    limit: int,
+    channel: str | None = None,
+    campaign: str | None = None,
+) -> str:
+    from_ts, to_ts = series_range(bucket, from_ts, to_ts)
+    version = await _range_version(pool, bucket, from_ts, to_ts)
+    return make_etag(
+        "series", bucket, from_ts, to_ts, version, limit, channel, campaign
+    )
+
+
+async def breakdown_etag(
+    pool: asyncpg.Pool,
+    bucket: str,
+    by: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    top: int | None = None,
+) -> str:
+    range_from, range_to = breakdown_range(bucket, from_ts, to_ts)
+    version = await _range_version(pool, bucket, range_from, range_to)
+    return make_etag("breakdown", bucket, range_from, range_to, version, by, top)
+
+
+async def rollup_etag(
+    pool: asyncpg.Pool,
+    width: str | None,
+    from_ts: datetime,
+    to_ts: datetime,
+    channel: str | None = None,
+    campaign: str | None = None,
+    max_points: int | None = None,
+    metric: str = "revenue",
+) -> str:
+    width, width_seconds, plan = rollup_plan(width, from_ts, to_ts)
+    versions = await asyncio.gather(
+        *(
+            _range_version(pool, part.tier, part.from_ts, part.to_ts)
+            for part in plan
+        )
+    )
+    refreshed = None
+    if plan[0].tier == "day":
+        # kpi_day catches up with late kpi_hour writes on its refresh policy,
+        # not when updated_at moves, so day tokens also follow its refreshes.
+        refreshed = await _day_refresh_version(
+            pool, channel is not None or campaign is not None
+        )
+    return make_etag(
+        "rollup",
+        width_seconds,
+        tuple(plan),
+        tuple(versions),
+        refreshed,
+        channel,
+        campaign,
+        max_points,
+        metric,
+    )
+
+
+async def latest_etag(
+    pool: asyncpg.Pool,
+    bucket: str,
+    channel: str | None = None,
+    campaign: str | None = None,
+) -> str:
+    async def load() -> datetime | None:
+        return await fetch_table_version(pool, bucket)
+
+    version = await kpi_cache.get_or_load(("latest", bucket, "version"), load)
+    return make_etag("latest", bucket, version, channel, campaign)
+
+
+async def alerts_etag(
+    pool: asyncpg.Pool,
+    from_ts: datetime,
+    to_ts: datetime,
+    limit: int,
+    kpi: str | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> str:
+    from_ts, to_ts = alerts_range(from_ts, to_ts)
+
+    async def load() -> tuple[int, int | None]:
+        return await fetch_alerts_version(pool, from_ts, to_ts, kpi)
+
+    version = await kpi_cache.get_or_load(
+        ("alerts", from_ts, to_ts, "version", kpi),
+        load,
+        ttl_seconds=settings.KPI_CACHE_TTL_SECONDS,
+    )
+    return make_etag("alerts", from_ts, to_ts, version, limit, kpi, after)
+
+
+def invalidate_flushed(
+    bucket: str, min_bucket: datetime, max_bucket: datetime
+) -> int:
+    min_bucket, max_bucket = _as_utc(min_bucket), _as_utc(max_bucket)
+
+    def affected(key) -> bool:
+        if key[0] == "latest":
+            return key[1] == bucket
+        if key[0] == "series":
+            _, key_bucket, from_ts, to_ts = key[:4]
+            if key_bucket != bucket:
+                return False
+            return from_ts <= max_bucket and to_ts >= min_bucket
+        return False
+
+    return kpi_cache.invalidate(affected)
 
 
 async def fetch_freshness_info(
@@ -108,3 +631,75 @@ async def fetch_time_to_signal_info(
             max_seconds=row.get("sessions_max_seconds"),
         ),
     }
+
+
+async def fetch_stream_update(
+    pool: asyncpg.Pool, bucket: str, channel: str | None, campaign: str | None
+) -> KpiStreamUpdate:
+    point, freshness = await asyncio.gather(
+        fetch_latest_kpi(pool, bucket, channel, campaign),
+        fetch_freshness_info(pool, channel, campaign),
+    )
+    return KpiStreamUpdate(
+        bucket=bucket,
+        channel=channel,
+        campaign=campaign,
+        point=point,
+        freshness=freshness,
+    )
+
+
+async def fetch_dashboard_snapshot(
+    pool: asyncpg.Pool,
+    bucket: str,
+    from_ts: datetime,
+    to_ts: datetime,
+    channel: str | None = None,
+    campaign: str | None = None,
+    series_limit: int = 2000,
+    alerts_limit: int = 50,
+) -> DashboardSnapshot:
+    series_from, series_to = series_range(bucket, from_ts, to_ts)
+    alerts_from, alerts_to = alerts_range(from_ts, to_ts)
+
+    async def load() -> tuple:
+        # Each query takes its own pooled connection, so the snapshot costs
+        # about as long as its slowest part.
+        return await asyncio.gather(
+            fetch_latest_kpi(pool, bucket, channel, campaign),
+            fetch_series(
+                pool, bucket, from_ts, to_ts, series_limit, channel, campaign
+            ),
+            fetch_freshness_info(pool, channel, campaign),
+            fetch_alerts(pool, from_ts, to_ts, alerts_limit),
+        )
+
+    # A "series" key so flush notices evict it; the short TTL bounds the
+    # staleness of the alerts and freshness parts, which are never announced.
+    key = (
+        "series",
+        bucket,
+        series_from,
+        series_to,
+        "snapshot",
+        channel,
+        campaign,
+        series_limit,
+        alerts_from,
+        alerts_to,
+        alerts_limit,
+    )
+    latest, series, freshness, alerts = await kpi_cache.get_or_load(
+        key, load, ttl_seconds=settings.KPI_CACHE_TTL_SECONDS
+    )
+    return DashboardSnapshot(
+        bucket=bucket,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        channel=channel,
+        campaign=campaign,
+        latest=latest,
+        series=series,
+        freshness=freshness,
+        alerts=alerts,
+    )
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+
+from pydantic import BaseModel
+
+logger = logging.getLogger("ingest-api")
+
+Topic = tuple[str, str | None, str | None]
+LoadFn = Callable[[Topic], Awaitable[BaseModel]]
+
+
+def sse_frame(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode("ascii") + b"\ndata: " + data + b"\n\n"
+
+
+class KpiStreamHub:
+    # One upstream refresh per distinct (bucket, channel, campaign) topic, no
+    # matter how many viewers subscribe to it. Each update is serialized once
+    # and the same frame is handed to every subscriber queue.
+
+    def __init__(
+        self, interval_seconds: float, queue_size: int = 8, max_subscribers: int = 1000
+    ) -> None:
+        self.interval = interval_seconds
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.published = 0
+        self.dropped = 0
+        self._topics: dict[Topic, set[asyncio.Queue[bytes]]] = {}
+        self._wakeup = asyncio.Event()
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(queues) for queues in self._topics.values())
+
+    def subscribe(self, topic: Topic) -> asyncio.Queue[bytes] | None:
+        if self.subscribers >= self.max_subscribers:
+            return None
+        queue: asyncio.Queue[bytes] = asyncio.Queue(self.queue_size)
+        self._topics.setdefault(topic, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, topic: Topic, queue: asyncio.Queue[bytes]) -> None:
+        queues = self._topics.get(topic)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._topics[topic]
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def run(self, load: LoadFn) -> None:
+        while True:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            self._wakeup.clear()
+            await self.publish_once(load)
+
+    async def publish_once(self, load: LoadFn) -> None:
+        topics = list(self._topics)
+        if not topics:
+            return
+        results = await asyncio.gather(
+            *(load(topic) for topic in topics), return_exceptions=True
+        )
+        for topic, result in zip(topics, results):
+            if isinstance(result, BaseException):
+                # A load can be cancelled on its own, e.g. a shared cache load
+                # dropped by its last waiter; only the hub's own cancellation
+                # stops the loop.
+                current = asyncio.current_task()
+                if current is not None and current.cancelling():
+                    raise asyncio.CancelledError
+                logger.warning("KPI stream refresh failed for %s: %s", topic, result)
+                continue
+            frame = sse_frame("kpi", result.model_dump_json().encode("utf-8"))
+            for queue in self._topics.get(topic, ()):
+                if queue.full():
+                    # A slow viewer only needs the newest state, not a backlog.
+                    queue.get_nowait()
+                    self.dropped += 1
+                queue.put_nowait(frame)
+                self.published += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "topics": len(self._topics),
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "dropped": self.dropped,
+        }
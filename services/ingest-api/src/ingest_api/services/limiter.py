@@ -0,0 +1,135 @@
+import json
+import time
+from collections.abc import Awaitable, Callable, MutableMapping
+from typing import Any
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+class AdaptiveLimiter:
+    # AIMD: the limit grows by roughly one slot per fully used window of fast
+    # requests and is cut multiplicatively when requests get slow or fail, at
+    # most once per latency target so a single burst does not collapse it.
+
+    def __init__(
+        self,
+        name: str,
+        min_limit: int,
+        max_limit: int,
+        initial_limit: int,
+        latency_target_ms: float,
+        backoff: float = 0.9,
+    ) -> None:
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_target = latency_target_ms / 1000
+        self.backoff = backoff
+        self.in_flight = 0
+        self.rejected = 0
+        self._last_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency_seconds: float, overloaded: bool = False) -> None:
+        self.in_flight -= 1
+        now = time.monotonic()
+        if overloaded or latency_seconds > self.latency_target:
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif self.in_flight + 1 >= int(self.limit) * 0.5:
+            # Only grow while the limit is actually being exercised.
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: list[tuple[tuple[str, ...], AdaptiveLimiter]],
+        retry_after_seconds: int = 1,
+        exempt: tuple[str, ...] = (),
+    ) -> None:
+        self.app = app
+        self.routes = routes
+        self.exempt = exempt
+        self.retry_after = str(retry_after_seconds).encode("ascii")
+
+    def _limiter_for(self, scope: Scope) -> AdaptiveLimiter | None:
+        path: str = scope["path"]
+        root_path: str = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        if self.exempt and path.startswith(self.exempt):
+            return None
+        for prefixes, limiter in self.routes:
+            if path.startswith(prefixes):
+                return limiter
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        limiter = self._limiter_for(scope)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        if not limiter.try_acquire():
+            await self._reject(send, limiter)
+            return
+
+        status = 500
+        started = time.perf_counter()
+        latency: float | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, latency
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Time to first byte: a streamed export is slow by nature and
+                # must not read as an overloaded backend.
+                latency = time.perf_counter() - started
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if latency is None:
+                latency = time.perf_counter() - started
+            limiter.release(latency, overloaded=status >= 500 and status != 501)
+
+    async def _reject(self, send: Send, limiter: AdaptiveLimiter) -> None:
+        body = json.dumps(
+            {"detail": f"Too many concurrent {limiter.name} requests, retry later"}
+        ).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", self.retry_after),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
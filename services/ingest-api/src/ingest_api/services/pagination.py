@@ -0,0 +1,21 @@
+import base64
+import json
+from typing import Any
+
+
+def encode_cursor(fields: dict[str, Any]) -> str:
+    raw = json.dumps(fields, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    # Cursors are opaque to clients but not signed: they only carry the keyset
+    # position and the query they belong to, never anything authoritative.
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        fields = json.loads(raw)
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(fields, dict):
+        raise ValueError("Invalid cursor")
+    return fields
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from functools import partial
+
+from aiokafka import AIOKafkaProducer
+
+from ingest_api.settings import Settings
+
+logger = logging.getLogger("ingest-api")
+
+SYNC = "sync"
+ASYNC = "async"
+
+FailureHandler = Callable[[str, bytes, bytes], Awaitable[None]]
+
+
+def build_producer(settings: Settings) -> AIOKafkaProducer:
+    acks: int | str = settings.KAFKA_ACKS
+    if settings.KAFKA_ACKS.isdigit():
+        acks = int(settings.KAFKA_ACKS)
+    return AIOKafkaProducer(
+        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+        client_id=settings.KAFKA_CLIENT_ID,
+        acks=acks,
+        linger_ms=settings.KAFKA_LINGER_MS,
+        compression_type=settings.KAFKA_COMPRESSION_TYPE or None,
+        max_batch_size=settings.KAFKA_MAX_BATCH_SIZE,
+    )
+
+
+class Publisher:
+    def __init__(
+        self,
+        producer: AIOKafkaProducer,
+        mode: str = SYNC,
+        max_in_flight: int = 10000,
+        on_failure: FailureHandler | None = None,
+    ) -> None:
+        if mode not in (SYNC, ASYNC):
+            raise ValueError(f"Unsupported publish mode: {mode}")
+        self.producer = producer
+        self.mode = mode
+        self.on_failure = on_failure
+        self.delivered = 0
+        self.failed = 0
+        self._window = asyncio.Semaphore(max(1, max_in_flight))
+        self._pending: set[asyncio.Future] = set()
+        self._handlers: set[asyncio.Task[None]] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def send(
+        self, topic: str, key: bytes, value: bytes, handoff: bool | None = None
+    ) -> asyncio.Future:
+        # The window bounds memory held by undelivered messages; callers wait
+        # here instead of growing the producer buffer without limit.
+        await self._window.acquire()
+        try:
+            delivery = await self.producer.send(topic, value, key=key)
+        except BaseException:
+            self._window.release()
+            raise
+        self._pending.add(delivery)
+        if handoff is None:
+            handoff = self.mode == ASYNC
+        delivery.add_done_callback(
+            partial(self._on_delivery, topic, key, value, handoff)
+        )
+        return delivery
+
+    async def publish(self, topic: str, key: bytes, value: bytes) -> None:
+        delivery = await self.send(topic, key, value)
+        if self.mode == SYNC:
+            await delivery
+
+    async def deliver(self, topic: str, key: bytes, value: bytes) -> None:
+        await (await self.send(topic, key, value, handoff=False))
+
+    async def flush(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    def stats(self) -> dict[str, int | str]:
+        return {
+            "mode": self.mode,
+            "in_flight": self.in_flight,
+            "delivered": self.delivered,
+            "failed": self.failed,
+        }
+
+    def _on_delivery(
+        self,
+        topic: str,
+        key: bytes,
+        value: bytes,
+        handoff: bool,
+        delivery: asyncio.Future,
+    ) -> None:
+        self._pending.discard(delivery)
+        self._window.release()
+        if delivery.cancelled():
+            self.failed += 1
+            return
+        exc = delivery.exception()
+        if exc is None:
+            self.delivered += 1
+            return
+        self.failed += 1
+        # Without handoff the caller awaiting the future reports the error itself.
+        if not handoff:
+            return
+        logger.warning(
+            "Kafka delivery failed for %s: %s", key.decode("utf-8", "replace"), exc
+        )
+        if self.on_failure is not None:
+            task = asyncio.create_task(self.on_failure(topic, key, value))
+            self._handlers.add(task)
+            task.add_done_callback(self._handlers.discard)
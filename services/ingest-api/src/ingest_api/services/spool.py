@@ -0,0 +1,338 @@
+import asyncio
+import logging
+import os
+import struct
+import time
+import zlib
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger("ingest-api")
+
+# value length, crc32 of topic+key+value, spooled_at, topic length, key length
+_HEADER = struct.Struct(">IIdHH")
+_SEGMENT_SUFFIX = ".seg"
+_CURSOR_FILE = "cursor"
+_READ_CHUNK_BYTES = 1 << 20
+
+PublishFn = Callable[[str, bytes, bytes], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class SpoolRecord:
+    topic: str
+    key: bytes
+    value: bytes
+    spooled_at: float
+
+
+def record_size(record: SpoolRecord) -> int:
+    topic_len = len(record.topic.encode("utf-8"))
+    return _HEADER.size + topic_len + len(record.key) + len(record.value)
+
+
+def encode_record(record: SpoolRecord) -> bytes:
+    topic = record.topic.encode("utf-8")
+    body = topic + record.key + record.value
+    header = _HEADER.pack(
+        len(record.value),
+        zlib.crc32(body),
+        record.spooled_at,
+        len(topic),
+        len(record.key),
+    )
+    return header + body
+
+
+def decode_records(data: bytes, limit: int) -> tuple[list[SpoolRecord], int, bool]:
+    records: list[SpoolRecord] = []
+    offset = 0
+    while len(records) < limit and offset + _HEADER.size <= len(data):
+        value_len, crc, spooled_at, topic_len, key_len = _HEADER.unpack_from(
+            data, offset
+        )
+        start = offset + _HEADER.size
+        end = start + topic_len + key_len + value_len
+        if end > len(data):
+            break
+        body = data[start:end]
+        if zlib.crc32(body) != crc:
+            return records, offset, True
+        records.append(
+            SpoolRecord(
+                topic=body[:topic_len].decode("utf-8"),
+                key=body[topic_len : topic_len + key_len],
+                value=body[topic_len + key_len :],
+                spooled_at=spooled_at,
+            )
+        )
+        offset = end
+    return records, offset, False
+
+
+class DiskSpool:
+    def __init__(
+        self,
+        directory: Path,
+        segment_bytes: int = 64 << 20,
+        fsync_interval_ms: int = 20,
+    ) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval_ms / 1000
+        self.depth = 0
+        self.spooled_total = 0
+        self.replayed_total = 0
+        self._head_spooled_at: float | None = None
+        self._write_seq = 0
+        self._write_size = 0
+        self._file = None
+        self._read_seq = 0
+        self._read_offset = 0
+        self._io_lock = asyncio.Lock()
+        self._sync_waiter: asyncio.Future[None] | None = None
+        self._sync_tasks: set[asyncio.Task[None]] = set()
+        self._has_data = asyncio.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.depth > 0
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.directory / f"{seq:020d}{_SEGMENT_SUFFIX}"
+
+    def _segments(self) -> list[int]:
+        paths = self.directory.glob(f"*{_SEGMENT_SUFFIX}")
+        return sorted(int(path.stem) for path in paths)
+
+    def open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        cursor = self.directory / _CURSOR_FILE
+        if cursor.exists():
+            seq, offset = cursor.read_text(encoding="utf-8").split()
+            self._read_seq, self._read_offset = int(seq), int(offset)
+
+        segments = self._segments()
+        for seq in segments:
+            if seq < self._read_seq:
+                self._segment_path(seq).unlink()
+        segments = [seq for seq in segments if seq >= self._read_seq]
+        if segments and segments[0] > self._read_seq:
+            self._read_seq, self._read_offset = segments[0], 0
+
+        self.depth, self._head_spooled_at = self._count_pending(segments)
+        # Always start a fresh segment so new records never follow a torn tail.
+        self._write_seq = (segments[-1] + 1) if segments else self._read_seq
+        if not segments:
+            self._read_seq, self._read_offset = self._write_seq, 0
+        self._open_segment()
+        if self.depth:
+            logger.warning("Spool holds %s events from a previous run", self.depth)
+            self._has_data.set()
+
+    def _count_pending(self, segments: list[int]) -> tuple[int, float | None]:
+        count = 0
+        head: float | None = None
+        for seq in segments:
+            data = self._segment_path(seq).read_bytes()
+            offset = self._read_offset if seq == self._read_seq else 0
+            records, _, _ = decode_records(data[offset:], len(data))
+            count += len(records)
+            if head is None and records:
+                head = records[0].spooled_at
+        return count, head
+
+    def _peek_head(self) -> float | None:
+        # spooled_at of the first unread record, read from its header only.
+        for seq in self._segments():
+            if seq < self._read_seq:
+                continue
+            offset = self._read_offset if seq == self._read_seq else 0
+            with open(self._segment_path(seq), "rb") as segment:
+                segment.seek(offset)
+                header = segment.read(_HEADER.size)
+            if len(header) == _HEADER.size:
+                return _HEADER.unpack(header)[2]
+        return None
+
+    def _open_segment(self) -> None:
+        self._file = open(self._segment_path(self._write_seq), "ab")
+        self._write_size = self._file.tell()
+
+    async def append(self, topic: str, key: bytes, value: bytes) -> None:
+        await self.append_many([(topic, key, value)])
+
+    async def append_many(self, items: list[tuple[str, bytes, bytes]]) -> None:
+        if not items:
+            return
+        spooled_at = time.time()
+        async with self._io_lock:
+            for topic, key, value in items:
+                data = encode_record(SpoolRecord(topic, key, value, spooled_at))
+                size = self._write_size + len(data)
+                if self._write_size and size > self.segment_bytes:
+                    await self._roll()
+                self._file.write(data)
+                self._write_size += len(data)
+        if self.depth == 0:
+            self._head_spooled_at = spooled_at
+        self.depth += len(items)
+        self.spooled_total += len(items)
+        await self._commit()
+
+    async def _commit(self) -> None:
+        # Group commit: every append waiting within one fsync interval shares a
+        # single fsync issued from a worker thread.
+        if self._sync_waiter is None:
+            self._sync_waiter = asyncio.get_running_loop().create_future()
+            task = asyncio.create_task(self._sync_later(self._sync_waiter))
+            self._sync_tasks.add(task)
+            task.add_done_callback(self._sync_tasks.discard)
+        await asyncio.shield(self._sync_waiter)
+
+    async def _sync_later(self, waiter: asyncio.Future[None]) -> None:
+        try:
+            await asyncio.sleep(self.fsync_interval)
+            self._sync_waiter = None
+            async with self._io_lock:
+                self._file.flush()
+                await asyncio.to_thread(os.fsync, self._file.fileno())
+        except BaseException as exc:
+            if self._sync_waiter is waiter:
+                self._sync_waiter = None
+            waiter.set_exception(exc)
+            return
+        waiter.set_result(None)
+        self._has_data.set()
+
+    async def _roll(self) -> None:
+        self._file.flush()
+        await asyncio.to_thread(os.fsync, self._file.fileno())
+        self._file.close()
+        self._write_seq += 1
+        self._open_segment()
+
+    async def close(self) -> None:
+        # A task past its sleep no longer owns _sync_waiter but may still be
+        # syncing, so every pending one is awaited.
+        if self._sync_tasks:
+            await asyncio.gather(*self._sync_tasks, return_exceptions=True)
+        async with self._io_lock:
+            self._file.flush()
+            await asyncio.to_thread(os.fsync, self._file.fileno())
+            self._file.close()
+
+    def age_seconds(self) -> float:
+        if not self.depth or self._head_spooled_at is None:
+            return 0.0
+        return max(0.0, time.time() - self._head_spooled_at)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "depth": self.depth,
+            "age_seconds": round(self.age_seconds(), 3),
+            "segments": self._write_seq - self._read_seq + 1,
+            "spooled_total": self.spooled_total,
+            "replayed_total": self.replayed_total,
+        }
+
+    def _read_batch(self, limit: int) -> tuple[list[SpoolRecord], int, bool]:
+        with open(self._segment_path(self._read_seq), "rb") as segment:
+            segment.seek(self._read_offset)
+            data = segment.read(_READ_CHUNK_BYTES)
+        records, consumed, corrupt = decode_records(data, limit)
+        if not records and not corrupt and consumed == 0 and len(data) >= _HEADER.size:
+            # A single record larger than the chunk; read exactly its size.
+            value_len, _, _, topic_len, key_len = _HEADER.unpack_from(data)
+            size = _HEADER.size + topic_len + key_len + value_len
+            with open(self._segment_path(self._read_seq), "rb") as segment:
+                segment.seek(self._read_offset)
+                data = segment.read(size)
+            records, consumed, corrupt = decode_records(data, limit)
+        return records, consumed, corrupt
+
+    def _save_cursor(self) -> None:
+        cursor = self.directory / _CURSOR_FILE
+        tmp = cursor.with_suffix(".tmp")
+        tmp.write_text(f"{self._read_seq} {self._read_offset}", encoding="utf-8")
+        os.replace(tmp, cursor)
+
+    async def drain(
+        self, publish: PublishFn, batch_size: int = 500, retry_seconds: float = 1.0
+    ) -> None:
+        while True:
+            if not self.depth:
+                self._has_data.clear()
+                await self._has_data.wait()
+                continue
+
+            records, consumed, corrupt = await asyncio.to_thread(
+                self._read_batch, batch_size
+            )
+            if not records:
+                if corrupt:
+                    logger.error(
+                        "Corrupt spool record in segment %s at offset %s, "
+                        "skipping the rest of the segment",
+                        self._read_seq,
+                        self._read_offset + consumed,
+                    )
+                if corrupt or self._read_seq < self._write_seq:
+                    await self._skip_segment()
+                    continue
+                # Appended records are not flushed yet; wait for the next commit.
+                self._has_data.clear()
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(
+                        self._has_data.wait(), self.fsync_interval * 5
+                    )
+                continue
+
+            results = await asyncio.gather(
+                *(publish(r.topic, r.key, r.value) for r in records),
+                return_exceptions=True,
+            )
+            # Only the delivered prefix is committed, so replay keeps spool order
+            # and a failure re-sends from the first undelivered record.
+            delivered = 0
+            for record, result in zip(records, results):
+                if isinstance(result, BaseException):
+                    break
+                delivered += 1
+                self._read_offset += record_size(record)
+            if delivered:
+                self.depth -= delivered
+                self.replayed_total += delivered
+                await asyncio.to_thread(self._save_cursor)
+                if not self.depth and self._read_seq < self._write_seq:
+                    await self._skip_segment()
+                elif self.depth and delivered == len(records):
+                    # Records appended but not flushed yet are newer than the
+                    # current head, which is then kept.
+                    head = await asyncio.to_thread(self._peek_head)
+                    self._head_spooled_at = head or self._head_spooled_at
+            if delivered < len(records):
+                self._head_spooled_at = records[delivered].spooled_at
+                logger.warning(
+                    "Spool replay paused with %s events pending: %s",
+                    self.depth,
+                    results[delivered],
+                )
+                await asyncio.sleep(retry_seconds)
+
+    async def _skip_segment(self) -> None:
+        async with self._io_lock:
+            if self._read_seq == self._write_seq:
+                await self._roll()
+            self._file.flush()
+            drained = self._segment_path(self._read_seq)
+            self._read_seq += 1
+            self._read_offset = 0
+            await asyncio.to_thread(self._save_cursor)
+            await asyncio.to_thread(drained.unlink, True)
+            # Recount: a torn or corrupt tail may have held unreadable records.
+            self.depth, self._head_spooled_at = await asyncio.to_thread(
+                self._count_pending, self._segments()
+            )
@@ -19,14 +19,185 @@ class Settings(BaseModel):
     PORT: int = Field(8000, description="Bind port")
     LOG_LEVEL: str = Field("INFO", description="Logging level")
     LOG_EVERY_N: int = Field(100, description="Log every N events")
+    WORKERS: int = Field(1, description="Number of uvicorn worker processes")
+    RUNTIME_DIR: str = Field(
+        "run", description="Per-worker shared counter files, relative to the app"
+    )
+    METRICS_SYNC_INTERVAL_SECONDS: float = Field(
+        1.0, description="How often workers publish Kafka/spool gauges"
+    )
     ALLOWED_ORIGINS: list[str] = Field(default_factory=lambda: ["*"])
 
+    UVLOOP_ENABLED: bool = Field(False, description="Use uvloop when it is installed")
+    LOOP_DEBUG: bool = Field(False, description="Enable asyncio debug mode")
+    SLOW_CALLBACK_MS: int = Field(
+        100, description="Warn about loop stalls longer than this (ms), 0 disables"
+    )
+    LOOP_LAG_INTERVAL_SECONDS: float = Field(
+        1.0, description="Event loop lag probe interval in seconds"
+    )
+
+    INGEST_LIMIT_ENABLED: bool = Field(
+        False, description="Adaptive concurrency limit for /events routes"
+    )
+    INGEST_LIMIT_MIN: int = Field(16, description="Lower bound of the ingest limit")
+    INGEST_LIMIT_MAX: int = Field(2000, description="Upper bound of the ingest limit")
+    INGEST_LIMIT_INITIAL: int = Field(200, description="Starting ingest limit")
+    INGEST_LATENCY_TARGET_MS: float = Field(
+        250.0, description="Ingest latency above which the limit backs off"
+    )
+    KPI_LIMIT_ENABLED: bool = Field(
+        False, description="Adaptive concurrency limit for KPI read routes"
+    )
+    KPI_LIMIT_MIN: int = Field(4, description="Lower bound of the KPI read limit")
+    KPI_LIMIT_MAX: int = Field(200, description="Upper bound of the KPI read limit")
+    KPI_LIMIT_INITIAL: int = Field(50, description="Starting KPI read limit")
+    KPI_LATENCY_TARGET_MS: float = Field(
+        500.0, description="KPI read latency above which the limit backs off"
+    )
+    LIMIT_RETRY_AFTER_SECONDS: int = Field(
+        1, description="Retry-After sent with 429 responses"
+    )
+
     KAFKA_BOOTSTRAP_SERVERS: str = Field(..., description="Kafka bootstrap servers")
     KAFKA_ORDERS_TOPIC: str = Field("orders", description="Orders topic")
     KAFKA_SESSIONS_TOPIC: str = Field("sessions", description="Sessions topic")
     KAFKA_CLIENT_ID: str = Field("ingest-api", description="Kafka client id")
+    KAFKA_PUBLISH_MODE: str = Field(
+        "sync", description="sync waits for the broker ack, async acks on enqueue"
+    )
+    KAFKA_MAX_IN_FLIGHT: int = Field(
+        10000, description="Max undelivered messages in async publish mode"
+    )
+    KAFKA_ACKS: str = Field("all", description="Producer acks: 0 | 1 | all")
+    KAFKA_LINGER_MS: int = Field(0, description="Producer batching delay in ms")
+    KAFKA_COMPRESSION_TYPE: str | None = Field(
+        None, description="Producer compression: gzip | snappy | lz4 | zstd"
+    )
+    KAFKA_MAX_BATCH_SIZE: int = Field(
+        16384, description="Producer per-partition batch size in bytes"
+    )
+    SPOOL_ENABLED: bool = Field(
+        False, description="Spool events to local disk when Kafka publish fails"
+    )
+    SPOOL_DIR: str = Field("spool", description="Spool directory, relative to the app")
+    SPOOL_SEGMENT_BYTES: int = Field(
+        64 * 1024 * 1024, description="Spool segment file size before rolling"
+    )
+    SPOOL_FSYNC_INTERVAL_MS: int = Field(
+        20, description="Group commit window for spool fsync in ms"
+    )
+    SPOOL_DRAIN_BATCH: int = Field(500, description="Events replayed per drain step")
+    SPOOL_RETRY_SECONDS: float = Field(
+        1.0, description="Pause before retrying replay after a Kafka failure"
+    )
+    IDEMPOTENCY_ENABLED: bool = Field(
+        False, description="Answer recently accepted event_ids with duplicate"
+    )
+    IDEMPOTENCY_TTL_SECONDS: float = Field(
+        300.0, description="How long accepted event_ids are remembered"
+    )
+    IDEMPOTENCY_MAX_KEYS: int = Field(
+        200_000, description="Max remembered event_ids per worker"
+    )
+    FAST_SERIALIZATION: bool = Field(
+        True, description="Serialize events with pydantic's JSON serializer"
+    )
+    BATCH_MAX_EVENTS: int = Field(5000, description="Maximum events per batch request")
 
     DB_DSN: str = Field(..., description="PostgreSQL DSN")
+    DB_POOL_MIN_SIZE: int = Field(1, description="Primary pool minimum connections")
+    DB_POOL_MAX_SIZE: int = Field(5, description="Primary pool maximum connections")
+    DB_STATEMENT_TIMEOUT_MS: int = Field(
+        30000, description="Server-side statement_timeout of API connections"
+    )
+    DB_READ_DSN: str = Field(
+        "", description="Read replica DSN for KPI reads, empty to read the primary"
+    )
+    DB_READ_POOL_MIN_SIZE: int = Field(
+        2, description="Replica pool minimum connections"
+    )
+    DB_READ_POOL_MAX_SIZE: int = Field(
+        20, description="Replica pool maximum connections"
+    )
+    DB_READ_STATEMENT_CACHE_SIZE: int = Field(
+        1024, description="Prepared statements cached per replica connection"
+    )
+    DB_READ_COMMAND_TIMEOUT_SECONDS: float = Field(
+        10.0, description="Default timeout of replica queries"
+    )
+    DB_READ_MAX_LAG_SECONDS: float = Field(
+        5.0, description="Replica lag above which reads fall back to the primary"
+    )
+    DB_READ_LAG_CHECK_SECONDS: float = Field(
+        1.0, description="How often the replica lag is measured"
+    )
+    KPI_FAST_RESPONSES: bool = Field(
+        True, description="Serve KPI series as JSON built by Postgres"
+    )
+    KPI_LATEST_TIMEOUT_SECONDS: float = Field(
+        1.0, description="Time budget of /kpi/latest before it answers 504"
+    )
+    KPI_SERIES_TIMEOUT_SECONDS: float = Field(
+        5.0, description="Time budget of KPI series and breakdown requests"
+    )
+    KPI_ALERTS_TIMEOUT_SECONDS: float = Field(
+        3.0, description="Time budget of /alerts requests"
+    )
+    KPI_METRICS_TIMEOUT_SECONDS: float = Field(
+        3.0, description="Time budget of freshness and time-to-signal requests"
+    )
+    KPI_SERIES_MAX_BUCKETS: int = Field(
+        10000, description="Max buckets a /kpi/series request may cover"
+    )
+    KPI_SERIES_TARGET_POINTS: int = Field(
+        1000, description="Max buckets of the width /kpi/series picks by itself"
+    )
+    KPI_DAY_TIER_LAG_SECONDS: float = Field(
+        7200.0, description="Days ending within this lag are read from kpi_hour"
+    )
+    KPI_EXPORT_BATCH_ROWS: int = Field(
+        2000, description="Rows fetched from the cursor per export chunk"
+    )
+    KPI_EXPORT_MAX_CONCURRENT: int = Field(
+        2, description="Concurrent KPI exports per worker, each holds a DB connection"
+    )
+    KPI_CACHE_TTL_SECONDS: float = Field(
+        1.0, description="KPI read cache TTL, match the processor flush interval"
+    )
+    KPI_CACHE_MAX_ENTRIES: int = Field(
+        1024, description="Max cached KPI/alert query results per worker"
+    )
+    KPI_CACHE_NOTIFY_CHANNEL: str = Field(
+        "kpi_flushed", description="Processor flush NOTIFY channel, empty disables"
+    )
+    KPI_CACHE_NOTIFY_TTL_SECONDS: float = Field(
+        30.0, description="KPI cache TTL while flush notices are received"
+    )
+    KPI_CACHE_LISTENER_KEEPALIVE_SECONDS: float = Field(
+        10.0, description="Health check interval of the flush listener connection"
+    )
+    KPI_CACHE_LISTENER_RETRY_SECONDS: float = Field(
+        5.0, description="Delay before reconnecting the flush listener"
+    )
+    KPI_STREAM_INTERVAL_SECONDS: float = Field(
+        1.0, description="Push interval of /kpi/stream when no flush notice arrives"
+    )
+    KPI_STREAM_QUEUE_SIZE: int = Field(
+        8, description="Pending updates per stream subscriber before dropping"
+    )
+    KPI_STREAM_MAX_SUBSCRIBERS: int = Field(
+        1000, description="Max concurrent /kpi/stream subscribers per worker"
+    )
+    KPI_STREAM_KEEPALIVE_SECONDS: float = Field(
+        15.0, description="Idle time before a keepalive comment is sent"
+    )
+    KPI_STREAM_MAX_SECONDS: float = Field(
+        300.0, description="Stream lifetime before the client has to reconnect"
+    )
+    KPI_STREAM_RETRY_MS: int = Field(
+        3000, description="Reconnect delay advertised to EventSource clients"
+    )
 
 
 dynaconf_settings = Dynaconf(
@@ -0,0 +1,39 @@
+from ingest_api.services.counters import LocalCounters, SharedCounters, reset_counters
+
+
+def test_shared_counters_sum_across_worker_slots(tmp_path) -> None:
+    first = SharedCounters(tmp_path)
+    second = SharedCounters(tmp_path)
+    try:
+        assert (first.slot, second.slot) == (0, 1)
+        first.add("accepted", 3)
+        second.add("accepted", 4)
+        first.set("spool_age_ms", 1500)
+        second.set("spool_age_ms", 200)
+
+        totals = first.totals()
+        assert totals["accepted"] == 7
+        assert totals["spool_age_ms"] == 1500
+        assert first.workers() == 2
+    finally:
+        second.close()
+
+    # A replacement worker reuses the freed slot and keeps its totals.
+    replacement = SharedCounters(tmp_path)
+    try:
+        assert replacement.slot == 1
+        assert replacement.get("accepted") == 4
+        assert first.workers() == 2
+    finally:
+        replacement.close()
+        first.close()
+
+    reset_counters(tmp_path)
+    assert not tmp_path.exists()
+
+
+def test_local_counters_match_shared_interface() -> None:
+    counters = LocalCounters()
+    assert counters.add("accepted", 2) == 2
+    assert counters.totals()["accepted"] == 2
+    assert counters.workers() == 1
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from ingest_api.api.schemas import AlertItem, FreshnessResponse, KpiPoint
+from ingest_api.services import kpi_service
+from ingest_api.services.cache import QueryCache
+from ingest_api.services.kpi_service import (
+    fetch_dashboard_snapshot,
+    invalidate_flushed,
+)
+
+TO_TS = datetime(2026, 2, 3, 11, 0, 30, tzinfo=timezone.utc)
+FROM_TS = TO_TS - timedelta(hours=2)
+POINT = KpiPoint(
+    bucket=datetime(2026, 2, 3, 11, 0, tzinfo=timezone.utc),
+    revenue=149.0,
+    order_count=1,
+    view_count=3,
+    checkout_count=1,
+    purchase_count=1,
+)
+
+
+def _install_fakes(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    all_started = asyncio.Event()
+
+    async def started(name: str) -> None:
+        calls.append(name)
+        if len(calls) % 4 == 0:
+            all_started.set()
+        # Only returns once every part is running, i.e. they run concurrently.
+        await asyncio.wait_for(all_started.wait(), 1.0)
+
+    async def fake_latest(pool, bucket, channel=None, campaign=None):
+        await started("latest")
+        return POINT
+
+    async def fake_series(pool, bucket, from_ts, to_ts, limit, channel, campaign):
+        await started("series")
+        return [POINT]
+
+    async def fake_freshness(pool, channel=None, campaign=None):
+        await started("freshness")
+        return FreshnessResponse(now=TO_TS, channel=channel, campaign=campaign)
+
+    async def fake_alerts(pool, from_ts, to_ts, limit, kpi=None, after=None):
+        await started("alerts")
+        return [AlertItem(created_at=TO_TS, kpi="revenue", bucket=POINT.bucket)]
+
+    monkeypatch.setattr(kpi_service, "kpi_cache", QueryCache(60, 10))
+    monkeypatch.setattr(kpi_service, "fetch_latest_kpi", fake_latest)
+    monkeypatch.setattr(kpi_service, "fetch_series", fake_series)
+    monkeypatch.setattr(kpi_service, "fetch_freshness_info", fake_freshness)
+    monkeypatch.setattr(kpi_service, "fetch_alerts", fake_alerts)
+    return calls
+
+
+def test_snapshot_runs_parts_concurrently_and_is_cached(monkeypatch) -> None:
+    calls = _install_fakes(monkeypatch)
+
+    async def run() -> None:
+        snapshot = await fetch_dashboard_snapshot(
+            None, "minute", FROM_TS, TO_TS, channel="web"  # type: ignore[arg-type]
+        )
+        assert snapshot.latest == POINT
+        assert snapshot.series == [POINT]
+        assert snapshot.freshness.channel == "web"
+        assert len(snapshot.alerts) == 1
+        assert (snapshot.from_ts, snapshot.to_ts) == (FROM_TS, TO_TS)
+
+        again = await fetch_dashboard_snapshot(
+            None, "minute", FROM_TS, TO_TS, channel="web"  # type: ignore[arg-type]
+        )
+        assert again.series == [POINT]
+        assert len(calls) == 4
+
+        invalidate_flushed("minute", POINT.bucket, POINT.bucket)
+        await fetch_dashboard_snapshot(
+            None, "minute", FROM_TS, TO_TS, channel="web"  # type: ignore[arg-type]
+        )
+        assert len(calls) == 8
+
+    asyncio.run(run())
+    assert sorted(calls[:4]) == ["alerts", "freshness", "latest", "series"]
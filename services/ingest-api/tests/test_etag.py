@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+
+from ingest_api.api.kpi import kpi_latest
+from ingest_api.api.schemas import KpiPoint
+from ingest_api.services import kpi_service
+from ingest_api.services.cache import QueryCache
+from ingest_api.services.etag import etag_matches, make_etag
+from ingest_api.services.kpi_service import invalidate_flushed, series_etag
+
+TO_TS = datetime(2026, 2, 3, 11, 0, 30, tzinfo=timezone.utc)
+FROM_TS = TO_TS - timedelta(hours=2)
+
+
+def _request(if_none_match: str | None = None) -> SimpleNamespace:
+    async def receive() -> dict:
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return SimpleNamespace(
+        app=SimpleNamespace(state=SimpleNamespace(db_pool="pool")),
+        receive=receive,
+        headers=headers,
+    )
+
+
+def test_etag_comparison_is_weak() -> None:
+    etag = make_etag("series", "minute", 1)
+
+    assert etag.startswith('W/"')
+    assert etag == make_etag("series", "minute", 1)
+    assert etag != make_etag("series", "minute", 2)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_series_etag_follows_range_version(monkeypatch) -> None:
+    versions = [datetime(2026, 2, 3, 10, 59, tzinfo=timezone.utc)]
+    calls: list[tuple] = []
+
+    async def fake_version(pool, bucket, from_ts, to_ts):
+        calls.append((bucket, from_ts, to_ts))
+        return versions[-1]
+
+    monkeypatch.setattr(kpi_service, "kpi_cache", QueryCache(60, 10))
+    monkeypatch.setattr(kpi_service, "fetch_range_version", fake_version)
+
+    async def run() -> None:
+        first = await series_etag(None, "minute", FROM_TS, TO_TS, 2000)  # type: ignore[arg-type]
+        # Polls within the same bucket share the aligned range and its version.
+        later = TO_TS + timedelta(seconds=20)
+        assert await series_etag(None, "minute", FROM_TS, later, 2000) == first  # type: ignore[arg-type]
+        assert await series_etag(None, "minute", FROM_TS, TO_TS, 100) != first  # type: ignore[arg-type]
+        assert len(calls) == 1
+
+        versions.append(datetime(2026, 2, 3, 11, 0, 40, tzinfo=timezone.utc))
+        bucket = datetime(2026, 2, 3, 11, 0, tzinfo=timezone.utc)
+        invalidate_flushed("minute", bucket, bucket)
+        assert await series_etag(None, "minute", FROM_TS, TO_TS, 2000) != first  # type: ignore[arg-type]
+        assert len(calls) == 2
+
+    asyncio.run(run())
+    assert calls[0][1:] == (
+        datetime(2026, 2, 3, 9, 1, tzinfo=timezone.utc),
+        datetime(2026, 2, 3, 11, 0, tzinfo=timezone.utc),
+    )
+
+
+def test_matching_poll_gets_304_without_the_data_query(monkeypatch) -> None:
+    loads: list[str] = []
+
+    async def fake_etag(pool, bucket, channel=None, campaign=None):
+        return make_etag("latest", bucket, channel, campaign)
+
+    async def fake_latest(pool, bucket, channel=None, campaign=None, etag=None):
+        loads.append(bucket)
+        return KpiPoint(
+            bucket=TO_TS,
+            revenue=1.0,
+            order_count=1,
+            view_count=2,
+            checkout_count=1,
+            purchase_count=1,
+        )
+
+    monkeypatch.setattr("ingest_api.api.kpi.latest_etag", fake_etag)
+    monkeypatch.setattr("ingest_api.api.kpi.fetch_latest_kpi", fake_latest)
+
+    async def run() -> None:
+        response = Response()
+        body = await kpi_latest(
+            _request(), response, "minute", None, None  # type: ignore[arg-type]
+        )
+        etag = response.headers["ETag"]
+        assert body.point is not None
+
+        with pytest.raises(HTTPException) as error:
+            await kpi_latest(
+                _request(etag), Response(), "minute", None, None  # type: ignore[arg-type]
+            )
+        assert error.value.status_code == 304
+        assert error.value.headers == {"ETag": etag}
+
+        await kpi_latest(
+            _request(etag), Response(), "minute", "web", None  # type: ignore[arg-type]
+        )
+
+    asyncio.run(run())
+    assert loads == ["minute", "minute"]
+
+
+def test_etag_is_never_newer_than_the_cached_body(monkeypatch) -> None:
+    versions = [datetime(2026, 2, 3, 10, 59, tzinfo=timezone.utc)]
+    rows = [1.0]
+
+    async def fake_version(pool, bucket):
+        return versions[-1]
+
+    async def fake_row(pool, bucket, channel=None, campaign=None):
+        return {
+            "bucket": TO_TS,
+            "revenue": rows[-1],
+            "order_count": 1,
+            "view_count": 2,
+            "checkout_count": 1,
+            "purchase_count": 1,
+        }
+
+    cache = QueryCache(60, 10)
+    monkeypatch.setattr(kpi_service, "kpi_cache", cache)
+    monkeypatch.setattr(kpi_service, "fetch_table_version", fake_version)
+    monkeypatch.setattr(kpi_service, "fetch_latest_row", fake_row)
+
+    async def run() -> None:
+        response = Response()
+        body = await kpi_latest(
+            _request(), response, "minute", None, None  # type: ignore[arg-type]
+        )
+        first = response.headers["ETag"]
+        assert body.point is not None and body.point.revenue == 1.0
+
+        # The version entry expires ahead of the body it was served with.
+        versions.append(datetime(2026, 2, 3, 11, 0, tzinfo=timezone.utc))
+        rows.append(2.0)
+        cache.invalidate(lambda key: key[-1] == "version")
+
+        response = Response()
+        body = await kpi_latest(
+            _request(first), response, "minute", None, None  # type: ignore[arg-type]
+        )
+        assert response.headers["ETag"] != first
+        assert body.point is not None and body.point.revenue == 2.0
+
+    asyncio.run(run())
@@ -0,0 +1,26 @@
+from ingest_api.services.idempotency import IdempotencyCache
+
+
+def test_idempotency_cache_expires_and_bounds_keys() -> None:
+    cache = IdempotencyCache(ttl_seconds=10, max_size=2)
+    cache.remember("a", now=0)
+    assert cache.seen("a", now=5) is True
+    assert cache.seen("b", now=5) is False
+    assert cache.seen("a", now=10) is False
+
+    cache.remember("a", now=20)
+    cache.remember("b", now=21)
+    cache.remember("c", now=22)
+    assert len(cache) == 2
+    assert cache.seen("a", now=22) is False
+    assert cache.seen("c", now=22) is True
+
+
+def test_idempotency_cache_reserves_and_forgets_keys() -> None:
+    cache = IdempotencyCache(ttl_seconds=10, max_size=10)
+    assert cache.reserve("a", now=0) is True
+    assert cache.reserve("a", now=1) is False
+
+    cache.forget("a")
+    assert cache.reserve("a", now=2) is True
+    assert cache.reserve("a", now=12) is True
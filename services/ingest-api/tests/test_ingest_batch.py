@@ -0,0 +1,201 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from ingest_api.api import ingest
+from ingest_api.api.schemas import OrderEvent, SessionEvent
+from ingest_api.services.counters import LocalCounters
+from ingest_api.services.idempotency import IdempotencyCache
+from ingest_api.services.ingest_service import (
+    parse_batch_body,
+    parse_batch_item,
+    to_payload_bytes,
+)
+from ingest_api.services.publisher import Publisher
+
+ORDER = {
+    "order_id": "o-1",
+    "customer_id": "c-1",
+    "amount": 120.5,
+    "currency": "USD",
+    "channel": "web",
+    "event_time": "2026-02-03T10:00:00Z",
+}
+SESSION = {
+    "session_id": "s-1",
+    "user_id": "u-1",
+    "event_type": "view",
+    "channel": "web",
+    "event_time": "2026-02-03T10:00:00Z",
+}
+
+
+class FakeProducer:
+    def __init__(self, fail_keys: set[bytes] | None = None) -> None:
+        self.fail_keys = fail_keys or set()
+        self.sent: list[tuple[str, bytes]] = []
+
+    async def send(self, topic: str, value: bytes, key: bytes) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if key in self.fail_keys:
+            future.set_exception(RuntimeError("broker down"))
+        else:
+            self.sent.append((topic, key))
+            future.set_result(None)
+        return future
+
+
+def _request(body: bytes, producer: FakeProducer, content_type: str = "application/json"):
+    state = SimpleNamespace(
+        publisher=Publisher(producer),
+        spool=None,
+        idempotency=IdempotencyCache(60, 100),
+        counters=LocalCounters(),
+        serialize=to_payload_bytes,
+    )
+
+    async def read_body() -> bytes:
+        return body
+
+    return SimpleNamespace(
+        app=SimpleNamespace(state=state),
+        headers={"content-type": content_type},
+        body=read_body,
+    )
+
+
+def test_parse_batch_body_accepts_array_and_ndjson() -> None:
+    as_array = parse_batch_body(json.dumps([ORDER, SESSION]).encode(), "application/json")
+    ndjson = "\n".join(json.dumps(item) for item in (ORDER, SESSION)) + "\n\n"
+    as_lines = parse_batch_body(ndjson.encode(), "application/x-ndjson; charset=utf-8")
+    assert as_array == as_lines == [ORDER, SESSION]
+
+
+def test_parse_batch_body_rejects_invalid_payloads() -> None:
+    with pytest.raises(ValueError, match="JSON array"):
+        parse_batch_body(json.dumps(ORDER).encode(), "application/json")
+    with pytest.raises(ValueError, match="line 2"):
+        parse_batch_body(b'{"a": 1}\n{broken', "application/x-ndjson")
+
+
+def test_parse_batch_item_uses_type_or_infers_it() -> None:
+    assert isinstance(parse_batch_item({**ORDER, "type": "order"}), OrderEvent)
+    assert isinstance(parse_batch_item(SESSION), SessionEvent)
+    with pytest.raises(ValueError):
+        parse_batch_item({"channel": "web"})
+
+
+def test_ingest_batch_reports_per_item_results() -> None:
+    producer = FakeProducer(fail_keys={b"o-2"})
+    items = [
+        ORDER,
+        {**SESSION, "type": "session"},
+        {"order_id": "o-x"},
+        {**ORDER, "order_id": "o-2"},
+    ]
+    request = _request(json.dumps(items).encode(), producer)
+
+    response = asyncio.run(ingest.ingest_batch(request))  # type: ignore[arg-type]
+
+    assert (response.accepted, response.rejected, response.failed) == (2, 1, 1)
+    assert [result.status for result in response.results] == [
+        "accepted",
+        "accepted",
+        "rejected",
+        "failed",
+    ]
+    assert response.results[0].event_id == "o-1"
+    assert "amount" in (response.results[2].error or "")
+    assert [topic for topic, _ in producer.sent] == ["orders", "sessions"]
+    assert request.app.state.counters.get("accepted") == 2
+    assert request.app.state.counters.get("rejected") == 1
+
+
+def test_ingest_batch_enforces_size_limit(monkeypatch) -> None:
+    monkeypatch.setattr(ingest.settings, "BATCH_MAX_EVENTS", 1)
+    request = _request(json.dumps([ORDER, ORDER]).encode(), FakeProducer())
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(ingest.ingest_batch(request))  # type: ignore[arg-type]
+    assert exc_info.value.status_code == 413
+
+
+def test_ingest_batch_drops_recent_duplicates() -> None:
+    producer = FakeProducer()
+    request = _request(json.dumps([ORDER, ORDER]).encode(), producer)
+
+    first = asyncio.run(ingest.ingest_batch(request))  # type: ignore[arg-type]
+    second = asyncio.run(ingest.ingest_batch(request))  # type: ignore[arg-type]
+
+    assert [r.status for r in first.results] == ["accepted", "duplicate"]
+    assert [r.status for r in second.results] == ["duplicate", "duplicate"]
+    assert len(producer.sent) == 1
+    assert request.app.state.counters.get("duplicates") == 3
+
+
+class SlowProducer(FakeProducer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.acks: list[asyncio.Future] = []
+
+    async def send(self, topic: str, value: bytes, key: bytes) -> asyncio.Future:
+        self.sent.append((topic, key))
+        self.acks.append(asyncio.get_running_loop().create_future())
+        return self.acks[-1]
+
+
+def test_retry_during_a_slow_publish_is_a_duplicate() -> None:
+    producer = SlowProducer()
+    request = _request(b"", producer)
+    event = OrderEvent.model_validate(ORDER)
+
+    async def run() -> None:
+        first = asyncio.ensure_future(ingest.ingest_order(event, request))  # type: ignore[arg-type]
+        while not producer.acks:
+            await asyncio.sleep(0)
+        # The retry arrives while the original still waits for the broker ack.
+        retry = await ingest.ingest_order(event, request)  # type: ignore[arg-type]
+        assert retry.status == "duplicate"
+        producer.acks[0].set_result(None)
+        assert (await first).status == "accepted"
+
+    asyncio.run(run())
+    assert len(producer.sent) == 1
+
+
+def test_failed_publish_releases_the_reservation() -> None:
+    producer = SlowProducer()
+    request = _request(b"", producer)
+    event = OrderEvent.model_validate(ORDER)
+
+    async def run() -> None:
+        first = asyncio.ensure_future(ingest.ingest_order(event, request))  # type: ignore[arg-type]
+        while not producer.acks:
+            await asyncio.sleep(0)
+        producer.acks[0].set_exception(RuntimeError("broker down"))
+        with pytest.raises(HTTPException) as error:
+            await first
+        assert error.value.status_code == 503
+
+        retry = asyncio.ensure_future(ingest.ingest_order(event, request))  # type: ignore[arg-type]
+        while len(producer.acks) < 2:
+            await asyncio.sleep(0)
+        producer.acks[1].set_result(None)
+        assert (await retry).status == "accepted"
+
+    asyncio.run(run())
+    assert len(producer.sent) == 2
+
+
+def test_failed_batch_items_can_be_retried() -> None:
+    producer = FakeProducer(fail_keys={b"o-1"})
+    request = _request(json.dumps([ORDER]).encode(), producer)
+
+    first = asyncio.run(ingest.ingest_batch(request))  # type: ignore[arg-type]
+    producer.fail_keys.clear()
+    second = asyncio.run(ingest.ingest_batch(request))  # type: ignore[arg-type]
+
+    assert [r.status for r in first.results] == ["failed"]
+    assert [r.status for r in second.results] == ["accepted"]
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+
+from ingest_api.benchmark import (
+    BenchConfig,
+    build_app,
+    build_report,
+    compare_reports,
+    generate_orders,
+    ingest_orders,
+    run_benchmarks,
+)
+
+
+def test_run_benchmarks_reports_both_serializers() -> None:
+    config = BenchConfig(requests=50)
+    report = build_report(config, run_benchmarks(config))
+
+    names = [item["name"] for item in report["results"]]
+    assert names == [
+        "serialize_json_dumps",
+        "serialize_pydantic_json",
+        "ingest_order_json_dumps",
+        "ingest_order_pydantic_json",
+    ]
+    for item in report["results"]:
+        assert item["operations"] == 50
+        assert item["ops_per_second"] > 0
+    assert set(compare_reports(report, report)) == set(names)
+
+
+def test_ingest_orders_posts_through_the_route_with_the_given_serializer() -> None:
+    app = build_app()
+    sent: list[bytes] = []
+    send = app.state.publisher.producer.send
+
+    async def recording_send(topic: str, value: bytes, key: bytes):
+        sent.append(value)
+        return await send(topic, value, key=key)
+
+    app.state.publisher.producer.send = recording_send
+    bodies = [
+        json.dumps(order).encode("utf-8")
+        for order in generate_orders(BenchConfig(requests=3))
+    ]
+
+    def serialize(event, event_id: str) -> bytes:
+        return event_id.encode("utf-8")
+
+    asyncio.run(ingest_orders(app, bodies, serialize))
+    assert sent == [b"o-0", b"o-1", b"o-2"]
+    assert app.state.counters.get("accepted") == 3
+
+
+def test_ingest_orders_fails_on_rejected_requests() -> None:
+    app = build_app()
+    body = json.dumps({"order_id": "o-1"}).encode("utf-8")
+
+    with pytest.raises(RuntimeError, match="422"):
+        asyncio.run(ingest_orders(app, [body], lambda event, event_id: b"{}"))
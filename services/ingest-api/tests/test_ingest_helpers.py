@@ -1,7 +1,12 @@
+import json
 from datetime import datetime, timezone
 
 from ingest_api.api.schemas import OrderEvent
-from ingest_api.services.ingest_service import make_event_id, to_payload
+from ingest_api.services.ingest_service import (
+    make_event_id,
+    to_payload,
+    to_payload_bytes,
+)
 
 
 def test_make_event_id_includes_parts() -> None:
@@ -28,3 +33,25 @@ def test_to_payload_normalizes_time_fields() -> None:
     assert "received_at" in payload
     parsed_received = datetime.fromisoformat(payload["received_at"])
     assert parsed_received.tzinfo is not None
+
+
+def test_to_payload_bytes_matches_dict_payload() -> None:
+    event = OrderEvent(
+        order_id="o-1",
+        amount=120.5,
+        channel="web",
+        campaign='spring "25"',
+        event_time=datetime(2026, 2, 3, 10, 0, 0, 123000, tzinfo=timezone.utc),
+        event_id="ignored",
+    )
+
+    fast = json.loads(to_payload_bytes(event, event_id="order:é/1"))
+    slow = to_payload(event, event_id="order:é/1")
+
+    assert datetime.fromisoformat(fast.pop("event_time").replace("Z", "+00:00")) == (
+        datetime.fromisoformat(slow.pop("event_time"))
+    )
+    fast_received = datetime.fromisoformat(fast.pop("received_at"))
+    assert fast_received.tzinfo is not None
+    slow.pop("received_at")
+    assert fast == slow
@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ingest_api.domain.kpi_repository import fetch_breakdown_rows
+from ingest_api.services import kpi_service
+from ingest_api.services.cache import QueryCache
+from ingest_api.services.kpi_service import fetch_breakdown
+
+START = datetime(2026, 2, 3, 10, 0, tzinfo=timezone.utc)
+
+
+class _Connection:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, tuple]] = []
+
+    async def fetch(self, query, *args, timeout=None):
+        self.calls.append((query, args))
+        return []
+
+
+class _Acquire:
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Pool:
+    def __init__(self) -> None:
+        self.conn = _Connection()
+
+    def acquire(self):
+        return _Acquire(self.conn)
+
+
+def test_breakdown_groups_segments_and_totals_in_one_query() -> None:
+    pool = _Pool()
+    asyncio.run(
+        fetch_breakdown_rows(pool, "hour", "channel", START, START, 3)  # type: ignore[arg-type]
+    )
+    asyncio.run(
+        fetch_breakdown_rows(pool, "minute", "channel,campaign", START, START)  # type: ignore[arg-type]
+    )
+
+    (by_channel, args), (by_pair, pair_args) = pool.conn.calls
+    assert "GROUP BY GROUPING SETS ((bucket, channel), (bucket))" in by_channel
+    assert "NULL::TEXT AS campaign" in by_channel
+    assert "FROM orders_segment_hour" in by_channel
+    assert "FROM sessions_segment_hour" in by_channel
+    assert args == (START, START, 3)
+    assert "GROUPING SETS ((bucket, channel, campaign), (bucket))" in by_pair
+    assert "o.campaign IS NOT DISTINCT FROM s.campaign" in by_pair
+    assert pair_args == (START, START, None)
+
+    with pytest.raises(ValueError):
+        asyncio.run(fetch_breakdown_rows(pool, "minute", "region", START, START))  # type: ignore[arg-type]
+
+
+def _row(level, channel, rank, bucket, revenue):
+    return {
+        "level": level,
+        "channel": channel,
+        "campaign": None,
+        "segment_rank": rank,
+        "bucket": bucket,
+        "revenue": revenue,
+        "order_count": 1,
+        "average_order_value": revenue,
+        "view_count": 2,
+        "checkout_count": 1,
+        "purchase_count": 1,
+        "conversion_rate": 0.5,
+    }
+
+
+def test_breakdown_splits_rows_into_totals_and_ranked_segments(monkeypatch) -> None:
+    monkeypatch.setattr(kpi_service, "kpi_cache", QueryCache(60, 10))
+    calls = []
+    rows = [
+        _row(1, None, None, START, 30.0),
+        _row(0, "ads", 1, START, 20.0),
+        _row(0, "web", 2, START, 10.0),
+        _row(1, None, None, START + timedelta(minutes=1), 5.0),
+        _row(0, "web", 2, START + timedelta(minutes=1), 5.0),
+    ]
+
+    async def fake_fetch_breakdown_rows(pool, bucket, by, from_ts, to_ts, top):
+        calls.append((bucket, by, from_ts, to_ts, top))
+        return [dict(row) for row in rows]
+
+    monkeypatch.setattr(
+        kpi_service, "fetch_breakdown_rows", fake_fetch_breakdown_rows
+    )
+
+    result = asyncio.run(
+        fetch_breakdown(
+            None,  # type: ignore[arg-type]
+            "minute",
+            "channel",
+            START - timedelta(seconds=30),
+            START + timedelta(minutes=1, seconds=30),
+            top=2,
+        )
+    )
+    asyncio.run(
+        fetch_breakdown(
+            None,  # type: ignore[arg-type]
+            "minute",
+            "channel",
+            START - timedelta(seconds=10),
+            START + timedelta(minutes=1, seconds=50),
+            top=2,
+        )
+    )
+
+    assert calls == [("minute", "channel", START, START + timedelta(minutes=1), 2)]
+    assert [point.revenue for point in result.totals] == [30.0, 5.0]
+    assert [segment.channel for segment in result.segments] == ["ads", "web"]
+    assert [len(segment.points) for segment in result.segments] == [1, 2]
+
+
+def test_breakdown_rejects_oversized_ranges(monkeypatch) -> None:
+    monkeypatch.setattr(kpi_service.settings, "KPI_SERIES_MAX_BUCKETS", 100)
+    with pytest.raises(ValueError, match="hour buckets"):
+        asyncio.run(
+            fetch_breakdown(
+                None, "minute", "channel", START, START + timedelta(days=1)  # type: ignore[arg-type]
+            )
+        )
@@ -0,0 +1,182 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from ingest_api.services import kpi_service
+from ingest_api.services.cache import QueryCache
+from ingest_api.services.flush_listener import handle_flush_notice
+from ingest_api.services.kpi_service import alerts_range, fetch_series, series_range
+
+
+def test_concurrent_misses_share_one_load() -> None:
+    cache = QueryCache(ttl_seconds=60, max_entries=10)
+    calls = 0
+
+    async def load() -> list[int]:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [calls]
+
+    async def run() -> None:
+        results = await asyncio.gather(
+            *(cache.get_or_load("key", load) for _ in range(5))
+        )
+        assert results == [[1]] * 5
+        assert await cache.get_or_load("key", load) == [1]
+
+    asyncio.run(run())
+    assert calls == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 4
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_and_failed_loads_are_not_served() -> None:
+    cache = QueryCache(ttl_seconds=0.01, max_entries=10)
+    calls = 0
+
+    async def load() -> int:
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def failing() -> int:
+        raise RuntimeError("db down")
+
+    async def run() -> None:
+        assert await cache.get_or_load("key", load) == 1
+        await asyncio.sleep(0.02)
+        assert await cache.get_or_load("key", load) == 2
+        try:
+            await cache.get_or_load("other", failing)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("load error was swallowed")
+        assert await cache.get_or_load("other", load) == 3
+
+    asyncio.run(run())
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = QueryCache(ttl_seconds=60, max_entries=2)
+
+    async def run() -> None:
+        for key in ("a", "b"):
+            await cache.get_or_load(key, lambda key=key: asyncio.sleep(0, key))
+        await cache.get_or_load("a", lambda: asyncio.sleep(0, "stale"))
+        await cache.get_or_load("c", lambda: asyncio.sleep(0, "c"))
+        assert await cache.get_or_load("a", lambda: asyncio.sleep(0, "x")) == "a"
+        assert await cache.get_or_load("b", lambda: asyncio.sleep(0, "new")) == "new"
+
+    asyncio.run(run())
+    assert len(cache) == 2
+
+
+def test_series_range_snaps_to_bucket_edges() -> None:
+    from_ts, to_ts = series_range(
+        "minute",
+        datetime(2026, 2, 3, 10, 0, 15, tzinfo=timezone.utc),
+        datetime(2026, 2, 3, 10, 30, 45),
+    )
+    assert from_ts == datetime(2026, 2, 3, 10, 1, tzinfo=timezone.utc)
+    assert to_ts == datetime(2026, 2, 3, 10, 30, tzinfo=timezone.utc)
+
+
+def test_alerts_range_only_snaps_live_windows() -> None:
+    now = datetime(2026, 2, 3, 10, 0, 0, 400000, tzinfo=timezone.utc)
+    live = alerts_range(
+        datetime(2026, 2, 3, 9, 0, 0, 300000, tzinfo=timezone.utc), now, now=now
+    )
+    assert live == (
+        datetime(2026, 2, 3, 9, 0, 1, tzinfo=timezone.utc),
+        datetime(2026, 2, 3, 10, 0, 1, tzinfo=timezone.utc),
+    )
+    past = datetime(2026, 2, 3, 9, 30, 0, 500000, tzinfo=timezone.utc)
+    assert alerts_range(past, past, now=now) == (past, past)
+
+
+def test_polls_within_one_bucket_hit_the_cache(monkeypatch) -> None:
+    monkeypatch.setattr(kpi_service, "kpi_cache", QueryCache(60, 10))
+    calls = []
+
+    async def fake_fetch_range_rows(pool, bucket, from_ts, to_ts, *_args):
+        calls.append((from_ts, to_ts))
+        return []
+
+    monkeypatch.setattr(kpi_service, "fetch_range_rows", fake_fetch_range_rows)
+
+    async def run() -> None:
+        for second in (5, 20, 55):
+            await fetch_series(
+                None,  # type: ignore[arg-type]
+                "minute",
+                datetime(2026, 2, 3, 9, 0, second, tzinfo=timezone.utc),
+                datetime(2026, 2, 3, 10, 0, second, tzinfo=timezone.utc),
+                100,
+            )
+
+    asyncio.run(run())
+    assert calls == [
+        (
+            datetime(2026, 2, 3, 9, 1, tzinfo=timezone.utc),
+            datetime(2026, 2, 3, 10, 0, tzinfo=timezone.utc),
+        )
+    ]
+
+
+def test_invalidation_drops_entries_and_discards_inflight_results() -> None:
+    cache = QueryCache(ttl_seconds=60, max_entries=10)
+    release = asyncio.Event()
+
+    async def slow() -> str:
+        await release.wait()
+        return "old"
+
+    async def run() -> None:
+        await cache.get_or_load("a", lambda: asyncio.sleep(0, "a"))
+        pending = asyncio.ensure_future(cache.get_or_load("b", slow))
+        await asyncio.sleep(0)
+        assert cache.invalidate(lambda key: True) == 1
+        release.set()
+        assert await pending == "old"
+        assert await cache.get_or_load("b", lambda: asyncio.sleep(0, "new")) == "new"
+
+    asyncio.run(run())
+    assert cache.stats()["invalidated"] == 1
+
+
+def test_flush_notice_invalidates_only_overlapping_ranges(monkeypatch) -> None:
+    cache = QueryCache(60, 10)
+    monkeypatch.setattr(kpi_service, "kpi_cache", cache)
+
+    def at(hour: int, minute: int) -> datetime:
+        return datetime(2026, 2, 3, hour, minute, tzinfo=timezone.utc)
+
+    async def seed() -> None:
+        for key in (
+            ("series", "minute", at(9, 0), at(10, 0), 100, None, None),
+            ("series", "minute", at(8, 0), at(9, 0), 100, None, None),
+            ("series", "hour", at(0, 0), at(10, 0), 100, None, None),
+            ("latest", "minute", None, None),
+            ("latest", "hour", None, None),
+            ("alerts", at(9, 0), at(10, 0), 100, None),
+        ):
+            await cache.get_or_load(key, lambda: asyncio.sleep(0, []))
+
+    asyncio.run(seed())
+    payload = json.dumps(
+        {
+            "granularity": "minute",
+            "min_bucket": "2026-02-03T09:58:00+00:00",
+            "max_bucket": "2026-02-03T10:00:00+00:00",
+        }
+    )
+    assert handle_flush_notice(payload) == 2
+    assert sorted(key[:2] for key in cache._entries) == [
+        ("alerts", at(9, 0)),
+        ("latest", "hour"),
+        ("series", "hour"),
+        ("series", "minute"),
+    ]
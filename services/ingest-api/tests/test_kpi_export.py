@@ -0,0 +1,221 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pyarrow as pa
+import pytest
+from fastapi import HTTPException
+
+from ingest_api.api import kpi
+from ingest_api.services import kpi_export
+from ingest_api.services.kpi_export import gzip_chunks, stream_series
+
+BUCKET = datetime(2026, 2, 3, 10, 0, tzinfo=timezone.utc)
+
+
+def _row(minute: int) -> dict:
+    return {
+        "bucket": BUCKET.replace(minute=minute),
+        "revenue": Decimal("149.50"),
+        "order_count": 1,
+        "average_order_value": 149.5,
+        "view_count": 4,
+        "checkout_count": 2,
+        "purchase_count": 1,
+        "conversion_rate": 0.25,
+    }
+
+
+class _Transaction:
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        self._conn.in_transaction = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._conn.in_transaction = False
+        return False
+
+
+class _Cursor:
+    def __init__(self, rows: list[dict]) -> None:
+        self._rows = rows
+
+    async def fetch(self, count: int) -> list[dict]:
+        batch, self._rows = self._rows[:count], self._rows[count:]
+        return batch
+
+
+class _Connection:
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.in_transaction = False
+        self.cursor_args: tuple = ()
+
+    def transaction(self, readonly: bool = False):
+        assert readonly
+        return _Transaction(self)
+
+    async def cursor(self, query, *args):
+        assert self.in_transaction
+        self.cursor_args = args
+        return _Cursor(self.rows)
+
+
+class _Acquire:
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Pool:
+    def __init__(self, rows: list[dict]) -> None:
+        self.conn = _Connection(rows)
+
+    def acquire(self):
+        return _Acquire(self.conn)
+
+
+async def _collect(chunks) -> list[bytes]:
+    return [chunk async for chunk in chunks]
+
+
+def _export(pool: _Pool, fmt: str, batch_rows: int = 2) -> list[bytes]:
+    chunks = stream_series(
+        pool, "minute", BUCKET, BUCKET, None, None, None, fmt, batch_rows  # type: ignore[arg-type]
+    )
+    return asyncio.run(_collect(chunks))
+
+
+def test_ndjson_export_streams_cursor_batches() -> None:
+    pool = _Pool([_row(minute) for minute in range(5)])
+
+    chunks = _export(pool, "ndjson")
+
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert len(lines) == 5
+    assert json.loads(lines[0]) == {
+        "bucket": "2026-02-03T10:00:00Z",
+        "revenue": 149.5,
+        "order_count": 1,
+        "average_order_value": 149.5,
+        "view_count": 4,
+        "checkout_count": 2,
+        "purchase_count": 1,
+        "conversion_rate": 0.25,
+    }
+    # No limit is applied to exports unless the client asks for one.
+    assert pool.conn.cursor_args == (BUCKET, BUCKET, None)
+
+
+def test_csv_export_writes_header_and_rows() -> None:
+    body = b"".join(_export(_Pool([_row(1)]), "csv")).decode("utf-8")
+
+    header, row = body.splitlines()
+    assert header.startswith("bucket,revenue,order_count")
+    assert row == "2026-02-03T10:01:00+00:00,149.5,1,149.5,4,2,1,0.25"
+
+
+def test_arrow_export_round_trips() -> None:
+    body = b"".join(_export(_Pool([_row(minute) for minute in range(3)]), "arrow"))
+
+    table = pa.ipc.open_stream(body).read_all()
+    assert table.num_rows == 3
+    assert table.column("revenue").to_pylist() == [149.5] * 3
+
+
+def test_gzip_chunks_produce_one_gzip_stream() -> None:
+    async def chunks():
+        for part in (b"a" * 1000, b"b" * 1000):
+            yield part
+
+    body = b"".join(asyncio.run(_collect(gzip_chunks(chunks()))))
+    assert gzip.decompress(body) == b"a" * 1000 + b"b" * 1000
+
+
+def test_accepts_gzip_honours_q_zero() -> None:
+    def request(value: str) -> SimpleNamespace:
+        return SimpleNamespace(headers={"accept-encoding": value})
+
+    assert kpi._accepts_gzip(request("br, gzip;q=0.8"))  # type: ignore[arg-type]
+    assert not kpi._accepts_gzip(request("gzip;q=0"))  # type: ignore[arg-type]
+    assert not kpi._accepts_gzip(request("identity"))  # type: ignore[arg-type]
+
+
+def test_export_is_refused_when_slots_are_taken() -> None:
+    async def run() -> None:
+        slots = asyncio.Semaphore(1)
+        await slots.acquire()
+        request = SimpleNamespace(
+            app=SimpleNamespace(state=SimpleNamespace(export_slots=slots)),
+            headers={},
+        )
+        with pytest.raises(HTTPException) as busy:
+            await kpi._export_response(
+                request, "minute", BUCKET, BUCKET, None, None, None, "csv"  # type: ignore[arg-type]
+            )
+        assert busy.value.status_code == 429
+
+    asyncio.run(run())
+
+
+def test_float_columns_follow_the_point_schema() -> None:
+    assert kpi_export._FLOAT_COLUMNS == {
+        "revenue",
+        "average_order_value",
+        "conversion_rate",
+    }
+
+
+def test_export_slot_is_released_when_the_body_never_starts(monkeypatch) -> None:
+    async def chunks(*args):
+        yield b"never read"
+
+    monkeypatch.setattr(kpi, "stream_series", chunks)
+
+    async def run() -> None:
+        slots = asyncio.Semaphore(1)
+        state = SimpleNamespace(export_slots=slots, db_pool=None)
+        request = SimpleNamespace(app=SimpleNamespace(state=state), headers={})
+        response = await kpi._export_response(
+            request, "minute", BUCKET, BUCKET, None, None, None, "csv"  # type: ignore[arg-type]
+        )
+        assert slots.locked()
+
+        async def receive() -> dict:
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            raise OSError("client went away")
+
+        with pytest.raises(OSError):
+            await response({"type": "http"}, receive, send)
+        assert not slots.locked()
+
+        # A completed export releases its slot exactly once.
+        response = await kpi._export_response(
+            request, "minute", BUCKET, BUCKET, None, None, None, "csv"  # type: ignore[arg-type]
+        )
+        sent: list[dict] = []
+
+        async def record(message: dict) -> None:
+            sent.append(message)
+
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        await response(scope, receive, record)
+        assert sent[-1]["type"] == "http.response.body"
+        assert sent[-1]["more_body"] is False
+        assert slots._value == 1
+
+    asyncio.run(run())
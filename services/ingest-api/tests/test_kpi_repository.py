@@ -0,0 +1,131 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from ingest_api.domain.db import query_deadline
+from ingest_api.domain.kpi_repository import (
+    fetch_alerts_rows,
+    fetch_latest_row,
+    fetch_range_json,
+    fetch_range_rows,
+)
+
+
+class _RecordingConnection:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, tuple]] = []
+        self.timeouts: list[float | None] = []
+
+    async def fetch(self, query, *args, timeout=None):
+        self.calls.append((query, args))
+        self.timeouts.append(timeout)
+        return []
+
+    async def fetchrow(self, query, *args, timeout=None):
+        self.calls.append((query, args))
+        self.timeouts.append(timeout)
+        if "json_agg" in query:
+            return {"points": "[]", "count": 0, "last_bucket": None}
+        return None
+
+
+class _Acquire:
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Pool:
+    def __init__(self) -> None:
+        self.conn = _RecordingConnection()
+
+    def acquire(self):
+        return _Acquire(self.conn)
+
+
+FROM_TS = datetime(2026, 2, 3, 9, 0, tzinfo=timezone.utc)
+TO_TS = datetime(2026, 2, 3, 11, 0, tzinfo=timezone.utc)
+
+
+def test_unfiltered_range_reads_kpi_view() -> None:
+    pool = _Pool()
+    asyncio.run(fetch_range_rows(pool, "minute", FROM_TS, TO_TS, 10))  # type: ignore[arg-type]
+
+    query, args = pool.conn.calls[0]
+    assert "FROM kpi_minute_view" in query
+    assert args == (FROM_TS, TO_TS, 10)
+
+
+def test_segment_range_reads_continuous_aggregates() -> None:
+    pool = _Pool()
+    asyncio.run(
+        fetch_range_rows(pool, "hour", FROM_TS, TO_TS, 10, campaign="promo")  # type: ignore[arg-type]
+    )
+
+    query, args = pool.conn.calls[0]
+    assert "FROM orders_segment_hour" in query
+    assert "FROM sessions_segment_hour" in query
+    assert "FROM orders\n" not in query
+    assert "AND campaign = $4" in query
+    assert "channel =" not in query
+    assert args == (FROM_TS, TO_TS, 10, "promo")
+
+
+def test_segment_latest_binds_both_filters() -> None:
+    pool = _Pool()
+    row = asyncio.run(
+        fetch_latest_row(pool, "minute", channel="web", campaign="promo")  # type: ignore[arg-type]
+    )
+
+    assert row is None
+    query, args = pool.conn.calls[0]
+    assert "FROM orders_segment_minute" in query
+    assert "AND channel = $1 AND campaign = $2" in query
+    assert args == ("web", "promo")
+
+
+def test_range_json_wraps_the_same_range_query() -> None:
+    pool = _Pool()
+    points, count, last_bucket = asyncio.run(
+        fetch_range_json(pool, "minute", FROM_TS, TO_TS, 10, channel="web")  # type: ignore[arg-type]
+    )
+
+    query, args = pool.conn.calls[0]
+    assert (points, count, last_bucket) == (b"[]", 0, None)
+    assert "json_agg" in query
+    assert "FROM orders_segment_minute" in query
+    assert "AND channel = $4" in query
+    assert args == (FROM_TS, TO_TS, 10, "web")
+
+
+def test_alerts_keyset_page_adds_row_comparison() -> None:
+    pool = _Pool()
+    asyncio.run(fetch_alerts_rows(pool, FROM_TS, TO_TS, 10))  # type: ignore[arg-type]
+    asyncio.run(
+        fetch_alerts_rows(pool, FROM_TS, TO_TS, 10, "revenue", after=(TO_TS, 42))  # type: ignore[arg-type]
+    )
+
+    first, page = pool.conn.calls
+    assert "(created_at, id) <" not in first[0]
+    assert "ORDER BY created_at DESC, id DESC" in first[0]
+    assert "AND (created_at, id) < ($5, $6)" in page[0]
+    assert page[1] == (FROM_TS, TO_TS, 10, "revenue", TO_TS, 42)
+
+
+def test_queries_get_the_remaining_request_budget_as_timeout() -> None:
+    pool = _Pool()
+
+    async def run() -> None:
+        await fetch_range_rows(pool, "minute", FROM_TS, TO_TS, 10)  # type: ignore[arg-type]
+        with query_deadline(time.monotonic() + 2.0):
+            await fetch_range_json(pool, "minute", FROM_TS, TO_TS, 10)  # type: ignore[arg-type]
+
+    asyncio.run(run())
+    unbudgeted, budgeted = pool.conn.timeouts
+    assert unbudgeted is None
+    assert budgeted is not None and 0 < budgeted <= 2.0
@@ -0,0 +1,267 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ingest_api.api.schemas import KpiPoint
+from ingest_api.domain.kpi_repository import TierRange, fetch_rollup_rows, plan_tiers
+from ingest_api.services import kpi_service
+from ingest_api.services.cache import QueryCache
+from ingest_api.services.downsampling import lttb
+from ingest_api.services.kpi_service import (
+    auto_width,
+    fetch_rollup_series,
+    invalidate_flushed,
+    parse_width,
+    rollup_etag,
+)
+
+START = datetime(2026, 2, 3, 0, 0, tzinfo=timezone.utc)
+
+
+def test_lttb_keeps_endpoints_and_spikes() -> None:
+    values = [0.0] * 100
+    values[37] = 50.0
+    points = list(enumerate(values))
+
+    sampled = lttb(points, 10, key=lambda point: (float(point[0]), point[1]))
+
+    assert len(sampled) == 10
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert (37, 50.0) in sampled
+    assert lttb(points, 200, key=lambda point: point) == points
+
+
+def test_parse_width() -> None:
+    assert parse_width("15m") == 900
+    assert parse_width("1d") == 86400
+    for bad in ("0m", "5s", "m", "1.5h"):
+        with pytest.raises(ValueError):
+            parse_width(bad)
+
+
+class _Connection:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, tuple]] = []
+
+    async def fetch(self, query, *args, timeout=None):
+        self.calls.append((query, args))
+        return []
+
+
+class _Acquire:
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Pool:
+    def __init__(self) -> None:
+        self.conn = _Connection()
+
+    def acquire(self):
+        return _Acquire(self.conn)
+
+
+def test_rollup_queries_bucket_source_tables() -> None:
+    pool = _Pool()
+    width = timedelta(minutes=15)
+    asyncio.run(fetch_rollup_rows(pool, "minute", width, START, START))  # type: ignore[arg-type]
+    asyncio.run(
+        fetch_rollup_rows(pool, "hour", width, START, START, channel="web")  # type: ignore[arg-type]
+    )
+
+    (plain, plain_args), (segment, segment_args) = pool.conn.calls
+    assert "time_bucket($3::interval, bucket)" in plain
+    assert "FROM kpi_minute\n" in plain
+    assert plain_args == (START, START, width)
+    assert "FROM orders_segment_hour" in segment
+    assert "time_bucket($3::interval, bucket) AS bucket" in segment
+    assert segment_args == (START, START, width, "web")
+
+
+def test_rollup_series_picks_source_and_downsamples(monkeypatch) -> None:
+    monkeypatch.setattr(kpi_service, "kpi_cache", QueryCache(60, 10))
+    calls = []
+
+    async def fake_fetch_rollup_rows(pool, source, width, from_ts, to_ts, *_args):
+        calls.append((source, width, from_ts, to_ts))
+        return [
+            KpiPoint(
+                bucket=START + timedelta(hours=index),
+                revenue=float(index % 7),
+                order_count=1,
+                view_count=1,
+                checkout_count=0,
+                purchase_count=0,
+            ).model_dump()
+            for index in range(48)
+        ]
+
+    monkeypatch.setattr(kpi_service, "fetch_rollup_rows", fake_fetch_rollup_rows)
+
+    series = asyncio.run(
+        fetch_rollup_series(
+            None,  # type: ignore[arg-type]
+            "2h",
+            START + timedelta(minutes=90),
+            START + timedelta(days=2, minutes=30),
+            max_points=12,
+        )
+    )
+
+    assert len(series.points) == 12
+    assert series.tiers == ["hour"]
+    assert calls == [
+        (
+            "hour",
+            timedelta(hours=2),
+            START,
+            START + timedelta(days=2),
+        )
+    ]
+
+
+def test_rollup_series_rejects_unbounded_ranges(monkeypatch) -> None:
+    monkeypatch.setattr(kpi_service.settings, "KPI_SERIES_MAX_BUCKETS", 100)
+    with pytest.raises(ValueError, match="wider width"):
+        asyncio.run(
+            fetch_rollup_series(
+                None, "1m", START, START + timedelta(days=1)  # type: ignore[arg-type]
+            )
+        )
+
+
+def test_plan_tiers_picks_coarsest_tier_and_splits_unmaterialized_days() -> None:
+    boundary = START + timedelta(days=10)
+    end = START + timedelta(days=12, hours=5)
+
+    assert plan_tiers(900, START, end, boundary) == [TierRange("minute", START, end)]
+    assert plan_tiers(7200, START, end, boundary) == [TierRange("hour", START, end)]
+    assert plan_tiers(86400, START, boundary - timedelta(days=1), boundary) == [
+        TierRange("day", START, boundary - timedelta(days=1))
+    ]
+    assert plan_tiers(86400, boundary, end, boundary) == [
+        TierRange("hour", boundary, end)
+    ]
+    assert plan_tiers(86400, START, end, boundary) == [
+        TierRange("day", START, boundary - timedelta(microseconds=1)),
+        TierRange("hour", boundary, end),
+    ]
+
+
+def test_auto_width_keeps_range_under_target(monkeypatch) -> None:
+    monkeypatch.setattr(kpi_service.settings, "KPI_SERIES_TARGET_POINTS", 1000)
+    assert auto_width(START, START + timedelta(hours=6)) == "1m"
+    assert auto_width(START, START + timedelta(days=1)) == "5m"
+    assert auto_width(START, START + timedelta(days=30)) == "1h"
+    assert auto_width(START, START + timedelta(days=3650)) == "7d"
+
+
+def test_rollup_series_merges_day_tier_with_recent_hours(monkeypatch) -> None:
+    monkeypatch.setattr(kpi_service, "kpi_cache", QueryCache(60, 10))
+    monkeypatch.setattr(
+        kpi_service, "day_complete_before", lambda: START + timedelta(days=5)
+    )
+    calls = []
+
+    async def fake_fetch_rollup_rows(pool, source, width, from_ts, to_ts, *_args):
+        calls.append((source, from_ts, to_ts))
+        return [
+            KpiPoint(
+                bucket=from_ts,
+                revenue=1.0,
+                order_count=1,
+                view_count=1,
+                checkout_count=0,
+                purchase_count=0,
+            ).model_dump()
+        ]
+
+    monkeypatch.setattr(kpi_service, "fetch_rollup_rows", fake_fetch_rollup_rows)
+
+    series = asyncio.run(
+        fetch_rollup_series(
+            None,  # type: ignore[arg-type]
+            "1d",
+            START + timedelta(hours=3),
+            START + timedelta(days=6, hours=7, minutes=20),
+        )
+    )
+
+    assert series.tiers == ["day", "hour"]
+    assert series.bucket == "1d"
+    assert calls == [
+        ("day", START, START + timedelta(days=4)),
+        ("hour", START + timedelta(days=5), START + timedelta(days=6, hours=7)),
+    ]
+    assert [point.bucket for point in series.points] == [
+        START,
+        START + timedelta(days=5),
+    ]
+
+
+def test_day_only_rollup_is_evicted_by_hour_notices(monkeypatch) -> None:
+    monkeypatch.setattr(kpi_service, "kpi_cache", QueryCache(60, 10))
+    monkeypatch.setattr(
+        kpi_service, "day_complete_before", lambda: START + timedelta(days=30)
+    )
+    calls = []
+
+    async def fake_fetch_rollup_rows(pool, source, width, from_ts, to_ts, *_args):
+        calls.append(source)
+        return []
+
+    monkeypatch.setattr(kpi_service, "fetch_rollup_rows", fake_fetch_rollup_rows)
+
+    async def run() -> None:
+        end = START + timedelta(days=7)
+        series = await fetch_rollup_series(None, "1d", START, end)  # type: ignore[arg-type]
+        assert series.tiers == ["day"]
+        await fetch_rollup_series(None, "1d", START, end)  # type: ignore[arg-type]
+        assert len(calls) == 1
+
+        late = START + timedelta(days=2, hours=5)
+        invalidate_flushed("hour", late, late)
+        await fetch_rollup_series(None, "1d", START, end)  # type: ignore[arg-type]
+        assert calls == ["day", "day"]
+
+    asyncio.run(run())
+
+
+def test_day_rollup_etag_follows_day_tier_refreshes(monkeypatch) -> None:
+    monkeypatch.setattr(kpi_service, "kpi_cache", QueryCache(60, 10))
+    monkeypatch.setattr(
+        kpi_service, "day_complete_before", lambda: START + timedelta(days=30)
+    )
+    refreshes = [START + timedelta(days=8, hours=1)]
+    segmented: list[bool] = []
+
+    async def fake_range_version(pool, tier, from_ts, to_ts):
+        return START + timedelta(days=6)
+
+    async def fake_refresh_version(pool, is_segmented):
+        segmented.append(is_segmented)
+        return refreshes[-1]
+
+    monkeypatch.setattr(kpi_service, "fetch_range_version", fake_range_version)
+    monkeypatch.setattr(kpi_service, "fetch_day_refresh_version", fake_refresh_version)
+
+    async def run() -> None:
+        end = START + timedelta(days=7)
+        first = await rollup_etag(None, "1d", START, end)  # type: ignore[arg-type]
+        # kpi_hour has not moved, but the refresh job rewrote the day rows.
+        refreshes.append(START + timedelta(days=8, hours=2))
+        kpi_service.kpi_cache.invalidate(lambda key: key[0] == "day_refresh")
+        assert await rollup_etag(None, "1d", START, end) != first  # type: ignore[arg-type]
+        await rollup_etag(None, "1d", START, end, channel="web")  # type: ignore[arg-type]
+        # Hour-only ranges do not depend on the day tier.
+        await rollup_etag(None, "1h", START, START + timedelta(hours=6))  # type: ignore[arg-type]
+
+    asyncio.run(run())
+    assert segmented == [False, False, True]
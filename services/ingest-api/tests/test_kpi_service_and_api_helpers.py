@@ -1,10 +1,17 @@
 import asyncio
+import json
 from datetime import datetime, timezone
 from types import SimpleNamespace
 
+from fastapi import Response
+
 from ingest_api.api.kpi import _ensure_range, _map_alert_kpi, alerts
-from ingest_api.api.schemas import AlertType
-from ingest_api.services.kpi_service import _alert_type_from_kpi, fetch_alerts
+from ingest_api.api.schemas import AlertType, KpiPoint, KpiSeries
+from ingest_api.services.kpi_service import (
+    _alert_type_from_kpi,
+    fetch_alerts,
+    series_json,
+)
 
 
 def test_map_alert_kpi_views_to_view_count() -> None:
@@ -74,7 +81,9 @@ def test_fetch_alerts_enriches_alert_type(monkeypatch) -> None:
 def test_alerts_endpoint_maps_views_filter(monkeypatch) -> None:
     captured: dict[str, object] = {}
 
-    async def fake_fetch_alerts(pool, from_ts, to_ts, limit, kpi):
+    async def fake_fetch_alerts(
+        pool, from_ts, to_ts, limit, kpi, after=None, etag=None
+    ):
         captured["pool"] = pool
         captured["from_ts"] = from_ts
         captured["to_ts"] = to_ts
@@ -82,18 +91,30 @@ def test_alerts_endpoint_maps_views_filter(monkeypatch) -> None:
         captured["kpi"] = kpi
         return []
 
+    async def fake_alerts_etag(pool, from_ts, to_ts, limit, kpi, after=None):
+        return 'W/"v1"'
+
     monkeypatch.setattr("ingest_api.api.kpi.fetch_alerts", fake_fetch_alerts)
+    monkeypatch.setattr("ingest_api.api.kpi.alerts_etag", fake_alerts_etag)
+    async def receive() -> dict:
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
     request = SimpleNamespace(
-        app=SimpleNamespace(state=SimpleNamespace(db_pool="pool"))
+        app=SimpleNamespace(state=SimpleNamespace(db_pool="pool")),
+        receive=receive,
+        headers={},
     )
 
     async def run() -> None:
         response = await alerts(
             request=request,  # type: ignore[arg-type]
+            response=Response(),
             from_ts=None,
             to_ts=None,
             limit=123,
             kpi=AlertType.VIEWS,
+            cursor=None,
         )
         assert response.items == []
 
@@ -103,3 +124,35 @@ def test_alerts_endpoint_maps_views_filter(monkeypatch) -> None:
     assert captured["kpi"] == "view_count"
     assert isinstance(captured["from_ts"], datetime)
     assert isinstance(captured["to_ts"], datetime)
+
+
+def test_series_json_matches_model_serialization() -> None:
+    from_ts = datetime(2026, 2, 3, 9, 0, tzinfo=timezone.utc)
+    to_ts = datetime(2026, 2, 3, 11, 0, tzinfo=timezone.utc)
+    point = KpiPoint(
+        bucket=datetime(2026, 2, 3, 10, 0, tzinfo=timezone.utc),
+        revenue=149.0,
+        order_count=1,
+        average_order_value=149.0,
+        view_count=3,
+        checkout_count=1,
+        purchase_count=1,
+        conversion_rate=0.33,
+    )
+    # Shaped like the rows Postgres builds for the fast path.
+    points = (
+        b'[{"bucket": "2026-02-03T10:00:00Z", "revenue": 149.0, "order_count": 1, '
+        b'"average_order_value": 149.0, "view_count": 3, "checkout_count": 1, '
+        b'"purchase_count": 1, "conversion_rate": 0.33}]'
+    )
+
+    body = series_json("minute", from_ts, to_ts, "web", None, points)
+
+    expected = KpiSeries(
+        bucket="minute",
+        from_ts=from_ts,
+        to_ts=to_ts,
+        channel="web",
+        points=[point],
+    )
+    assert json.loads(body) == json.loads(expected.model_dump_json())
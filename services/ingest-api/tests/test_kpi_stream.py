@@ -0,0 +1,103 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from ingest_api.api import kpi
+from ingest_api.api.schemas import FreshnessResponse, KpiStreamUpdate
+from ingest_api.services.kpi_stream import KpiStreamHub
+
+
+def _update(topic) -> KpiStreamUpdate:
+    bucket, channel, campaign = topic
+    return KpiStreamUpdate(
+        bucket=bucket,
+        channel=channel,
+        campaign=campaign,
+        freshness=FreshnessResponse(now=datetime(2026, 2, 3, tzinfo=timezone.utc)),
+    )
+
+
+def _payload(frame: bytes) -> dict:
+    event, data = frame.decode("utf-8").strip().split("\n")
+    assert event == "event: kpi"
+    return json.loads(data.removeprefix("data: "))
+
+
+def test_one_refresh_per_topic_fans_out_to_all_subscribers() -> None:
+    loads = []
+
+    async def load(topic):
+        loads.append(topic)
+        return _update(topic)
+
+    async def run() -> None:
+        hub = KpiStreamHub(interval_seconds=60)
+        web = ("minute", "web", None)
+        first = hub.subscribe(web)
+        second = hub.subscribe(web)
+        other = hub.subscribe(("hour", None, None))
+        await hub.publish_once(load)
+
+        frame = first.get_nowait()
+        assert second.get_nowait() is frame
+        assert _payload(frame)["channel"] == "web"
+        assert _payload(other.get_nowait())["bucket"] == "hour"
+        assert sorted(loads, key=str) == [("hour", None, None), web]
+
+        hub.unsubscribe(web, first)
+        hub.unsubscribe(web, second)
+        assert hub.stats()["topics"] == 1
+
+    asyncio.run(run())
+
+
+def test_slow_subscriber_keeps_only_newest_updates() -> None:
+    async def run() -> None:
+        hub = KpiStreamHub(interval_seconds=60, queue_size=2, max_subscribers=1)
+        queue = hub.subscribe(("minute", None, None))
+        assert hub.subscribe(("minute", None, None)) is None
+        for _ in range(5):
+            await hub.publish_once(lambda topic: asyncio.sleep(0, _update(topic)))
+        assert queue.qsize() == 2
+        assert hub.stats()["dropped"] == 3
+
+    asyncio.run(run())
+
+
+def test_cancelled_load_is_skipped_without_stopping_the_others() -> None:
+    async def load(topic):
+        if topic[1] == "web":
+            raise asyncio.CancelledError
+        return _update(topic)
+
+    async def run() -> None:
+        hub = KpiStreamHub(interval_seconds=60)
+        web = hub.subscribe(("minute", "web", None))
+        other = hub.subscribe(("minute", None, None))
+        await hub.publish_once(load)
+
+        assert web.empty()
+        assert _payload(other.get_nowait())["channel"] is None
+        assert hub.stats()["published"] == 1
+
+    asyncio.run(run())
+
+
+def test_stream_events_sends_retry_first_update_and_unsubscribes(monkeypatch) -> None:
+    monkeypatch.setattr(kpi.settings, "KPI_STREAM_MAX_SECONDS", 0.05)
+    monkeypatch.setattr(kpi.settings, "KPI_STREAM_KEEPALIVE_SECONDS", 0.01)
+
+    async def run() -> None:
+        hub = KpiStreamHub(interval_seconds=60)
+        topic = ("minute", None, None)
+        queue = hub.subscribe(topic)
+        frames = [
+            frame
+            async for frame in kpi._stream_events(hub, topic, queue, b"first\n\n")
+        ]
+        assert frames[0].startswith(b"retry: ")
+        assert frames[1] == b"first\n\n"
+        assert b": keepalive\n\n" in frames[2:]
+        assert hub.subscribers == 0
+
+    asyncio.run(run())
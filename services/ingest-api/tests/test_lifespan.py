@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from ingest_api import main
+from ingest_api.services.counters import LocalCounters
+
+
+class _Closing:
+    def __init__(self, name: str, closed: list[str]) -> None:
+        self.name = name
+        self.closed = closed
+
+    async def close(self) -> None:
+        self.closed.append(self.name)
+
+
+class _Counters(LocalCounters):
+    def __init__(self, closed: list[str]) -> None:
+        super().__init__()
+        self.closed = closed
+
+    def close(self) -> None:
+        self.closed.append("counters")
+
+
+class _Producer:
+    def __init__(self, closed: list[str], fail: str | None) -> None:
+        self.closed = closed
+        self.fail = fail
+
+    async def start(self) -> None:
+        if self.fail == "start":
+            raise OSError("broker unreachable")
+
+    async def stop(self) -> None:
+        self.closed.append("producer")
+        if self.fail == "stop":
+            raise OSError("broker unreachable")
+
+
+def _patch(monkeypatch, closed: list[str], fail: str | None) -> None:
+    async def create_pool():
+        return _Closing("primary", closed)
+
+    async def create_read_pool():
+        return None
+
+    async def gauges(*_args) -> None:
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(main, "open_counters", lambda _path: _Counters(closed))
+    monkeypatch.setattr(
+        main, "build_producer", lambda _settings: _Producer(closed, fail)
+    )
+    monkeypatch.setattr(main, "create_pool", create_pool)
+    monkeypatch.setattr(main, "create_read_pool", create_read_pool)
+    monkeypatch.setattr(main, "sync_worker_gauges", gauges)
+    monkeypatch.setattr(main.settings, "SPOOL_ENABLED", False)
+    monkeypatch.setattr(main.settings, "KPI_CACHE_NOTIFY_CHANNEL", "")
+
+
+def test_failed_startup_closes_what_was_opened(monkeypatch) -> None:
+    closed: list[str] = []
+    _patch(monkeypatch, closed, fail="start")
+
+    async def run() -> None:
+        with pytest.raises(OSError):
+            async with main._worker():
+                pass
+
+    asyncio.run(run())
+    assert closed == ["producer", "primary", "counters"]
+
+
+def test_failing_shutdown_step_does_not_skip_the_rest(monkeypatch) -> None:
+    closed: list[str] = []
+    _patch(monkeypatch, closed, fail="stop")
+
+    async def run() -> None:
+        with pytest.raises(OSError):
+            async with main._worker():
+                assert closed == []
+
+    asyncio.run(run())
+    assert closed == ["producer", "primary", "counters"]
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+from ingest_api.services.limiter import AdaptiveLimiter, ConcurrencyLimitMiddleware
+
+
+def test_limiter_backs_off_on_slow_requests_and_recovers() -> None:
+    limiter = AdaptiveLimiter(
+        "ingest", min_limit=2, max_limit=10, initial_limit=4, latency_target_ms=0
+    )
+    assert all(limiter.try_acquire() for _ in range(4))
+    assert limiter.try_acquire() is False
+    assert limiter.rejected == 1
+
+    limiter.release(1.0)
+    assert limiter.limit < 4
+
+    limiter.latency_target = 10.0
+    for _ in range(3):
+        limiter.release(0.001)
+    assert limiter.limit > 4
+    assert limiter.in_flight == 0
+
+    # An idle limiter does not keep growing.
+    before = limiter.limit
+    for _ in range(50):
+        assert limiter.try_acquire()
+        limiter.release(0.001)
+    assert limiter.limit == before
+
+
+def test_middleware_sheds_with_retry_after_per_route_group() -> None:
+    release = asyncio.Event()
+    ingest = AdaptiveLimiter("ingest", 1, 1, 1, latency_target_ms=1000)
+    kpi = AdaptiveLimiter("kpi", 1, 1, 1, latency_target_ms=1000)
+
+    async def app(scope, receive, send) -> None:
+        if scope["path"].startswith("/events"):
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    middleware = ConcurrencyLimitMiddleware(
+        app, [(("/events/",), ingest), (("/kpi/",), kpi)], retry_after_seconds=2
+    )
+
+    async def call(path: str) -> list[dict]:
+        sent: list[dict] = []
+
+        async def receive() -> dict:
+            return {"type": "http.request", "body": b""}
+
+        async def send(message: dict) -> None:
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": path, "root_path": ""}
+        await middleware(scope, receive, send)
+        return sent
+
+    async def run() -> None:
+        first = asyncio.create_task(call("/events/order"))
+        await asyncio.sleep(0)
+        shed = await call("/events/order")
+        dashboard = await call("/kpi/latest")
+        release.set()
+        await first
+
+        assert shed[0]["status"] == 429
+        assert (b"retry-after", b"2") in shed[0]["headers"]
+        assert "ingest" in json.loads(shed[1]["body"])["detail"]
+        assert dashboard[0]["status"] == 200
+        assert ingest.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_exempt_paths_bypass_the_limiter() -> None:
+    limiter = AdaptiveLimiter("kpi", 1, 1, 1, latency_target_ms=1000)
+    assert limiter.try_acquire()
+
+    async def app(scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = ConcurrencyLimitMiddleware(
+        app, [(("/kpi/",), limiter)], exempt=("/kpi/stream",)
+    )
+
+    async def call(path: str) -> int:
+        sent: list[dict] = []
+
+        async def receive() -> dict:
+            return {"type": "http.request", "body": b""}
+
+        async def send(message: dict) -> None:
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "root_path": ""}
+        await middleware(scope, receive, send)
+        return sent[0]["status"]
+
+    assert asyncio.run(call("/kpi/stream")) == 200
+    assert asyncio.run(call("/kpi/minute")) == 429
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ingest_api.api.schemas import AlertItem
+from ingest_api.services.kpi_service import (
+    alerts_cursor,
+    parse_alerts_cursor,
+    parse_series_cursor,
+    series_cursor,
+    series_range,
+)
+from ingest_api.services.pagination import decode_cursor, encode_cursor
+
+LAST = datetime(2026, 2, 3, 10, 41, tzinfo=timezone.utc)
+TO_TS = datetime(2026, 2, 3, 12, 0, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip_and_rejects_garbage() -> None:
+    cursor = encode_cursor({"after": "x", "n": 1})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"after": "x", "n": 1}
+    for bad in ("not-base64!", "WzEsMl0", "e3"):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_series_cursor_resumes_after_last_bucket() -> None:
+    cursor = series_cursor("minute", LAST, TO_TS, "web", None)
+
+    from_ts, to_ts = parse_series_cursor(cursor, "minute", "web", None)
+
+    assert from_ts == LAST + timedelta(microseconds=1)
+    assert to_ts == TO_TS
+    # The next page starts at the following bucket, not at the last one again.
+    assert series_range("minute", from_ts, to_ts)[0] == LAST + timedelta(minutes=1)
+
+
+def test_series_cursor_is_bound_to_its_query() -> None:
+    cursor = series_cursor("minute", LAST, TO_TS, "web", None)
+    with pytest.raises(ValueError):
+        parse_series_cursor(cursor, "hour", "web", None)
+    with pytest.raises(ValueError):
+        parse_series_cursor(cursor, "minute", "ads", None)
+
+
+def test_alerts_cursor_carries_created_at_and_id() -> None:
+    item = AlertItem(id=42, bucket=LAST, kpi="revenue", created_at=LAST)
+    from_ts = LAST - timedelta(days=1)
+
+    cursor = alerts_cursor(item, from_ts, "revenue")
+
+    assert parse_alerts_cursor(cursor, "revenue") == (from_ts, (LAST, 42))
+    with pytest.raises(ValueError):
+        parse_alerts_cursor(cursor, "view_count")
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+from ingest_api.services import publisher as publisher_module
+from ingest_api.services.publisher import ASYNC, SYNC, Publisher, build_producer
+
+
+class FakeProducer:
+    def __init__(self) -> None:
+        self.deliveries: list[asyncio.Future] = []
+
+    async def send(self, topic: str, value: bytes, key: bytes) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.deliveries.append(future)
+        return future
+
+
+def test_async_publish_returns_before_delivery_and_bounds_in_flight() -> None:
+    async def run() -> None:
+        producer = FakeProducer()
+        publisher = Publisher(
+            producer, mode=ASYNC, max_in_flight=2  # type: ignore[arg-type]
+        )
+        await publisher.publish("orders", b"o-1", b"{}")
+        await publisher.publish("orders", b"o-2", b"{}")
+        assert publisher.in_flight == 2
+
+        blocked = asyncio.create_task(publisher.publish("orders", b"o-3", b"{}"))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+
+        producer.deliveries[0].set_result(None)
+        await asyncio.wait_for(blocked, 1)
+        assert publisher.delivered == 1
+        assert publisher.in_flight == 2
+
+    asyncio.run(run())
+
+
+def test_async_delivery_failures_are_counted_and_handed_off() -> None:
+    failed: list[tuple[str, bytes, bytes]] = []
+
+    async def on_failure(topic: str, key: bytes, value: bytes) -> None:
+        failed.append((topic, key, value))
+
+    async def run() -> None:
+        producer = FakeProducer()
+        publisher = Publisher(
+            producer, mode=ASYNC, on_failure=on_failure  # type: ignore[arg-type]
+        )
+        await publisher.publish("sessions", b"s-1", b"{}")
+        producer.deliveries[0].set_exception(RuntimeError("broker down"))
+        await publisher.flush()
+        assert publisher.stats()["failed"] == 1
+        assert publisher.in_flight == 0
+
+    asyncio.run(run())
+    assert failed == [("sessions", b"s-1", b"{}")]
+
+
+def test_sync_publish_waits_for_ack_and_raises() -> None:
+    async def run() -> None:
+        producer = FakeProducer()
+        publisher = Publisher(producer, mode=SYNC)  # type: ignore[arg-type]
+        task = asyncio.create_task(publisher.publish("orders", b"o-1", b"{}"))
+        await asyncio.sleep(0)
+        assert not task.done()
+        producer.deliveries[0].set_exception(RuntimeError("broker down"))
+        try:
+            await task
+            assert False, "expected publish to raise"
+        except RuntimeError:
+            pass
+        assert publisher.failed == 1
+
+    asyncio.run(run())
+
+
+def test_build_producer_applies_settings(monkeypatch) -> None:
+    captured: dict[str, object] = {}
+    monkeypatch.setattr(
+        publisher_module, "AIOKafkaProducer", lambda **kwargs: captured.update(kwargs)
+    )
+    settings = SimpleNamespace(
+        KAFKA_BOOTSTRAP_SERVERS="kafka:9092",
+        KAFKA_CLIENT_ID="ingest-api",
+        KAFKA_ACKS="1",
+        KAFKA_LINGER_MS=20,
+        KAFKA_COMPRESSION_TYPE="",
+        KAFKA_MAX_BATCH_SIZE=65536,
+    )
+
+    build_producer(settings)  # type: ignore[arg-type]
+
+    assert captured["acks"] == 1
+    assert captured["linger_ms"] == 20
+    assert captured["compression_type"] is None
+    assert captured["max_batch_size"] == 65536
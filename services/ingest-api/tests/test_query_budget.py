@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from ingest_api.api.kpi import _Budget, _within_budget
+from ingest_api.services.cache import QueryCache
+
+
+def _request(disconnect: asyncio.Event | None = None) -> SimpleNamespace:
+    disconnect = disconnect or asyncio.Event()
+
+    async def receive() -> dict:
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    return SimpleNamespace(receive=receive)
+
+
+def test_slow_query_is_cancelled_with_504() -> None:
+    cancelled = False
+
+    async def slow_query() -> int:
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return 1
+
+    async def run() -> None:
+        with pytest.raises(HTTPException) as error:
+            await _within_budget(_request(), _Budget(0.01), slow_query())  # type: ignore[arg-type]
+        assert error.value.status_code == 504
+        assert await _within_budget(_request(), _Budget(1.0), asyncio.sleep(0, 7)) == 7  # type: ignore[arg-type]
+
+    asyncio.run(run())
+    assert cancelled
+
+
+def test_etag_lookup_and_data_query_share_one_deadline() -> None:
+    async def run() -> None:
+        budget = _Budget(0.1)
+        assert await _within_budget(_request(), budget, asyncio.sleep(0.06, 1)) == 1  # type: ignore[arg-type]
+        # On its own the second step fits the budget; after the first it does not.
+        with pytest.raises(HTTPException) as error:
+            await _within_budget(_request(), budget, asyncio.sleep(0.06, 2))  # type: ignore[arg-type]
+        assert error.value.status_code == 504
+        assert "0.1s" in error.value.detail
+
+    asyncio.run(run())
+
+
+def test_database_timeout_is_reported_as_504() -> None:
+    async def timed_out() -> int:
+        raise TimeoutError
+
+    async def run() -> None:
+        with pytest.raises(HTTPException) as error:
+            await _within_budget(_request(), _Budget(1.0), timed_out())  # type: ignore[arg-type]
+        assert error.value.status_code == 504
+
+    asyncio.run(run())
+
+
+def test_client_disconnect_cancels_the_query() -> None:
+    async def run() -> None:
+        gone = asyncio.Event()
+        query = asyncio.ensure_future(asyncio.sleep(10))
+        asyncio.get_running_loop().call_later(0.01, gone.set)
+        with pytest.raises(HTTPException) as error:
+            await _within_budget(_request(gone), _Budget(5.0), query)  # type: ignore[arg-type]
+        assert error.value.status_code == 499
+        assert query.cancelled()
+
+    asyncio.run(run())
+
+
+def test_cache_cancels_load_once_its_last_waiter_leaves() -> None:
+    cache = QueryCache(ttl_seconds=60, max_entries=10)
+
+    async def run() -> None:
+        gate = asyncio.Event()
+        loads: list[asyncio.Task] = []
+
+        async def load() -> int:
+            loads.append(asyncio.current_task())  # type: ignore[arg-type]
+            await gate.wait()
+            return 1
+
+        first = asyncio.ensure_future(cache.get_or_load("key", load))
+        second = asyncio.ensure_future(cache.get_or_load("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        # Another caller still waits, so the shared query keeps running.
+        assert not loads[0].cancelled()
+        second.cancel()
+        await asyncio.wait({first, second})
+        await asyncio.sleep(0)
+        assert loads[0].cancelled()
+
+        # A later caller starts a fresh load instead of joining the cancelled one.
+        gate.set()
+        assert await cache.get_or_load("key", load) == 1
+        assert len(loads) == 2
+
+    asyncio.run(run())
@@ -0,0 +1,114 @@
+import asyncio
+
+from ingest_api.domain.db import ReadRouter
+
+
+class _Connection:
+    def __init__(self, lag) -> None:
+        self.lag = lag
+
+    async def fetchval(self, query, timeout=None):
+        if isinstance(self.lag, Exception):
+            raise self.lag
+        return self.lag
+
+
+class _Acquire:
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Pool:
+    def __init__(self, name: str, lag=0.0) -> None:
+        self.name = name
+        self.conn = _Connection(lag)
+        self.closed = False
+
+    def acquire(self, timeout=None):
+        return _Acquire(self.conn)
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def get_size(self) -> int:
+        return 2
+
+    def get_idle_size(self) -> int:
+        return 1
+
+    def get_max_size(self) -> int:
+        return 5
+
+
+def test_reads_stay_on_primary_without_replica() -> None:
+    primary = _Pool("primary")
+    router = ReadRouter(primary)  # type: ignore[arg-type]
+
+    asyncio.run(router.check_lag())
+
+    assert router.pool is primary
+    assert router.stats()["replica"] is False
+
+
+def test_reads_follow_replica_lag() -> None:
+    primary, replica = _Pool("primary"), _Pool("replica", lag=0.5)
+    router = ReadRouter(primary, replica, max_lag_seconds=2.0)  # type: ignore[arg-type]
+    # Nothing is known about the replica before the first check.
+    assert router.pool is primary
+
+    asyncio.run(router.check_lag())
+    assert router.pool is replica
+
+    replica.conn.lag = 7.5
+    asyncio.run(router.check_lag())
+    assert router.pool is primary
+    assert router.stats() == {
+        "replica": True,
+        "using_replica": False,
+        "lag_seconds": 7.5,
+        "fallbacks": 1,
+    }
+
+    replica.conn.lag = 0.0
+    asyncio.run(router.check_lag())
+    assert router.pool is replica
+
+
+def test_unreachable_replica_falls_back_to_primary() -> None:
+    primary, replica = _Pool("primary"), _Pool("replica")
+    router = ReadRouter(primary, replica)  # type: ignore[arg-type]
+    asyncio.run(router.check_lag())
+    assert router.pool is replica
+
+    replica.conn.lag = ConnectionRefusedError("replica down")
+    asyncio.run(router.check_lag())
+
+    assert router.pool is primary
+    assert router.lag_seconds is None
+
+    asyncio.run(router.close())
+    assert primary.closed and replica.closed
+
+
+def test_acquire_wait_is_recorded_per_connection() -> None:
+    primary = _Pool("primary", lag=0.0)
+    router = ReadRouter(primary)  # type: ignore[arg-type]
+
+    async def run() -> None:
+        for _ in range(3):
+            async with router.acquire() as conn:
+                assert conn is primary.conn
+
+    asyncio.run(run())
+    stats = router.acquire_stats()
+
+    assert stats["acquired"] == 3
+    assert stats["wait_ms_buckets"]["le_inf"] == 3
+    assert stats["wait_ms_buckets"]["le_1ms"] == 3
+    assert (stats["pool_size"], stats["pool_idle"], stats["pool_max"]) == (2, 1, 5)
@@ -0,0 +1,138 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ingest_api.api import ingest
+from ingest_api.services.spool import (
+    DiskSpool,
+    SpoolRecord,
+    decode_records,
+    encode_record,
+)
+
+
+def test_records_round_trip_and_detect_corruption() -> None:
+    record = SpoolRecord("orders", b"o-1", b'{"amount": 1}', 1700000000.0)
+    data = encode_record(record) + encode_record(record)
+
+    records, consumed, corrupt = decode_records(data + data[:5], 10)
+    assert records == [record, record]
+    assert consumed == len(data)
+    assert corrupt is False
+
+    damaged = bytearray(data)
+    damaged[-1] ^= 0xFF
+    records, consumed, corrupt = decode_records(bytes(damaged), 10)
+    assert records == [record]
+    assert corrupt is True
+
+
+def test_spool_replays_in_order_and_survives_restart(tmp_path) -> None:
+    async def fill() -> None:
+        spool = DiskSpool(tmp_path, segment_bytes=64, fsync_interval_ms=1)
+        spool.open()
+        for index in range(5):
+            await spool.append("orders", f"o-{index}".encode(), b"{}")
+        assert spool.stats()["depth"] == 5
+        assert spool.stats()["segments"] > 1
+        await spool.close()
+
+    async def replay() -> list[bytes]:
+        spool = DiskSpool(tmp_path, segment_bytes=64, fsync_interval_ms=1)
+        spool.open()
+        assert spool.active
+        delivered: list[bytes] = []
+        attempts = 0
+
+        async def publish(topic: str, key: bytes, value: bytes) -> None:
+            nonlocal attempts
+            attempts += 1
+            if attempts == 2:
+                raise RuntimeError("broker down")
+            delivered.append(key)
+
+        drainer = asyncio.create_task(
+            spool.drain(publish, batch_size=2, retry_seconds=0)
+        )
+        while spool.active:
+            await asyncio.sleep(0.01)
+        drainer.cancel()
+        await spool.close()
+        return delivered
+
+    asyncio.run(fill())
+    delivered = asyncio.run(replay())
+    assert sorted(set(delivered)) == [f"o-{index}".encode() for index in range(5)]
+    assert delivered[0] == b"o-0"
+    assert len(list(tmp_path.glob("*.seg"))) == 1
+
+
+def test_publish_falls_back_to_spool(tmp_path) -> None:
+    class FailingPublisher:
+        async def publish(self, topic: str, key: bytes, value: bytes) -> None:
+            raise RuntimeError("broker down")
+
+    async def run() -> None:
+        spool = DiskSpool(tmp_path, fsync_interval_ms=1)
+        spool.open()
+        state = SimpleNamespace(publisher=FailingPublisher(), spool=spool)
+        request = SimpleNamespace(app=SimpleNamespace(state=state))
+        status = await ingest._publish(request, "orders", "o-1", b"{}")  # type: ignore[arg-type]
+        assert status == "spooled"
+        assert spool.depth == 1
+        await spool.close()
+
+        state.spool = None
+        with pytest.raises(ingest.HTTPException) as exc_info:
+            await ingest._publish(request, "orders", "o-2", b"{}")  # type: ignore[arg-type]
+        assert exc_info.value.status_code == 503
+
+    asyncio.run(run())
+
+
+def test_spool_age_follows_the_first_pending_record(tmp_path, monkeypatch) -> None:
+    clock = [1700000000.0]
+    monkeypatch.setattr("ingest_api.services.spool.time.time", lambda: clock[0])
+
+    async def run() -> None:
+        spool = DiskSpool(tmp_path, fsync_interval_ms=1)
+        spool.open()
+        for index in range(4):
+            await spool.append("orders", f"o-{index}".encode(), b"{}")
+            clock[0] += 10
+        assert spool.age_seconds() == 40
+
+        second_batch = asyncio.Event()
+
+        async def publish(topic: str, key: bytes, value: bytes) -> None:
+            if key == b"o-2":
+                second_batch.set()
+                await asyncio.Event().wait()
+
+        drainer = asyncio.create_task(
+            spool.drain(publish, batch_size=2, retry_seconds=0)
+        )
+        await second_batch.wait()
+        # o-2 was spooled 20 seconds after o-0.
+        assert spool.depth == 2
+        assert spool.age_seconds() == 20
+        drainer.cancel()
+        await spool.close()
+
+    asyncio.run(run())
+
+
+def test_close_waits_for_pending_group_commit(tmp_path) -> None:
+    async def run() -> None:
+        spool = DiskSpool(tmp_path, fsync_interval_ms=50)
+        spool.open()
+        append = asyncio.create_task(spool.append("orders", b"o-1", b"{}"))
+        await asyncio.sleep(0)
+        assert len(spool._sync_tasks) == 1
+        await spool.close()
+        assert not spool._sync_tasks
+        await append
+
+    asyncio.run(run())
+    assert len(list(tmp_path.glob("*.seg"))) == 1
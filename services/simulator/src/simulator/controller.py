@@ -86,6 +86,12 @@ def _pick_segment(settings: Settings) -> tuple[str, str]:
     return random.choice(settings.CHANNELS), random.choice(settings.CAMPAIGNS)
 
 
+def _queue_event(
+    events: list[tuple[str, dict[str, object]]], path: str, payload: dict[str, object]
+) -> None:
+    events.append((path, payload))
+
+
 class SimulatorController:
     def __init__(self, settings: Settings, logger: logging.Logger) -> None:
         self._settings = settings
@@ -118,7 +124,10 @@ class SimulatorController:
         return True
 
     async def _post_event(
-        self, client: httpx.AsyncClient, path: str, payload: dict[str, object]
+        self,
+        client: httpx.AsyncClient,
+        path: str,
+        payload: dict[str, object] | list[dict[str, object]],
     ) -> None:
         try:
             response = await client.post(path, json=payload)
@@ -148,11 +157,12 @@ class SimulatorController:
             sessions_count, orders_count * self._settings.MIN_VIEWS_PER_ORDER
         )
 
+        events: list[tuple[str, dict[str, object]]] = []
         for _ in range(sessions_count):
             channel, campaign = _pick_segment(self._settings)
             session_id = _random_id("s")
-            await self._post_event(
-                client,
+            _queue_event(
+                events,
                 "/events/session",
                 {
                     "session_id": session_id,
@@ -164,8 +174,8 @@ class SimulatorController:
             )
 
             if random.random() < self._settings.CHECKOUT_RATE:
-                await self._post_event(
-                    client,
+                _queue_event(
+                    events,
                     "/events/session",
                     {
                         "session_id": session_id,
@@ -180,8 +190,8 @@ class SimulatorController:
             if random.random() < order_prob:
                 order_id = _random_id("o")
                 amount = random.choice(self._settings.PRICE_LIST_RUB)
-                await self._post_event(
-                    client,
+                _queue_event(
+                    events,
                     "/events/order",
                     {
                         "order_id": order_id,
@@ -193,8 +203,8 @@ class SimulatorController:
                     },
                 )
 
-                await self._post_event(
-                    client,
+                _queue_event(
+                    events,
                     "/events/session",
                     {
                         "session_id": f"s-{order_id}",
@@ -205,6 +215,24 @@ class SimulatorController:
                     },
                 )
 
+        await self._send_events(client, events)
+
+    async def _send_events(
+        self, client: httpx.AsyncClient, events: list[tuple[str, dict[str, object]]]
+    ) -> None:
+        if not self._settings.USE_BATCH_ENDPOINT:
+            for path, payload in events:
+                await self._post_event(client, path, payload)
+            return
+
+        size = max(1, self._settings.BATCH_SIZE)
+        for start in range(0, len(events), size):
+            batch = [
+                {"type": path.rsplit("/", 1)[-1], **payload}
+                for path, payload in events[start : start + size]
+            ]
+            await self._post_event(client, "/events/batch", batch)
+
     async def _run_loop(self) -> None:
         headers = {"X-API-Key": self._settings.API_KEY}
         timeout = httpx.Timeout(connect=5.0, read=10.0, write=10.0, pool=10.0)
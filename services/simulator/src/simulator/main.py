@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import random
 
@@ -6,6 +5,7 @@ import uvicorn
 
 from simulator.api import build_app
 from simulator.controller import SimulatorController
+from simulator.runtime import run_service
 from simulator.settings import get_settings
 
 settings = get_settings()
@@ -32,7 +32,7 @@ async def run() -> None:
 
 
 def main() -> None:
-    asyncio.run(run())
+    run_service(run(), settings)
 
 
 if __name__ == "__main__":
@@ -17,9 +17,20 @@ class Settings(BaseModel):
     CONTROL_API_HOST: str = Field("0.0.0.0", description="Simulator control API host")
     CONTROL_API_PORT: int = Field(8010, description="Simulator control API port")
 
+    UVLOOP_ENABLED: bool = Field(False, description="Use uvloop when it is installed")
+    LOOP_DEBUG: bool = Field(False, description="Enable asyncio debug mode")
+    SLOW_CALLBACK_MS: int = Field(
+        100, description="Warn about loop stalls longer than this (ms), 0 disables"
+    )
+    LOOP_LAG_INTERVAL_SECONDS: float = Field(
+        1.0, description="Event loop lag probe interval in seconds"
+    )
+
     API_BASE_URL: str = Field(..., description="Ingest API base URL")
     API_KEY: str = Field(..., description="API key header")
     SEND_INTERVAL_SECONDS: int = Field(5, description="Send interval in seconds")
+    USE_BATCH_ENDPOINT: bool = Field(False, description="Send events via /events/batch")
+    BATCH_SIZE: int = Field(500, description="Events per batch request")
 
     BASE_ORDERS_PER_TICK: int = Field(3, description="Base orders per tick")
     ORDER_COUNT_JITTER: float = Field(1.0, description="Orders jitter")
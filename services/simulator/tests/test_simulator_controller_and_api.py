@@ -107,3 +107,29 @@ def test_simulator_api_autostarts_when_enabled_and_stops_on_shutdown() -> None:
         assert controller.running is True
 
     assert controller.stop_calls >= 1
+
+
+def test_controller_sends_events_in_batches(monkeypatch) -> None:
+    settings = SimpleNamespace(USE_BATCH_ENDPOINT=True, BATCH_SIZE=2)
+    controller = SimulatorController(
+        settings=settings, logger=logging.getLogger("test-simulator")
+    )
+    posted: list[tuple[str, object]] = []
+
+    async def fake_post_event(self, client, path, payload) -> None:
+        posted.append((path, payload))
+
+    monkeypatch.setattr(SimulatorController, "_post_event", fake_post_event)
+    events = [
+        ("/events/session", {"session_id": "s-1"}),
+        ("/events/order", {"order_id": "o-1"}),
+        ("/events/session", {"session_id": "s-2"}),
+    ]
+
+    asyncio.run(controller._send_events(None, events))  # type: ignore[arg-type]
+
+    assert [path for path, _ in posted] == ["/events/batch", "/events/batch"]
+    assert posted[0][1] == [
+        {"type": "session", "session_id": "s-1"},
+        {"type": "order", "order_id": "o-1"},
+    ]
@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from stream_processor.services.aggregation import Aggregates, BucketMetrics
+from stream_processor.services.dedupe import DedupeCache
+from stream_processor.services.processor import parse_dt, process_message, settings
+
+BASE_TIME = datetime(2026, 2, 3, 10, 0, tzinfo=timezone.utc)
+SESSION_EVENT_TYPES = ("view", "view", "view", "view", "checkout", "purchase")
+
+
+@dataclass
+class BenchConfig:
+    events: int = 50_000
+    duplicate_ratio: float = 0.1
+    segments: int = 10
+    order_ratio: float = 0.2
+    minutes: int = 60
+    seed: int = 42
+
+
+@dataclass
+class BenchResult:
+    name: str
+    operations: int
+    seconds: float
+    ops_per_second: float
+    peak_memory_bytes: int
+
+
+class _MemoryConnection:
+    def __init__(self) -> None:
+        self._keys: set[tuple[Any, Any]] = set()
+
+    async def fetchrow(self, _query: str, *args: Any) -> dict[str, Any] | None:
+        # Mirrors the (id, event_time) primary keys of the orders/sessions tables.
+        key = (args[0], args[6])
+        if key in self._keys:
+            return None
+        self._keys.add(key)
+        return {"id": args[0]}
+
+
+class _MemoryAcquire:
+    def __init__(self, conn: _MemoryConnection) -> None:
+        self._conn = conn
+
+    async def __aenter__(self) -> _MemoryConnection:
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+class _MemoryPool:
+    def __init__(self) -> None:
+        self._conn = _MemoryConnection()
+
+    def acquire(self) -> _MemoryAcquire:
+        return _MemoryAcquire(self._conn)
+
+
+def _isoformat_z(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def _make_payload(index: int, config: BenchConfig, rng: random.Random) -> tuple[str, dict]:
+    segment = rng.randrange(max(1, config.segments))
+    event_time = BASE_TIME + timedelta(
+        seconds=rng.randrange(max(1, config.minutes) * 60),
+        microseconds=rng.randrange(1_000_000),
+    )
+    common = {
+        "channel": f"channel-{segment}",
+        "campaign": f"campaign-{segment}",
+        "event_time": _isoformat_z(event_time),
+        "received_at": _isoformat_z(event_time + timedelta(milliseconds=50)),
+    }
+    if rng.random() < config.order_ratio:
+        order_id = f"o-{index}"
+        return settings.KAFKA_ORDERS_TOPIC, {
+            "order_id": order_id,
+            "event_id": order_id,
+            "customer_id": f"c-{rng.randrange(10_000)}",
+            "amount": rng.choice((99.0, 129.0, 149.0, 199.0, 249.0)),
+            "currency": "RUB",
+            **common,
+        }
+    event_type = rng.choice(SESSION_EVENT_TYPES)
+    return settings.KAFKA_SESSIONS_TOPIC, {
+        "event_id": f"session:s-{index}:{event_type}:{common['event_time']}",
+        "session_id": f"s-{index}",
+        "event_type": event_type,
+        "user_id": f"u-{rng.randrange(10_000)}",
+        **common,
+    }
+
+
+def generate_messages(config: BenchConfig) -> list[SimpleNamespace]:
+    rng = random.Random(config.seed)
+    messages: list[SimpleNamespace] = []
+    for index in range(config.events):
+        if messages and rng.random() < config.duplicate_ratio:
+            messages.append(rng.choice(messages))
+            continue
+        topic, payload = _make_payload(index, config, rng)
+        messages.append(
+            SimpleNamespace(topic=topic, value=json.dumps(payload).encode("utf-8"))
+        )
+    return messages
+
+
+def _measure(name: str, operations: int, run: Callable[[], None]) -> BenchResult:
+    started = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - started
+
+    # Memory is sampled in a separate pass: tracing skews timings by several x.
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(
+        name=name,
+        operations=operations,
+        seconds=round(seconds, 6),
+        ops_per_second=round(operations / seconds, 1) if seconds > 0 else 0.0,
+        peak_memory_bytes=peak,
+    )
+
+
+def run_benchmarks(config: BenchConfig) -> list[BenchResult]:
+    messages = generate_messages(config)
+    payloads = [json.loads(msg.value) for msg in messages]
+    event_times = [payload["event_time"] for payload in payloads]
+    parsed_times = [parse_dt(value) for value in event_times]
+    event_ids = [payload["event_id"] for payload in payloads]
+    deltas = [
+        BucketMetrics(revenue=float(payload["amount"]), order_count=1)
+        if "amount" in payload
+        else BucketMetrics(view_count=1)
+        for payload in payloads
+    ]
+
+    def bench_parse_dt() -> None:
+        for value in event_times:
+            parse_dt(value)
+
+    def bench_dedupe() -> None:
+        dedupe = DedupeCache(settings.DEDUPE_TTL_SECONDS)
+        now = BASE_TIME
+        for event_id in event_ids:
+            dedupe.seen(event_id, now)
+        dedupe.cleanup(now + timedelta(seconds=settings.DEDUPE_TTL_SECONDS))
+
+    def bench_aggregates() -> None:
+        async def run() -> None:
+            aggregates = Aggregates()
+            for event_time, delta in zip(parsed_times, deltas):
+                await aggregates.add(event_time, delta)
+            await aggregates.drain()
+
+        asyncio.run(run())
+
+    def bench_process_message() -> None:
+        async def run() -> None:
+            pool = _MemoryPool()
+            aggregates = Aggregates()
+            dedupe = DedupeCache(settings.DEDUPE_TTL_SECONDS)
+            for msg in messages:
+                await process_message(msg, pool, aggregates, dedupe)  # type: ignore[arg-type]
+            await aggregates.drain()
+
+        asyncio.run(run())
+
+    operations = len(messages)
+    return [
+        _measure("parse_dt", operations, bench_parse_dt),
+        _measure("dedupe_cache", operations, bench_dedupe),
+        _measure("aggregates_add", operations, bench_aggregates),
+        _measure("process_message", operations, bench_process_message),
+    ]
+
+
+def build_report(
+    config: BenchConfig, results: list[BenchResult], label: str | None = None
+) -> dict[str, Any]:
+    return {
+        "label": label,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "config": asdict(config),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def compare_reports(
+    baseline: dict[str, Any], current: dict[str, Any]
+) -> dict[str, dict[str, float]]:
+    previous = {item["name"]: item for item in baseline.get("results", [])}
+    comparison: dict[str, dict[str, float]] = {}
+    for item in current["results"]:
+        before = previous.get(item["name"])
+        if before is None or not before["ops_per_second"]:
+            continue
+        comparison[item["name"]] = {
+            "ops_per_second_ratio": round(
+                item["ops_per_second"] / before["ops_per_second"], 3
+            ),
+            "peak_memory_ratio": round(
+                item["peak_memory_bytes"] / max(1, before["peak_memory_bytes"]), 3
+            ),
+        }
+    return comparison
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    defaults = BenchConfig()
+    parser = argparse.ArgumentParser(
+        description="Benchmark the stream processor hot path with synthetic events."
+    )
+    parser.add_argument("--events", type=int, default=defaults.events)
+    parser.add_argument("--duplicate-ratio", type=float, default=defaults.duplicate_ratio)
+    parser.add_argument("--segments", type=int, default=defaults.segments)
+    parser.add_argument("--order-ratio", type=float, default=defaults.order_ratio)
+    parser.add_argument("--minutes", type=int, default=defaults.minutes)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--label", help="Free-form label, e.g. a commit hash.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    parser.add_argument(
+        "--compare", type=Path, help="Previous JSON report to compare against."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    config = BenchConfig(
+        events=args.events,
+        duplicate_ratio=args.duplicate_ratio,
+        segments=args.segments,
+        order_ratio=args.order_ratio,
+        minutes=args.minutes,
+        seed=args.seed,
+    )
+    report = build_report(config, run_benchmarks(config), args.label)
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        report["comparison"] = compare_reports(baseline, report)
+
+    rendered = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+    print(rendered)
+
+
+if __name__ == "__main__":
+    main()
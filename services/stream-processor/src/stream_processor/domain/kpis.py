@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field, make_dataclass
+from operator import attrgetter
+from typing import Any, Callable
+
+ORDERS = "orders"
+SESSIONS = "sessions"
+
+
+@dataclass(frozen=True)
+class KpiDefinition:
+    name: str
+    stream: str
+    event_type: str | None = None
+    value_field: str | None = None
+
+
+# Adding a KPI means adding a definition here and the matching column to
+# kpi_minute/kpi_hour; the metrics class, the per-event delta builders and the
+# upsert statements are all generated from this tuple at import time.
+KPI_DEFINITIONS: tuple[KpiDefinition, ...] = (
+    KpiDefinition("revenue", ORDERS, value_field="amount"),
+    KpiDefinition("order_count", ORDERS),
+    KpiDefinition("view_count", SESSIONS, event_type="view"),
+    KpiDefinition("checkout_count", SESSIONS, event_type="checkout"),
+    KpiDefinition("purchase_count", SESSIONS, event_type="purchase"),
+)
+
+
+@dataclass
+class KpiPlan:
+    names: tuple[str, ...]
+    metrics_cls: type
+    merge: Callable[[Any, Any], None]
+    row: Callable[[Any], tuple]
+    builders: dict[tuple[str, str | None], Callable[[dict[str, Any]], Any]]
+
+    def delta_builder(
+        self, stream: str, event_type: str | None = None
+    ) -> Callable[[dict[str, Any]], Any]:
+        builder = self.builders.get((stream, event_type))
+        if builder is None:
+            builder = self.builders[(stream, None)]
+        return builder
+
+
+def _compile(name: str, source: str, namespace: dict[str, Any]) -> Callable:
+    exec(compile(source, f"<kpi {name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def _validate(definitions: tuple[KpiDefinition, ...]) -> None:
+    names = [definition.name for definition in definitions]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate KPI names: {names}")
+    for definition in definitions:
+        if not definition.name.isidentifier():
+            raise ValueError(f"Invalid KPI name: {definition.name}")
+        if definition.stream not in (ORDERS, SESSIONS):
+            raise ValueError(f"Unsupported KPI stream: {definition.stream}")
+
+
+def _build_merge(names: tuple[str, ...]) -> Callable[[Any, Any], None]:
+    body = "\n".join(f"    target.{name} += delta.{name}" for name in names) or "    pass"
+    return _compile("merge", f"def merge(target, delta):\n{body}\n", {})
+
+
+def _build_delta(
+    metrics_cls: type, definitions: list[KpiDefinition]
+) -> Callable[[dict[str, Any]], Any]:
+    arguments = []
+    for definition in definitions:
+        if definition.value_field is None:
+            arguments.append(f"{definition.name}=1")
+        else:
+            arguments.append(
+                f"{definition.name}=float(payload[{definition.value_field!r}])"
+            )
+    source = f"def build(payload):\n    return Metrics({', '.join(arguments)})\n"
+    return _compile("build", source, {"Metrics": metrics_cls})
+
+
+def compile_plan(definitions: tuple[KpiDefinition, ...]) -> KpiPlan:
+    _validate(definitions)
+    names = tuple(definition.name for definition in definitions)
+    metrics_cls = make_dataclass(
+        "BucketMetrics",
+        [
+            (
+                definition.name,
+                float if definition.value_field else int,
+                field(default=0.0 if definition.value_field else 0),
+            )
+            for definition in definitions
+        ],
+        slots=True,
+    )
+
+    builders: dict[tuple[str, str | None], Callable[[dict[str, Any]], Any]] = {}
+    for stream in (ORDERS, SESSIONS):
+        stream_definitions = [d for d in definitions if d.stream == stream]
+        unfiltered = [d for d in stream_definitions if d.event_type is None]
+        builders[(stream, None)] = _build_delta(metrics_cls, unfiltered)
+        event_types = {d.event_type for d in stream_definitions if d.event_type}
+        for event_type in sorted(event_types):
+            matching = [
+                d for d in stream_definitions if d.event_type in (None, event_type)
+            ]
+            builders[(stream, event_type)] = _build_delta(metrics_cls, matching)
+
+    getter = attrgetter(*names)
+    row = getter if len(names) > 1 else (lambda metrics: (getter(metrics),))
+    return KpiPlan(
+        names=names,
+        metrics_cls=metrics_cls,
+        merge=_build_merge(names),
+        row=row,
+        builders=builders,
+    )
+
+
+def build_upsert_sql(table: str, names: tuple[str, ...]) -> str:
+    columns = ",\n    ".join(("bucket", *names))
+    placeholders = ", ".join(f"${index}" for index in range(1, len(names) + 2))
+    updates = ",\n    ".join(
+        f"{name} = {table}.{name} + EXCLUDED.{name}" for name in names
+    )
+    return (
+        f"INSERT INTO {table} (\n    {columns}\n)\n"
+        f"VALUES ({placeholders})\n"
+        f"ON CONFLICT (bucket) DO UPDATE SET\n    {updates},\n    updated_at = NOW()"
+    )
+
+
+KPI_PLAN = compile_plan(KPI_DEFINITIONS)
@@ -0,0 +1,68 @@
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import asyncpg
+
+logger = logging.getLogger("stream-processor")
+
+_FILE_NAME = re.compile(r"^(?P<version>\d+)_(?P<name>[\w-]+)\.sql$")
+_LOCK_NAME = "kpi-schema-migrations"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    path: Path
+
+
+def discover_migrations(directory: Path) -> list[Migration]:
+    if not directory.is_dir():
+        raise FileNotFoundError(f"Migrations directory not found: {directory}")
+
+    migrations: dict[int, Migration] = {}
+    for path in directory.glob("*.sql"):
+        match = _FILE_NAME.match(path.name)
+        if match is None:
+            raise ValueError(f"Unexpected migration file name: {path.name}")
+        version = int(match["version"])
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version: {version}")
+        migrations[version] = Migration(version, match["name"], path)
+    return [migrations[version] for version in sorted(migrations)]
+
+
+async def apply_migrations(pool: asyncpg.Pool, directory: Path) -> list[Migration]:
+    migrations = discover_migrations(directory)
+    async with pool.acquire() as conn:
+        # Serializes concurrent startups; the lock is held on this session only.
+        await conn.execute("SELECT pg_advisory_lock(hashtext($1))", _LOCK_NAME)
+        try:
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                )
+                """
+            )
+            rows = await conn.fetch("SELECT version FROM schema_migrations")
+            applied = {row["version"] for row in rows}
+            pending = [m for m in migrations if m.version not in applied]
+            for migration in pending:
+                async with conn.transaction():
+                    await conn.execute(migration.path.read_text(encoding="utf-8"))
+                    await conn.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                        migration.version,
+                        migration.name,
+                    )
+                logger.info(
+                    "Applied migration %03d_%s", migration.version, migration.name
+                )
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", _LOCK_NAME)
+    return pending
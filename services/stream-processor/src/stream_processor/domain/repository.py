@@ -1,7 +1,17 @@
+import json
+from datetime import datetime
 from typing import Any
 
 import asyncpg
 
+from stream_processor.domain.kpis import KPI_PLAN, build_upsert_sql
+
+_kpi_row = KPI_PLAN.row
+_UPSERT_SQL = {
+    table: build_upsert_sql(table, KPI_PLAN.names)
+    for table in ("kpi_minute", "kpi_hour")
+}
+
 
 async def insert_order(conn: asyncpg.Connection, payload: dict[str, Any]) -> bool:
     row = await conn.fetchrow(
@@ -65,74 +75,36 @@ async def insert_session(conn: asyncpg.Connection, payload: dict[str, Any]) -> b
     return row is not None
 
 
-async def flush_kpis(pool: asyncpg.Pool, minute: dict, hour: dict) -> None:
+def flush_notice(granularity: str, buckets: list[datetime]) -> str:
+    return json.dumps(
+        {
+            "granularity": granularity,
+            "min_bucket": min(buckets).isoformat(),
+            "max_bucket": max(buckets).isoformat(),
+        }
+    )
+
+
+async def flush_kpis(
+    pool: asyncpg.Pool, minute: dict, hour: dict, notify_channel: str = ""
+) -> None:
     if not minute and not hour:
         return
 
     async with pool.acquire() as conn:
-        if minute:
-            rows = [
-                (
-                    bucket,
-                    metrics.revenue,
-                    metrics.order_count,
-                    metrics.view_count,
-                    metrics.checkout_count,
-                    metrics.purchase_count,
-                )
-                for bucket, metrics in minute.items()
-            ]
-            await conn.executemany(
-                """
-                INSERT INTO kpi_minute (
-                    bucket,
-                    revenue,
-                    order_count,
-                    view_count,
-                    checkout_count,
-                    purchase_count
-                )
-                VALUES ($1, $2, $3, $4, $5, $6)
-                ON CONFLICT (bucket) DO UPDATE SET
-                    revenue = kpi_minute.revenue + EXCLUDED.revenue,
-                    order_count = kpi_minute.order_count + EXCLUDED.order_count,
-                    view_count = kpi_minute.view_count + EXCLUDED.view_count,
-                    checkout_count = kpi_minute.checkout_count + EXCLUDED.checkout_count,
-                    purchase_count = kpi_minute.purchase_count + EXCLUDED.purchase_count,
-                    updated_at = NOW()
-                """,
-                rows,
-            )
-        if hour:
-            rows = [
-                (
-                    bucket,
-                    metrics.revenue,
-                    metrics.order_count,
-                    metrics.view_count,
-                    metrics.checkout_count,
-                    metrics.purchase_count,
-                )
-                for bucket, metrics in hour.items()
-            ]
-            await conn.executemany(
-                """
-                INSERT INTO kpi_hour (
-                    bucket,
-                    revenue,
-                    order_count,
-                    view_count,
-                    checkout_count,
-                    purchase_count
-                )
-                VALUES ($1, $2, $3, $4, $5, $6)
-                ON CONFLICT (bucket) DO UPDATE SET
-                    revenue = kpi_hour.revenue + EXCLUDED.revenue,
-                    order_count = kpi_hour.order_count + EXCLUDED.order_count,
-                    view_count = kpi_hour.view_count + EXCLUDED.view_count,
-                    checkout_count = kpi_hour.checkout_count + EXCLUDED.checkout_count,
-                    purchase_count = kpi_hour.purchase_count + EXCLUDED.purchase_count,
-                    updated_at = NOW()
-                """,
-                rows,
-            )
+        # NOTIFY is delivered on commit, so readers never see a notice for rows
+        # that are not visible yet.
+        async with conn.transaction():
+            for granularity, buckets in (("minute", minute), ("hour", hour)):
+                if not buckets:
+                    continue
+                rows = [
+                    (bucket, *_kpi_row(metrics)) for bucket, metrics in buckets.items()
+                ]
+                await conn.executemany(_UPSERT_SQL[f"kpi_{granularity}"], rows)
+                if notify_channel:
+                    await conn.execute(
+                        "SELECT pg_notify($1, $2)",
+                        notify_channel,
+                        flush_notice(granularity, list(buckets)),
+                    )
@@ -0,0 +1,28 @@
+import logging
+
+import asyncpg
+
+from stream_processor.domain.migrations import apply_migrations
+from stream_processor.runtime import run_service
+from stream_processor.settings import BASE_DIR, get_settings
+
+logger = logging.getLogger("stream-processor")
+settings = get_settings()
+
+
+async def run_migrations() -> None:
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    pool = await asyncpg.create_pool(dsn=settings.DB_DSN, min_size=1, max_size=1)
+    try:
+        applied = await apply_migrations(pool, BASE_DIR / settings.MIGRATIONS_DIR)
+    finally:
+        await pool.close()
+    logger.info("Schema is up to date, %d migrations applied", len(applied))
+
+
+def main() -> None:
+    run_service(run_migrations(), settings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from collections.abc import Callable, Coroutine
+from contextlib import suppress
+from typing import Any, TypeVar
+
+from stream_processor.settings import Settings
+
+logger = logging.getLogger("stream-processor")
+
+T = TypeVar("T")
+
+
+def loop_factory(settings: Settings) -> Callable[[], asyncio.AbstractEventLoop] | None:
+    if not settings.UVLOOP_ENABLED:
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("UVLOOP_ENABLED is set but uvloop is not installed, using asyncio")
+        return None
+    return uvloop.new_event_loop
+
+
+def configure_loop(loop: asyncio.AbstractEventLoop, settings: Settings) -> None:
+    if settings.LOOP_DEBUG:
+        loop.set_debug(True)
+    if settings.SLOW_CALLBACK_MS > 0:
+        loop.slow_callback_duration = settings.SLOW_CALLBACK_MS / 1000
+
+
+async def monitor_loop_lag(threshold_ms: int, interval_seconds: float) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval_seconds)
+        lag_ms = (loop.time() - started - interval_seconds) * 1000
+        if lag_ms > threshold_ms:
+            logger.warning(
+                "Event loop stalled for %.1f ms (threshold %s ms), "
+                "something is blocking the loop",
+                lag_ms,
+                threshold_ms,
+            )
+
+
+def start_lag_monitor(settings: Settings) -> asyncio.Task[None] | None:
+    if settings.SLOW_CALLBACK_MS <= 0 or settings.LOOP_LAG_INTERVAL_SECONDS <= 0:
+        return None
+    return asyncio.create_task(
+        monitor_loop_lag(settings.SLOW_CALLBACK_MS, settings.LOOP_LAG_INTERVAL_SECONDS)
+    )
+
+
+async def stop_lag_monitor(task: asyncio.Task[None] | None) -> None:
+    if task is None:
+        return
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+async def _supervised(main: Coroutine[Any, Any, T], settings: Settings) -> T:
+    monitor = start_lag_monitor(settings)
+    try:
+        return await main
+    finally:
+        await stop_lag_monitor(monitor)
+
+
+def run_service(main: Coroutine[Any, Any, T], settings: Settings) -> T:
+    with asyncio.Runner(
+        debug=settings.LOOP_DEBUG, loop_factory=loop_factory(settings)
+    ) as runner:
+        configure_loop(runner.get_loop(), settings)
+        return runner.run(_supervised(main, settings))
@@ -1,15 +1,11 @@
 import asyncio
-from dataclasses import dataclass
 from datetime import datetime
+from typing import Any
 
+from stream_processor.domain.kpis import KPI_PLAN
 
-@dataclass
-class BucketMetrics:
-    revenue: float = 0.0
-    order_count: int = 0
-    view_count: int = 0
-    checkout_count: int = 0
-    purchase_count: int = 0
+BucketMetrics: Any = KPI_PLAN.metrics_cls
+_merge = KPI_PLAN.merge
 
 
 def minute_bucket(value: datetime) -> datetime:
@@ -22,24 +18,22 @@ def hour_bucket(value: datetime) -> datetime:
 
 class Aggregates:
     def __init__(self) -> None:
-        self._minute: dict[datetime, BucketMetrics] = {}
-        self._hour: dict[datetime, BucketMetrics] = {}
+        self._minute: dict[datetime, Any] = {}
+        self._hour: dict[datetime, Any] = {}
         self._lock = asyncio.Lock()
 
-    async def add(self, event_time: datetime, delta: BucketMetrics) -> None:
+    async def add(self, event_time: datetime, delta: Any) -> None:
         async with self._lock:
             for bucket, store in (
                 (minute_bucket(event_time), self._minute),
                 (hour_bucket(event_time), self._hour),
             ):
-                metrics = store.setdefault(bucket, BucketMetrics())
-                metrics.revenue += delta.revenue
-                metrics.order_count += delta.order_count
-                metrics.view_count += delta.view_count
-                metrics.checkout_count += delta.checkout_count
-                metrics.purchase_count += delta.purchase_count
-
-    async def drain(self) -> tuple[dict[datetime, BucketMetrics], dict[datetime, BucketMetrics]]:
+                metrics = store.get(bucket)
+                if metrics is None:
+                    metrics = store[bucket] = BucketMetrics()
+                _merge(metrics, delta)
+
+    async def drain(self) -> tuple[dict[datetime, Any], dict[datetime, Any]]:
         async with self._lock:
             minute = self._minute
             hour = self._hour
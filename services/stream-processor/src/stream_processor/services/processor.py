@@ -7,15 +7,19 @@ from typing import Any
 import asyncpg
 from aiokafka import AIOKafkaConsumer
 
+from stream_processor.domain.kpis import KPI_PLAN, ORDERS, SESSIONS
+from stream_processor.domain.migrations import apply_migrations
 from stream_processor.domain.repository import flush_kpis, insert_order, insert_session
-from stream_processor.services.aggregation import Aggregates, BucketMetrics
+from stream_processor.services.aggregation import Aggregates
 from stream_processor.services.dedupe import DedupeCache
-from stream_processor.settings import get_settings
+from stream_processor.settings import BASE_DIR, get_settings
 
 
 logger = logging.getLogger("stream-processor")
 settings = get_settings()
 
+_order_delta = KPI_PLAN.delta_builder(ORDERS)
+
 
 def parse_dt(value: str) -> datetime:
     if value.endswith("Z"):
@@ -45,23 +49,12 @@ async def process_message(
     async with pool.acquire() as conn:
         if msg.topic == settings.KAFKA_ORDERS_TOPIC:
             inserted = await insert_order(conn, payload)
-            if inserted:
-                await aggregates.add(
-                    payload["event_time"],
-                    BucketMetrics(revenue=float(payload["amount"]), order_count=1),
-                )
+            build_delta = _order_delta
         else:
             inserted = await insert_session(conn, payload)
-            if inserted:
-                delta = BucketMetrics()
-                if payload["event_type"] == "view":
-                    delta.view_count = 1
-                elif payload["event_type"] == "checkout":
-                    delta.checkout_count = 1
-                elif payload["event_type"] == "purchase":
-                    delta.purchase_count = 1
-                await aggregates.add(payload["event_time"], delta)
+            build_delta = KPI_PLAN.delta_builder(SESSIONS, payload["event_type"])
     if inserted:
+        await aggregates.add(payload["event_time"], build_delta(payload))
         return {
             "event_id": event_id,
             "event_time": payload["event_time"],
@@ -75,12 +68,14 @@ async def flush_loop(pool: asyncpg.Pool, aggregates: Aggregates, interval: int)
     while True:
         await asyncio.sleep(interval)
         minute, hour = await aggregates.drain()
-        await flush_kpis(pool, minute, hour)
+        await flush_kpis(pool, minute, hour, settings.KPI_NOTIFY_CHANNEL)
 
 
 async def run_processor() -> None:
     logging.basicConfig(level=settings.LOG_LEVEL)
     pool = await asyncpg.create_pool(dsn=settings.DB_DSN, min_size=1, max_size=5)
+    if settings.RUN_MIGRATIONS:
+        await apply_migrations(pool, BASE_DIR / settings.MIGRATIONS_DIR)
     consumer = AIOKafkaConsumer(
         settings.KAFKA_ORDERS_TOPIC,
         settings.KAFKA_SESSIONS_TOPIC,
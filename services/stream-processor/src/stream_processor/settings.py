@@ -17,6 +17,18 @@ class Settings(BaseModel):
     FLUSH_INTERVAL_SECONDS: int = Field(10, description="Flush interval in seconds")
     DEDUPE_TTL_SECONDS: int = Field(300, description="Deduplication TTL in seconds")
     LOG_EVERY_N: int = Field(200, description="Log every N events")
+    KPI_NOTIFY_CHANNEL: str = Field(
+        "kpi_flushed", description="NOTIFY channel announcing flushes, empty disables"
+    )
+
+    UVLOOP_ENABLED: bool = Field(False, description="Use uvloop when it is installed")
+    LOOP_DEBUG: bool = Field(False, description="Enable asyncio debug mode")
+    SLOW_CALLBACK_MS: int = Field(
+        100, description="Warn about loop stalls longer than this (ms), 0 disables"
+    )
+    LOOP_LAG_INTERVAL_SECONDS: float = Field(
+        1.0, description="Event loop lag probe interval in seconds"
+    )
 
     KAFKA_BOOTSTRAP_SERVERS: str = Field(..., description="Kafka bootstrap servers")
     KAFKA_ORDERS_TOPIC: str = Field("orders", description="Orders topic")
@@ -25,6 +37,11 @@ class Settings(BaseModel):
     KAFKA_AUTO_OFFSET_RESET: str = Field("earliest", description="Offset reset policy")
 
     DB_DSN: str = Field(..., description="PostgreSQL DSN")
+    RUN_MIGRATIONS: bool = Field(True, description="Apply schema migrations on startup")
+    MIGRATIONS_DIR: str = Field(
+        "../../db/migrations",
+        description="Migrations directory, relative to the service directory",
+    )
 
 
 dynaconf_settings = Dynaconf(
@@ -0,0 +1,38 @@
+import json
+
+from stream_processor.benchmark import (
+    BenchConfig,
+    build_report,
+    compare_reports,
+    generate_messages,
+    run_benchmarks,
+)
+
+
+def test_generate_messages_respects_duplicates_and_segments() -> None:
+    config = BenchConfig(events=500, duplicate_ratio=0.3, segments=4, seed=7)
+    messages = generate_messages(config)
+
+    assert len(messages) == 500
+    payloads = [json.loads(msg.value) for msg in messages]
+    unique_ids = {payload["event_id"] for payload in payloads}
+    assert len(unique_ids) < len(payloads)
+    assert {payload["channel"] for payload in payloads} <= {
+        f"channel-{index}" for index in range(4)
+    }
+
+
+def test_run_benchmarks_reports_every_stage() -> None:
+    config = BenchConfig(events=200, duplicate_ratio=0.2, segments=3)
+    report = build_report(config, run_benchmarks(config), label="test")
+
+    names = [item["name"] for item in report["results"]]
+    assert names == ["parse_dt", "dedupe_cache", "aggregates_add", "process_message"]
+    for item in report["results"]:
+        assert item["operations"] == 200
+        assert item["ops_per_second"] > 0
+        assert item["peak_memory_bytes"] > 0
+    assert json.loads(json.dumps(report))["config"]["segments"] == 3
+
+    comparison = compare_reports(report, report)
+    assert comparison["process_message"]["ops_per_second_ratio"] == 1.0
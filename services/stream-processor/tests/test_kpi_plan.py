@@ -0,0 +1,56 @@
+import pytest
+
+from stream_processor.domain.kpis import (
+    KPI_PLAN,
+    ORDERS,
+    SESSIONS,
+    KpiDefinition,
+    build_upsert_sql,
+    compile_plan,
+)
+
+
+def test_default_plan_maps_events_to_metrics() -> None:
+    order = KPI_PLAN.delta_builder(ORDERS)({"amount": "120.5"})
+    assert order.revenue == 120.5
+    assert order.order_count == 1
+    assert order.view_count == 0
+
+    purchase = KPI_PLAN.delta_builder(SESSIONS, "purchase")({})
+    assert purchase.purchase_count == 1
+    assert purchase.view_count == 0
+
+    unknown = KPI_PLAN.delta_builder(SESSIONS, "scroll")({})
+    assert KPI_PLAN.row(unknown) == (0.0, 0, 0, 0, 0)
+
+
+def test_new_definition_extends_metrics_merge_and_sql() -> None:
+    plan = compile_plan(
+        (
+            KpiDefinition("revenue", ORDERS, value_field="amount"),
+            KpiDefinition("add_to_cart_count", SESSIONS, event_type="add_to_cart"),
+            KpiDefinition("session_event_count", SESSIONS),
+        )
+    )
+
+    total = plan.metrics_cls()
+    plan.merge(total, plan.delta_builder(SESSIONS, "add_to_cart")({}))
+    plan.merge(total, plan.delta_builder(SESSIONS, "view")({}))
+    plan.merge(total, plan.delta_builder(ORDERS)({"amount": 10}))
+    assert plan.row(total) == (10.0, 1, 2)
+
+    sql = build_upsert_sql("kpi_minute", plan.names)
+    assert "VALUES ($1, $2, $3, $4)" in sql
+    assert (
+        "add_to_cart_count = kpi_minute.add_to_cart_count + EXCLUDED.add_to_cart_count"
+        in sql
+    )
+
+
+def test_compile_plan_rejects_invalid_definitions() -> None:
+    with pytest.raises(ValueError):
+        compile_plan((KpiDefinition("revenue", ORDERS), KpiDefinition("revenue", ORDERS)))
+    with pytest.raises(ValueError):
+        compile_plan((KpiDefinition("revenue; DROP TABLE kpi_minute", ORDERS),))
+    with pytest.raises(ValueError):
+        compile_plan((KpiDefinition("refunds", "payments"),))
@@ -0,0 +1,81 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from stream_processor.domain.migrations import apply_migrations, discover_migrations
+
+REPO_MIGRATIONS = Path(__file__).resolve().parents[3] / "db" / "migrations"
+
+
+class _FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _FakeConnection:
+    def __init__(self, applied: set[int]) -> None:
+        self.applied = applied
+        self.executed: list[str] = []
+
+    async def execute(self, query: str, *args):
+        self.executed.append(query.strip())
+        if query.startswith("INSERT INTO schema_migrations"):
+            self.applied.add(args[0])
+
+    async def fetch(self, _query: str):
+        return [{"version": version} for version in sorted(self.applied)]
+
+    def transaction(self):
+        return _FakeTransaction()
+
+
+class _FakeAcquire:
+    def __init__(self, conn: _FakeConnection) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _FakePool:
+    def __init__(self, conn: _FakeConnection) -> None:
+        self._conn = conn
+
+    def acquire(self):
+        return _FakeAcquire(self._conn)
+
+
+def test_repository_migrations_are_ordered_and_unique() -> None:
+    migrations = discover_migrations(REPO_MIGRATIONS)
+    versions = [migration.version for migration in migrations]
+    assert versions == sorted(set(versions))
+    assert versions[:3] == [1, 2, 3]
+
+
+def test_discover_migrations_rejects_bad_names(tmp_path) -> None:
+    (tmp_path / "schema.sql").write_text("SELECT 1;")
+    with pytest.raises(ValueError):
+        discover_migrations(tmp_path)
+
+
+def test_apply_migrations_runs_only_pending_in_order(tmp_path) -> None:
+    (tmp_path / "002_second.sql").write_text("SELECT 2;")
+    (tmp_path / "001_first.sql").write_text("SELECT 1;")
+    (tmp_path / "010_third.sql").write_text("SELECT 10;")
+    conn = _FakeConnection(applied={1})
+
+    applied = asyncio.run(apply_migrations(_FakePool(conn), tmp_path))  # type: ignore[arg-type]
+
+    assert [migration.version for migration in applied] == [2, 10]
+    assert conn.applied == {1, 2, 10}
+    scripts = [query for query in conn.executed if query.endswith(";")]
+    assert scripts == ["SELECT 2;", "SELECT 10;"]
+    assert conn.executed[0].startswith("SELECT pg_advisory_lock")
+    assert conn.executed[-1].startswith("SELECT pg_advisory_unlock")
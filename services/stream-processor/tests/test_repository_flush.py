@@ -0,0 +1,95 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from stream_processor.domain.repository import flush_kpis
+from stream_processor.services.aggregation import BucketMetrics
+
+
+class _FakeTransaction:
+    def __init__(self, log: list) -> None:
+        self._log = log
+
+    async def __aenter__(self):
+        self._log.append(("begin",))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._log.append(("commit",) if exc_type is None else ("rollback",))
+        return False
+
+
+class _FakeConnection:
+    def __init__(self) -> None:
+        self.log: list[tuple] = []
+
+    async def executemany(self, query: str, rows):
+        table = query.split("INSERT INTO", 1)[1].split()[0]
+        self.log.append(("upsert", table, len(rows)))
+
+    async def execute(self, query: str, *args):
+        self.log.append(("execute", query, *args))
+
+    def transaction(self):
+        return _FakeTransaction(self.log)
+
+
+class _FakeAcquire:
+    def __init__(self, conn: _FakeConnection) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class _FakePool:
+    def __init__(self, conn: _FakeConnection) -> None:
+        self._conn = conn
+
+    def acquire(self):
+        return _FakeAcquire(self._conn)
+
+
+def _bucket(hour: int, minute: int) -> datetime:
+    return datetime(2026, 2, 3, hour, minute, tzinfo=timezone.utc)
+
+
+def test_flush_notifies_touched_range_inside_transaction() -> None:
+    conn = _FakeConnection()
+    minute = {
+        _bucket(10, 5): BucketMetrics(revenue=10.0, order_count=1),
+        _bucket(10, 2): BucketMetrics(view_count=3),
+    }
+    hour = {_bucket(10, 0): BucketMetrics(revenue=10.0, order_count=1)}
+
+    asyncio.run(flush_kpis(_FakePool(conn), minute, hour, "kpi_flushed"))
+
+    assert [entry[0] for entry in conn.log] == [
+        "begin",
+        "upsert",
+        "execute",
+        "upsert",
+        "execute",
+        "commit",
+    ]
+    assert conn.log[1][1:] == ("kpi_minute", 2)
+    _, query, channel, payload = conn.log[2]
+    assert "pg_notify" in query and channel == "kpi_flushed"
+    assert json.loads(payload) == {
+        "granularity": "minute",
+        "min_bucket": "2026-02-03T10:02:00+00:00",
+        "max_bucket": "2026-02-03T10:05:00+00:00",
+    }
+    assert json.loads(conn.log[4][3])["granularity"] == "hour"
+
+
+def test_flush_without_channel_does_not_notify() -> None:
+    conn = _FakeConnection()
+    minute = {_bucket(10, 5): BucketMetrics(view_count=1)}
+
+    asyncio.run(flush_kpis(_FakePool(conn), minute, {}))
+
+    assert [entry[0] for entry in conn.log] == ["begin", "upsert", "commit"]
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+
+from stream_processor.runtime import (
+    configure_loop,
+    loop_factory,
+    monitor_loop_lag,
+    run_service,
+)
+
+
+def _settings(**overrides) -> SimpleNamespace:
+    values = {
+        "UVLOOP_ENABLED": False,
+        "LOOP_DEBUG": False,
+        "SLOW_CALLBACK_MS": 100,
+        "LOOP_LAG_INTERVAL_SECONDS": 1.0,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_loop_factory_defaults_to_asyncio() -> None:
+    assert loop_factory(_settings()) is None  # type: ignore[arg-type]
+
+
+def test_configure_loop_sets_debug_and_slow_callback_threshold() -> None:
+    loop = asyncio.new_event_loop()
+    try:
+        configure_loop(loop, _settings(LOOP_DEBUG=True, SLOW_CALLBACK_MS=250))  # type: ignore[arg-type]
+        assert loop.get_debug() is True
+        assert loop.slow_callback_duration == 0.25
+    finally:
+        loop.close()
+
+
+def test_run_service_returns_coroutine_result() -> None:
+    async def work() -> int:
+        await asyncio.sleep(0)
+        return 42
+
+    assert run_service(work(), _settings(LOOP_LAG_INTERVAL_SECONDS=0.01)) == 42  # type: ignore[arg-type]
+
+
+def test_monitor_loop_lag_warns_on_blocking_call(caplog) -> None:
+    async def run() -> None:
+        monitor = asyncio.create_task(monitor_loop_lag(20, 0.01))
+        await asyncio.sleep(0)
+        time.sleep(0.1)
+        await asyncio.sleep(0.05)
+        monitor.cancel()
+
+    with caplog.at_level(logging.WARNING, logger="stream-processor"):
+        asyncio.run(run())
+    assert any("Event loop stalled" in record.message for record in caplog.records)